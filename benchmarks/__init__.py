@@ -0,0 +1 @@
+"""Performance benchmarks of the protocol, the packets and the server, run them with `python -m benchmarks`."""
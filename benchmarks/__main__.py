@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import fnmatch
+import logging
+import sys
+from pathlib import Path
+
+from benchmarks import bench_packets, bench_protocol, bench_server  # noqa: F401 # Registers the benchmarks
+from benchmarks.runner import BENCHMARKS, Benchmark, BenchmarkResult, compare, load_results, run_all, save_results
+from bytelink.utils.loop import EventLoop, loop_name, run
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+async def run_benchmarks(benchmarks: list[Benchmark]) -> tuple[str, list[BenchmarkResult]]:
+    event_loop = loop_name(asyncio.get_running_loop())
+    print(f"Running {len(benchmarks)} benchmarks on the {event_loop} event loop")
+    return event_loop, await run_all(benchmarks)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the bytelink benchmarks.")
+    parser.add_argument("-k", "--filter", default="*", help="Only run the benchmarks matching this glob pattern")
+    parser.add_argument("-o", "--output", type=Path, help="Save the results as JSON into this file")
+    parser.add_argument(
+        "-b",
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Compare the results against the results in this file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--loop",
+        choices=[loop.value for loop in EventLoop],
+        help="Event loop to run the benchmarks on (default: BYTELINK_EVENT_LOOP, or auto)",
+    )
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline")
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed slowdown before a result counts as a regression (default: %(default)s, which is 10%%)",
+    )
+    args = parser.parse_args()
+
+    # Logging every single request would make the server benchmarks measure the log handlers instead
+    logging.getLogger("bytelink").setLevel(logging.WARNING)
+
+    selected = [bench for bench in BENCHMARKS if fnmatch.fnmatchcase(bench.name, args.filter)]
+    event_loop, results = run(run_benchmarks(selected), args.loop)
+
+    if args.output is not None:
+        save_results(args.output, results, event_loop)
+    if args.save_baseline:
+        save_results(args.baseline, results, event_loop)
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline found at {args.baseline}, run with --save-baseline to create it")
+        return 0
+
+    try:
+        regressions = compare(results, load_results(args.baseline), args.tolerance, event_loop=event_loop)
+    except ValueError as exc:
+        print(f"Can't compare against the baseline ({args.baseline}): {exc}, use a baseline from the same event loop")
+        return 1
+    if not regressions:
+        print(f"No regressions against the baseline ({args.baseline})")
+        return 0
+
+    print(f"Found {len(regressions)} regressions against the baseline ({args.baseline}):")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Callable
+
+from benchmarks.runner import benchmark
+from bytelink.config import PROTOCOL_VERSION
+from bytelink.packets import PACKET_MAP, _deserialize_packet, _serialize_packet
+from bytelink.packets.abc import Packet
+from bytelink.packets.disconnect import Disconnect
+from bytelink.packets.handshaking import Handshake, SetCompression
+from bytelink.packets.ping import Ping, Pong
+from bytelink.protocol.buffer import BufferView
+
+# Representative instance of every packet in the packet map (new packets should be added here too)
+SAMPLE_PACKETS: list[Packet] = [
+    Ping("ping-token", request_id=1),
+    Pong("ping-token", request_id=1),
+    Handshake(PROTOCOL_VERSION, compression=True),
+    Disconnect("Server is shutting down"),
+    SetCompression(256, 0),
+]
+
+_missing = set(PACKET_MAP.values()) - {type(packet) for packet in SAMPLE_PACKETS}
+if _missing:
+    raise RuntimeError(f"Packets without a benchmark sample: {', '.join(cls.__name__ for cls in _missing)}")
+
+
+def _bench_serialize(packet: Packet) -> Callable[[], object]:
+    return lambda: _serialize_packet(packet)
+
+
+def _bench_deserialize(packet: Packet) -> Callable[[], object]:
+    data = bytes(_serialize_packet(packet))
+    return lambda: _deserialize_packet(BufferView(data))
+
+
+for _packet in SAMPLE_PACKETS:
+    _name = type(_packet).__name__
+    benchmark(f"packet.serialize[{_name}]")(partial(_bench_serialize, _packet))
+    benchmark(f"packet.deserialize[{_name}]")(partial(_bench_deserialize, _packet))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Callable
+
+from benchmarks.runner import benchmark
+from bytelink.protocol.base_io import StructFormat
+from bytelink.protocol.buffer import Buffer
+
+# Small values take a single byte, the last one takes the full 5 bytes of a 32-bit varuint
+VARUINT_VALUES = (1, 300, 70_000, 2**32 - 1)
+
+
+def _bench_write_varuint(value: int) -> Callable[[], object]:
+    def operation() -> object:
+        buf = Buffer()
+        buf.write_varuint(value, max_bits=32)
+        return buf
+
+    return operation
+
+
+def _bench_read_varuint(value: int) -> Callable[[], object]:
+    buf = Buffer()
+    buf.write_varuint(value, max_bits=32)
+
+    def operation() -> object:
+        buf.pos = 0
+        return buf.read_varuint(max_bits=32)
+
+    return operation
+
+
+for _value in VARUINT_VALUES:
+    benchmark(f"varuint.write[{_value}]")(partial(_bench_write_varuint, _value))
+    benchmark(f"varuint.read[{_value}]")(partial(_bench_read_varuint, _value))
+
+
+@benchmark("struct.write_value[int,double]")
+def bench_write_value() -> Callable[[], object]:
+    def operation() -> object:
+        buf = Buffer()
+        buf.write_value(StructFormat.INT, 123_456)
+        buf.write_value(StructFormat.DOUBLE, 1.5)
+        return buf
+
+    return operation
+
+
+@benchmark("struct.read_value[int,double]")
+def bench_read_value() -> Callable[[], object]:
+    buf = Buffer()
+    buf.write_value(StructFormat.INT, 123_456)
+    buf.write_value(StructFormat.DOUBLE, 1.5)
+
+    def operation() -> object:
+        buf.pos = 0
+        return buf.read_value(StructFormat.INT), buf.read_value(StructFormat.DOUBLE)
+
+    return operation
+
+
+@benchmark("buffer.write[64B]")
+def bench_buffer_write() -> Callable[[], object]:
+    data = bytes(64)
+
+    def operation() -> object:
+        buf = Buffer()
+        buf.write(data)
+        return buf
+
+    return operation
+
+
+@benchmark("buffer.read[64B]")
+def bench_buffer_read() -> Callable[[], object]:
+    buf = Buffer(bytes(64))
+
+    def operation() -> object:
+        buf.pos = 0
+        return buf.read(64)
+
+    return operation
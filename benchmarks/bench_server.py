@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from benchmarks.runner import BenchmarkResult, async_benchmark, latency_result
+from bytelink.network.client import Client
+from bytelink.network.server import Server
+from bytelink.packets.ping import Ping
+
+CLIENTS = 20
+REQUESTS_PER_CLIENT = 250
+
+
+async def _run_client(address: tuple[str, int], latencies: list[float]) -> None:
+    perf_counter = time.perf_counter
+    client = await Client.create(address, timeout=10)
+    async with client:
+        await client.connect()
+        for i in range(REQUESTS_PER_CLIENT):
+            start = perf_counter()
+            await client.request(Ping(str(i)))
+            latencies.append(perf_counter() - start)
+
+
+@async_benchmark(f"server.ping_pong[{CLIENTS} clients]")
+async def bench_ping_pong(name: str) -> BenchmarkResult:
+    """Loopback server, with all of the clients sending pings one after another, as fast as they can."""
+    server = await Server.create(("127.0.0.1", 0), timeout=10)
+    latencies: list[float] = []
+    async with server:
+        address = server._server.sockets[0].getsockname()[:2]
+        start = time.perf_counter()
+        await asyncio.gather(*(_run_client(address, latencies) for _ in range(CLIENTS)))
+        elapsed = time.perf_counter() - start
+
+        # Let the server notice the clients are gone, so that their handlers don't get cancelled once we're done
+        while server.connections:
+            await asyncio.sleep(0.01)
+    server.close()
+    return latency_result(name, latencies, elapsed)
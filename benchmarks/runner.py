@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence, Union
+
+# Synchronous benchmarks are setup functions, returning the operation to measure (so that the setup isn't measured),
+# asynchronous ones run the whole measurement by themselves and return the result
+SyncBenchmark = Callable[[], Callable[[], object]]
+AsyncBenchmark = Callable[[str], Awaitable["BenchmarkResult"]]
+
+
+@dataclass
+class BenchmarkResult:
+    """Measured performance of a single benchmark, times are in seconds and memory in bytes (per operation)."""
+
+    name: str
+    ops: int
+    ops_per_sec: float
+    p50: float
+    p99: float
+    # Most memory allocated at once during a single operation, and memory left allocated after it (leaks, caches)
+    peak_memory: Optional[float] = None
+    retained_memory: Optional[float] = None
+
+
+@dataclass
+class Regression:
+    """A benchmark result, which got worse than the baseline by more than the tolerance."""
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.metric} went from {self.baseline:.6g} to {self.current:.6g}"
+
+
+@dataclass
+class SavedResults:
+    """Benchmark results saved by `save_results`, along with the environment they were measured in."""
+
+    results: dict[str, BenchmarkResult]
+    event_loop: str
+    python: str
+    implementation: str
+    platform: str
+    time: float
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark, see `benchmark` and `async_benchmark`."""
+
+    name: str
+    func: Union[SyncBenchmark, AsyncBenchmark]
+    is_async: bool
+    batch: int
+    samples: int
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(name: str, *, batch: int = 1000, samples: int = 100) -> Callable[[SyncBenchmark], SyncBenchmark]:
+    """Register a synchronous benchmark, its operation gets timed `samples` times, running it `batch` times each.
+
+    Fast operations are timed in batches, since the timer itself would take longer than the operation.
+    """
+
+    def decorator(func: SyncBenchmark) -> SyncBenchmark:
+        BENCHMARKS.append(Benchmark(name, func, is_async=False, batch=batch, samples=samples))
+        return func
+
+    return decorator
+
+
+def async_benchmark(name: str) -> Callable[[AsyncBenchmark], AsyncBenchmark]:
+    """Register an asynchronous benchmark, which measures itself (see `latency_result`)."""
+
+    def decorator(func: AsyncBenchmark) -> AsyncBenchmark:
+        BENCHMARKS.append(Benchmark(name, func, is_async=True, batch=1, samples=0))
+        return func
+
+    return decorator
+
+
+def _percentile(sorted_values: Sequence[float], percentile: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))
+    return sorted_values[index]
+
+
+def latency_result(name: str, latencies: list[float], elapsed: float) -> BenchmarkResult:
+    """Make the result out of the latencies of the individual operations, and the total time they took."""
+    latencies.sort()
+    return BenchmarkResult(
+        name=name,
+        ops=len(latencies),
+        ops_per_sec=len(latencies) / elapsed,
+        p50=_percentile(latencies, 50),
+        p99=_percentile(latencies, 99),
+    )
+
+
+def _measure_memory(operation: Callable[[], object], count: int = 100) -> tuple[float, float]:
+    """Get the peak memory allocated by a single run of the operation, and memory retained per run."""
+    operation()  # Warm up any caches first, so they don't count as retained memory
+    # The results are kept around while measuring, as the memory they hold is retained by whoever uses them
+    results: list[object] = [None] * count
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        tracemalloc.start()
+        for i in range(count):
+            results[i] = operation()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return float(peak), retained / count
+
+
+def run_sync(bench: Benchmark) -> BenchmarkResult:
+    operation = bench.func()
+    assert callable(operation)
+    perf_counter = time.perf_counter
+    batch = range(bench.batch)
+
+    for _ in batch:  # Warm up
+        operation()
+
+    sample_times = []
+    for _ in range(bench.samples):
+        start = perf_counter()
+        for _ in batch:
+            operation()
+        sample_times.append(perf_counter() - start)
+
+    latencies = sorted(sample / bench.batch for sample in sample_times)
+    peak, retained = _measure_memory(operation)
+    return BenchmarkResult(
+        name=bench.name,
+        ops=bench.batch * bench.samples,
+        ops_per_sec=bench.batch * bench.samples / sum(sample_times),
+        p50=_percentile(latencies, 50),
+        p99=_percentile(latencies, 99),
+        peak_memory=peak,
+        retained_memory=retained,
+    )
+
+
+async def run_all(benchmarks: Iterable[Benchmark]) -> list[BenchmarkResult]:
+    results = []
+    for bench in benchmarks:
+        if bench.is_async:
+            result = await bench.func(bench.name)  # type: ignore[call-arg,misc]
+        else:
+            result = run_sync(bench)
+        print(format_result(result), flush=True)
+        results.append(result)
+    return results
+
+
+def format_result(result: BenchmarkResult) -> str:
+    line = (
+        f"{result.name:<45} {result.ops_per_sec:>14,.0f} ops/s"
+        f"  p50 {result.p50 * 1e6:>10.3f}us  p99 {result.p99 * 1e6:>10.3f}us"
+    )
+    if result.peak_memory is not None and result.retained_memory is not None:
+        line += f"  peak {result.peak_memory:>8.0f}B  retained {result.retained_memory:>8.1f}B"
+    return line
+
+
+def save_results(path: Path, results: list[BenchmarkResult], event_loop: str = "asyncio") -> None:
+    data = {
+        "python": sys.version,
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "event_loop": event_loop,
+        "time": time.time(),
+        "results": [asdict(result) for result in results],
+    }
+    path.write_text(json.dumps(data, indent=2))
+
+
+def load_results(path: Path) -> SavedResults:
+    data: dict[str, Any] = json.loads(path.read_text())
+    return SavedResults(
+        results={result["name"]: BenchmarkResult(**result) for result in data["results"]},
+        # Results saved before the event loop was recorded were all measured on the default asyncio loop
+        event_loop=data.get("event_loop", "asyncio"),
+        python=data["python"],
+        implementation=data["implementation"],
+        platform=data["platform"],
+        time=data["time"],
+    )
+
+
+def compare(
+    results: list[BenchmarkResult],
+    baseline: SavedResults,
+    tolerance: float = 0.1,
+    *,
+    event_loop: str = "asyncio",
+) -> list[Regression]:
+    """Find the results which got worse than the baseline by more than the tolerance (0.1 is 10%).
+
+    Throughput and the memory use are compared, percentiles are too noisy between runs to be compared reliably.
+    Benchmarks missing from the baseline are ignored. Results measured on a different event loop than the baseline
+    can't be compared at all, as the difference would be down to the event loop, a ValueError is raised for these.
+    """
+    if baseline.event_loop != event_loop:
+        raise ValueError(f"Baseline was measured on the {baseline.event_loop} event loop, not on {event_loop}")
+
+    regressions = []
+    for result in results:
+        base = baseline.results.get(result.name)
+        if base is None:
+            continue
+
+        if result.ops_per_sec < base.ops_per_sec * (1 - tolerance):
+            regressions.append(Regression(result.name, "ops_per_sec", base.ops_per_sec, result.ops_per_sec))
+        for metric in ("peak_memory", "retained_memory"):
+            current, previous = getattr(result, metric), getattr(base, metric)
+            if current is None or previous is None:
+                continue
+            # Small absolute differences in memory are just noise (interpreter internals, free lists)
+            if current > previous * (1 + tolerance) and current - previous > 64:
+                regressions.append(Regression(result.name, metric, previous, current))
+    return regressions
@@ -1,3 +0,0 @@
-from bytelink.utils.log import setup_logging
-
-setup_logging()
@@ -2,18 +2,23 @@ from __future__ import annotations
 
 import asyncio
 
-from bytelink.config import Config
+from bytelink.config import load_config
 from bytelink.network.client import Client
+from bytelink.utils.log import setup_logging
+from bytelink.utils.loop import run
 
 
 async def main() -> None:
-    client = await Client.create((Config.IP, Config.PORT), timeout=3)
+    config = load_config()
+    client = await Client.create(config.ADDRESS, timeout=3)
 
     async with client:
         await client.connect()
+        await client.ping()
         await asyncio.sleep(50)
-        await client.connect()
+        await client.ping()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    setup_logging()
+    run(main())
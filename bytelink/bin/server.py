@@ -1,15 +1,75 @@
 from __future__ import annotations
 
 import asyncio
+from pathlib import Path
+from typing import Optional
 
-from bytelink.config import Config
+from bytelink.config import ServerConfig, load_config
+from bytelink.network.admission import AdmissionController
 from bytelink.network.server import Server
+from bytelink.network.supervisor import Supervisor
+from bytelink.packets.compression import Compression
+from bytelink.utils.log import setup_logging
+from bytelink.utils.loop import run
+from bytelink.utils.metrics import MetricsRegistry
 
+METRICS_FILE_INTERVAL = 15.0
 
-async def main() -> None:
-    server = await Server.create((Config.IP, Config.PORT), timeout=float("inf"))
-    await server.listen()
+
+def load_compression(config: ServerConfig) -> Optional[Compression]:
+    """Get the compression settings from the config, `None` if compression is disabled."""
+    if config.COMPRESSION_THRESHOLD < 0:
+        return None
+    zdict = None if config.COMPRESSION_DICTIONARY is None else Path(config.COMPRESSION_DICTIONARY).read_bytes()
+    return Compression(threshold=config.COMPRESSION_THRESHOLD, zdict=zdict, max_size=config.COMPRESSION_MAX_SIZE)
+
+
+async def export_metrics(config: ServerConfig, metrics: MetricsRegistry) -> None:
+    """Serve the metrics and keep writing them into the file, as configured."""
+    if config.METRICS_PORT is not None:
+        await metrics.serve_prometheus(port=config.METRICS_PORT)
+    if config.METRICS_FILE is not None:
+        while True:
+            metrics.write_prometheus(config.METRICS_FILE)
+            await asyncio.sleep(METRICS_FILE_INTERVAL)
+
+
+async def main(config: ServerConfig) -> None:
+    admission = AdmissionController(
+        max_connections=config.MAX_CONNECTIONS,
+        max_per_ip=config.MAX_CONNECTIONS_PER_IP,
+        accept_rate=config.ACCEPT_RATE,
+    )
+    metrics = None if config.METRICS_PORT is None and config.METRICS_FILE is None else MetricsRegistry()
+    server = await Server.create(
+        config.ADDRESS,
+        timeout=float("inf"),
+        admission=admission,
+        compression=load_compression(config),
+        metrics=metrics,
+    )
+    if metrics is None:
+        await server.listen()
+    else:
+        await asyncio.gather(server.listen(), export_metrics(config, metrics))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    setup_logging()
+    config = load_config()
+    if config.WORKERS > 1:
+        if config.METRICS_PORT is not None or config.METRICS_FILE is not None:
+            # The metrics are only collected by the server itself, the workers would each export their own
+            raise ValueError(f"Metrics can't be exported with multiple workers ({config.WORKERS}), run a single server")
+        supervisor = Supervisor(
+            Server,
+            config.ADDRESS,
+            timeout=float("inf"),
+            workers=config.WORKERS,
+            max_connections=config.MAX_CONNECTIONS,
+            admission_options={"max_per_ip": config.MAX_CONNECTIONS_PER_IP, "accept_rate": config.ACCEPT_RATE},
+            compression=load_compression(config),
+        )
+        supervisor.run()
+    else:
+        run(main(config))
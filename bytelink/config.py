@@ -1,30 +1,91 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
+from typing import Any, Optional, TYPE_CHECKING, Union
 
-import toml
+if TYPE_CHECKING:
+    from bytelink.network.transport import AddressType
 
 # Hard-coded constants
 VERSION = "0.1.0"
-PROTOCOL_VERSION = 1
+PROTOCOL_VERSION = 3
 
 # Logging setting
 DEBUG = bool(os.environ.get("BYTELINK_DEBUG", 0))
 LOG_FILE = os.environ.get("BYTELINK_LOG_FILE", None)
 LOG_FILE_MAX_SIZE = int(os.environ.get("BYTELINK_LOG_FILE_SIZE_MAX", 1_048_576))  # in bytes (default: 1MiB)
+# Handle the log records in a separate thread, so that slow handlers (file, terminal) don't block the event loop
+LOG_QUEUE = bool(os.environ.get("BYTELINK_LOG_QUEUE", 0))
+
+# Event loop used by the entry points ("auto", "asyncio" or "uvloop"), auto picks uvloop if it's installed,
+# along with the eager task factory (python 3.12+), which runs the new tasks right away, until they first suspend
+EVENT_LOOP = os.environ.get("BYTELINK_EVENT_LOOP", "auto")
+EAGER_TASKS = os.environ.get("BYTELINK_EAGER_TASKS", "1") not in ("", "0")
 
 # Config file location, in this case it's `config.toml` in root
 CONFIG_FILE = os.environ.get("BYTELINK_CONFIG_FILE", "config.toml")
-config = toml.load(CONFIG_FILE)
-server_config = config["server"]["config"]
 
 
-class Config:
-    IP = server_config["ip"]
-    PORT = server_config["port"]
-    MOTD = server_config["motd"]
+class ServerConfig:
+    """Server settings, parsed from the contents of the config file (see `load_config`)."""
+
+    def __init__(self, config: dict[str, Any]):
+        server_config = config["server"]["config"]
+
+        self.IP: str = server_config["ip"]
+        self.PORT: int = server_config["port"]
+        self.MOTD: str = server_config["motd"]
+        # Listen on a Unix domain socket at this path instead of the IP and port (single worker only)
+        self.UNIX_SOCKET: Optional[str] = server_config.get("unix-socket") or None
+
+        self.PASSWORD = config["server"]["auth"]["password"]
+
+        # Load the max connections, It's `None` if 0 is specified.
+        self.MAX_CONNECTIONS: Optional[int] = server_config["max-connections"] or None
+
+        # Limits for accepting new connections (per client IP address and per second), `None` if 0 is specified.
+        self.MAX_CONNECTIONS_PER_IP: Optional[int] = server_config.get("max-connections-per-ip", 0) or None
+        self.ACCEPT_RATE: Optional[float] = server_config.get("accept-rate", 0) or None
+
+        # Amount of server processes, all listening on the same address (only supported on systems with SO_REUSEPORT)
+        self.WORKERS: int = server_config.get("workers", 1)
+
+        # Packets at least this long (in bytes) get compressed for clients supporting it, negative disables it.
+        # The dictionary is an optional file with a preset zlib dictionary, shared with the clients.
+        self.COMPRESSION_THRESHOLD: int = server_config.get("compression-threshold", -1)
+        self.COMPRESSION_DICTIONARY: Optional[str] = server_config.get("compression-dictionary") or None
+        # Largest packet (in bytes, once decompressed) accepted from the clients using compression
+        self.COMPRESSION_MAX_SIZE: int = server_config.get("compression-max-size", 2_097_152)
+
+        # Prometheus metrics, served over HTTP on localhost on given port and/or periodically written to given file
+        self.METRICS_PORT: Optional[int] = server_config.get("metrics-port", 0) or None
+        self.METRICS_FILE: Optional[str] = server_config.get("metrics-file") or None
+
+    @property
+    def ADDRESS(self) -> AddressType:  # noqa: N802 # Named like the rest of the settings
+        """Address the server listens on, and the clients connect to."""
+        if self.UNIX_SOCKET is not None:
+            return self.UNIX_SOCKET
+        return (self.IP, self.PORT)
+
+
+_loaded_configs: dict[Path, ServerConfig] = {}
+
+
+def load_config(path: Union[str, Path, None] = None) -> ServerConfig:
+    """Load the config file (`CONFIG_FILE` by default), it's only read and parsed once, later calls get it cached."""
+    path = Path(CONFIG_FILE if path is None else path)
+    config = _loaded_configs.get(path)
+    if config is None:
+        import toml  # Only needed by the processes which actually use the config file
+
+        config = _loaded_configs[path] = ServerConfig(toml.load(path))
+    return config
 
-    PASSWORD = config["server"]["auth"]["password"]
 
-    # Load the max connections, It's `None` if 0 is specified.
-    MAX_CONNECTIONS = server_config["max-connections"] if server_config["max-connections"] != 0 else None
+def __getattr__(name: str) -> Any:
+    # The config used to be loaded on import, as `Config`, that's still supported (it just gets loaded on first use)
+    if name == "Config":
+        return load_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
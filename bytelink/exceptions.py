@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Literal, Optional, TYPE_CHECKING, overload
+from typing import Any, Literal, Optional, TYPE_CHECKING, overload
 
 if TYPE_CHECKING:
     from bytelink.packets.abc import Packet
@@ -66,6 +66,10 @@ class MalformedPacketError(BytelinkError):
     def __init__(self, state: Literal[MalformedPacketState.UNEXPECTED_PACKET], *, packet: Packet):
         ...
 
+    @overload
+    def __init__(self, state: Literal[MalformedPacketState.UNEXPECTED_PACKET], *, packet_id: int):
+        ...
+
     def __init__(
         self,
         state: MalformedPacketState,
@@ -94,3 +98,16 @@ class MalformedPacketError(BytelinkError):
 
         self.msg = msg
         return super().__init__(msg)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Rebuild the exception from the same arguments when it's unpickled (sent over from another process)
+        return _rebuild_malformed_packet_error, (self.state, self.ioerror, self.packet_id, self.packet)
+
+
+def _rebuild_malformed_packet_error(
+    state: MalformedPacketState,
+    ioerror: Optional[IOError],
+    packet_id: Optional[int],
+    packet: Optional[Packet],
+) -> MalformedPacketError:
+    return MalformedPacketError(state, ioerror=ioerror, packet_id=packet_id, packet=packet)  # type: ignore
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import AsyncIterator, Optional
+
+from bytelink.exceptions import BytelinkError
+
+
+class ConnectionSlots:
+    """Counter of the open connections, limiting how many of them can be open at once (`None` means no limit)."""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.used = 0
+
+    def try_acquire(self) -> bool:
+        """Take up a slot for a new connection, if there are any left."""
+        if self.limit is not None and self.used >= self.limit:
+            return False
+        self.used += 1
+        return True
+
+    def release(self) -> None:
+        """Free up a slot of a closed connection."""
+        self.used -= 1
+
+
+class TokenBucket:
+    """Token bucket rate limiter, allowing `rate` actions per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._last = time.monotonic()
+
+    def try_take(self) -> bool:
+        """Take a single token from the bucket, if there are any."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RejectReason(Enum):
+    """Enum describing all possible reasons for refusing a new connection, sent over to the client."""
+
+    SERVER_FULL = "Server is full"
+    IP_LIMIT = "Too many connections from your address"
+    RATE_LIMITED = "Server is overloaded, try again later"
+    HANDSHAKE_QUEUE_FULL = "Server is overloaded (too many pending handshakes), try again later"
+    HANDSHAKE_QUEUE_TIMEOUT = "Server is overloaded (timed out waiting for handshake), try again later"
+
+
+class AdmissionRejected(BytelinkError):
+    """Raised when a connection was refused by the admission controller."""
+
+    def __init__(self, reason: RejectReason):
+        self.reason = reason
+        super().__init__(reason.value)
+
+
+@dataclass
+class Occupancy:
+    """Snapshot of the current state of the admission controller."""
+
+    connections: int
+    max_connections: Optional[int]
+    handshaking: int
+    handshake_queue: int
+    rejected: dict[RejectReason, int] = field(default_factory=dict)
+
+
+class AdmissionController:
+    """Decide which of the new connections get accepted, to keep the server responsive during connection storms.
+
+    New connections first have to pass the accept rate limit (token bucket), the global connection limit and the
+    per-IP connection limit, all of which are checked right away. The accepted connections then wait in a queue for
+    one of the limited handshake slots, so that a flood of new clients can't starve the already connected ones.
+    `None` disables any of these limits.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: Optional[int] = None,
+        slots: Optional[ConnectionSlots] = None,
+        max_per_ip: Optional[int] = None,
+        accept_rate: Optional[float] = None,
+        accept_burst: Optional[int] = None,
+        max_handshakes: Optional[int] = None,
+        max_handshake_queue: Optional[int] = None,
+        handshake_queue_timeout: float = float("inf"),
+    ):
+        if slots is not None and max_connections is not None:
+            raise ValueError("Only one of slots or max_connections can be specified")
+        self.slots = ConnectionSlots(max_connections) if slots is None else slots
+
+        self.max_per_ip = max_per_ip
+        self._per_ip: Counter[str] = Counter()
+
+        if accept_rate is None:
+            self._bucket = None
+        else:
+            # By default, allow bursts of up to a second worth of connections
+            burst = max(1, int(accept_rate)) if accept_burst is None else accept_burst
+            self._bucket = TokenBucket(accept_rate, burst)
+
+        self.max_handshakes = max_handshakes
+        self.max_handshake_queue = max_handshake_queue
+        self.handshake_queue_timeout = handshake_queue_timeout
+        self._handshake_semaphore = None if max_handshakes is None else asyncio.Semaphore(max_handshakes)
+        self._handshaking = 0
+        self._handshake_queue = 0
+
+        self.rejected: Counter[RejectReason] = Counter()
+
+    def admit(self, host: str) -> Optional[RejectReason]:
+        """Try to admit a new connection from given host, returning the reason if it was rejected.
+
+        Admitted connections have to be released with `release` once they're closed.
+        """
+        if self._bucket is not None and not self._bucket.try_take():
+            return self._reject(RejectReason.RATE_LIMITED)
+        if self.max_per_ip is not None and self._per_ip[host] >= self.max_per_ip:
+            return self._reject(RejectReason.IP_LIMIT)
+        if not self.slots.try_acquire():
+            return self._reject(RejectReason.SERVER_FULL)
+
+        self._per_ip[host] += 1
+        return None
+
+    def _reject(self, reason: RejectReason) -> RejectReason:
+        self.rejected[reason] += 1
+        return reason
+
+    def release(self, host: str) -> None:
+        """Release an admitted connection from given host, once it was closed."""
+        self.slots.release()
+        self._per_ip[host] -= 1
+        if self._per_ip[host] <= 0:
+            del self._per_ip[host]
+
+    @asynccontextmanager
+    async def handshake(self) -> AsyncIterator[None]:
+        """Wait for a free handshake slot, holding it until the context manager exits.
+
+        If the queue of connections waiting for the handshake slot is full, or if the slot doesn't free up in time,
+        `AdmissionRejected` is raised.
+        """
+        semaphore = self._handshake_semaphore
+        if semaphore is not None and semaphore.locked():
+            if self.max_handshake_queue is not None and self._handshake_queue >= self.max_handshake_queue:
+                raise AdmissionRejected(self._reject(RejectReason.HANDSHAKE_QUEUE_FULL))
+
+            self._handshake_queue += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.handshake_queue_timeout)
+            except asyncio.TimeoutError:
+                raise AdmissionRejected(self._reject(RejectReason.HANDSHAKE_QUEUE_TIMEOUT))
+            finally:
+                self._handshake_queue -= 1
+        elif semaphore is not None:
+            await semaphore.acquire()
+
+        self._handshaking += 1
+        try:
+            yield
+        finally:
+            self._handshaking -= 1
+            if semaphore is not None:
+                semaphore.release()
+
+    @property
+    def occupancy(self) -> Occupancy:
+        """Get the current occupancy of the server."""
+        return Occupancy(
+            connections=self.slots.used,
+            max_connections=self.slots.limit,
+            handshaking=self._handshaking,
+            handshake_queue=self._handshake_queue,
+            rejected=dict(self.rejected),
+        )
@@ -1,50 +1,202 @@
 from __future__ import annotations
 
 import asyncio
-from typing import TYPE_CHECKING
+import logging
+import socket
+import time
+from dataclasses import replace
+from typing import Optional, TYPE_CHECKING
 
 from bytelink.config import PROTOCOL_VERSION
+from bytelink.exceptions import DisconnectError
 from bytelink.network.connection import Connection
+from bytelink.network.transport import AddressType, open_connection
 from bytelink.packets import read_packet, write_packet
-from bytelink.packets.handshaking import Handshake
+from bytelink.packets.abc import RequestPacket, ResponsePacket
+from bytelink.packets.compression import Compression
+from bytelink.packets.disconnect import Disconnect
+from bytelink.packets.handshaking import Handshake, SetCompression
 from bytelink.packets.ping import Ping, Pong
 
 if TYPE_CHECKING:
     from typing_extensions import Self
 
+    from bytelink.network.server import BaseServer
+
+log = logging.getLogger(__name__)
+
+# Request ids are 32-bit varuints, 0 is reserved for packets sent without a request
+_MAX_REQUEST_ID = (1 << 32) - 1
+
 
 class Client:
-    def __init__(self, server_address: tuple[str, int], timeout: float, connection: Connection):
+    def __init__(
+        self,
+        server_address: AddressType,
+        timeout: float,
+        connection: Connection,
+        *,
+        compression: Optional[Compression] = None,
+    ):
         self.address = server_address
         self.timeout = timeout
         self.connection = connection
+        # Compression settings offered to the server, the negotiated ones are stored on the connection
+        self.compression = compression
+
+        self._next_request_id = 1
+        self._pending: dict[int, asyncio.Future[ResponsePacket]] = {}
+        self._receive_task: Optional[asyncio.Task[None]] = None
+
+    @classmethod
+    async def create(
+        cls,
+        server_address: AddressType,
+        timeout: float,
+        *,
+        compression: Optional[Compression] = None,
+    ) -> Self:
+        """Connect to the server at given address, either a `(host, port)` pair, or a path of a Unix domain socket."""
+        reader, writer = await asyncio.wait_for(open_connection(server_address), timeout=timeout)
+        # The connection is idle whenever there are no pending requests, timeouts are applied to each request instead
+        connection = Connection(reader, writer, float("inf"))
+        return cls(server_address, timeout, connection, compression=compression)
 
     @classmethod
-    async def create(cls, server_address: tuple[str, int], timeout: float) -> Self:
-        conn = asyncio.open_connection(server_address[0], server_address[1])
-        reader, writer = await asyncio.wait_for(conn, timeout=timeout)
-        connection = Connection(reader, writer, timeout)
-        return cls(server_address, timeout, connection)
+    async def create_socketpair(
+        cls,
+        server: BaseServer,
+        timeout: float,
+        *,
+        compression: Optional[Compression] = None,
+    ) -> Self:
+        """Connect to a server running in the same process, over a socket pair, without going through the network.
+
+        The server doesn't have to be listening on any address for this. The address of the client is the server's
+        address, with the connection still working like any other one (`connect` has to be called as usual).
+        """
+        client_sock, server_sock = socket.socketpair()
+        try:
+            await server.connect_socket(server_sock)
+            reader, writer = await asyncio.open_connection(sock=client_sock)
+        except BaseException:
+            client_sock.close()
+            server_sock.close()
+            raise
+        connection = Connection(reader, writer, float("inf"))
+        return cls(server.address, timeout, connection, compression=compression)
 
     async def connect(self) -> None:
-        print("Sending a handshake")
-        packet = Handshake(PROTOCOL_VERSION)
-        await write_packet(self.connection, packet)
+        """Send the handshake (negotiating the compression, if enabled) and start receiving the responses."""
+        log.debug("Sending a handshake to %s", self.address)
+        if self.compression is None:
+            await write_packet(self.connection, Handshake(PROTOCOL_VERSION))
+        else:
+            handshake = Handshake(PROTOCOL_VERSION, compression=True, dictionary_id=self.compression.dictionary_id)
+            await write_packet(self.connection, handshake)
+            await self._negotiate_compression()
+        self._receive_task = asyncio.create_task(self._receive_loop())
+
+    async def _negotiate_compression(self) -> None:
+        """Wait for the server's compression settings, nothing else can be sent until they're known."""
+        assert self.compression is not None
+        packet = await asyncio.wait_for(read_packet(self.connection), timeout=self.timeout)
+        if isinstance(packet, Disconnect):
+            raise DisconnectError(packet.reason)
+        if not isinstance(packet, SetCompression):
+            raise DisconnectError(f"Expected compression settings from the server, got {packet} instead")
 
-        print("Sending ping request..")
-        packet = Ping("myrandomtoken")
-        await write_packet(self.connection, packet)
-        resp_packet = await read_packet(self.connection)
+        if packet.threshold < 0:
+            return
+        if packet.dictionary_id == 0:
+            self.connection.compression = replace(self.compression, threshold=packet.threshold, zdict=None)
+        elif packet.dictionary_id == self.compression.dictionary_id:
+            self.connection.compression = replace(self.compression, threshold=packet.threshold)
+        else:
+            raise DisconnectError(f"Server requested an unknown compression dictionary ({packet.dictionary_id})")
+
+    async def ping(self) -> float:
+        """Send a ping request, returning the time it took to get the pong back (in seconds)."""
+        token = f"ping-{self._next_request_id}"
+        start = time.perf_counter()
+        resp_packet = await self.request(Ping(token))
+        latency = time.perf_counter() - start
 
         if not isinstance(resp_packet, Pong):
             raise Exception("...")
 
-        print("Got pong!")
-        if resp_packet.token != "myrandomtoken":
+        if resp_packet.token != token:
             raise Exception("not match")
+        return latency
+
+    async def request(self, packet: RequestPacket, *, timeout: Optional[float] = None) -> ResponsePacket:
+        """Send the request packet and wait for the response to it.
+
+        Multiple requests can be pending at once, the responses are matched to them by the request id, which is
+        assigned to the packet here. If the response doesn't arrive within the timeout (defaults to the client's
+        timeout), `asyncio.TimeoutError` is raised.
+        """
+        if self._receive_task is None:
+            raise RuntimeError("Client isn't connected (use Client.connect first)")
+        if self._receive_task.done():
+            raise DisconnectError("Connection was closed")
+
+        request_id = self._next_request_id
+        self._next_request_id = request_id % _MAX_REQUEST_ID + 1
+        packet.request_id = request_id
+
+        future: asyncio.Future[ResponsePacket] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await write_packet(self.connection, packet, compression=self.connection.compression)
+            return await asyncio.wait_for(future, timeout=self.timeout if timeout is None else timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _receive_loop(self) -> None:
+        """Keep receiving the packets from the server, resolving the pending requests with the responses."""
+        try:
+            while True:
+                packet = await read_packet(self.connection, compression=self.connection.compression)
+
+                if isinstance(packet, ResponsePacket):
+                    future = self._pending.pop(packet.request_id, None)
+                    if future is not None and not future.done():
+                        future.set_result(packet)
+                    else:
+                        log.debug("Received response to an unknown (or timed out) request: %s", packet)
+                elif isinstance(packet, Disconnect):
+                    raise DisconnectError(packet.reason)
+                else:
+                    log.warning("Got unexpected packet from the server - %s", packet)
+        except Exception as exc:
+            if not isinstance(exc, DisconnectError):
+                exc = DisconnectError(f"Connection lost: {exc!r}")
+            self._fail_pending(exc)
+
+    def _fail_pending(self, exc: DisconnectError) -> None:
+        """Fail all of the requests still waiting for their responses with given exception."""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        self._pending.clear()
+
+    @property
+    def is_connected(self) -> bool:
+        """Check whether the connection is still open and the responses are being received."""
+        if self._receive_task is None or self._receive_task.done():
+            return False
+        return not self.connection.writer.is_closing()
+
+    def close(self) -> None:
+        """Close the connection, failing all of the pending requests with `DisconnectError`."""
+        if self._receive_task is not None:
+            self._receive_task.cancel()
+        self._fail_pending(DisconnectError("Client was closed"))
+        self.connection.close()
 
     async def __aenter__(self) -> Self:
         return self
 
     async def __aexit__(self, *args, **kwargs) -> None:
-        self.connection.close()
+        self.close()
@@ -1,43 +1,232 @@
 from __future__ import annotations
 
 import asyncio
-import socket
-from typing import Generic, TypeVar
+from typing import ClassVar, Generic, Optional, TypeVar
 
+from bytelink.packets.compression import Compression
 from bytelink.protocol.base_io import BaseAsyncReader, BaseAsyncWriter
+from bytelink.protocol.varint import peek_varuint
 
 T_STREAMREADER = TypeVar("T_STREAMREADER", bound=asyncio.StreamReader)
 T_STREAMWRITER = TypeVar("T_STREAMWRITER", bound=asyncio.StreamWriter)
 
 
 class Connection(BaseAsyncReader, BaseAsyncWriter, Generic[T_STREAMREADER, T_STREAMWRITER]):
-    """Asynchronous networked implementation for reader and writer over working over TCP."""
+    """Asynchronous networked implementation for reader and writer over working over TCP.
 
-    def __init__(self, reader: T_STREAMREADER, writer: T_STREAMWRITER, timeout: float):
+    Incoming data is received in large chunks into a single receive buffer, from which all of the reads are served.
+    This means that most reads don't have to wait on the socket at all, and that the whole frames
+    (`| Length | Packet ID | Data |`) can be located directly in this buffer, rather than being read byte by byte.
+    """
+
+    # Amount of bytes we ask the stream reader for, whenever the receive buffer doesn't hold enough data
+    RECV_CHUNK_SIZE: ClassVar[int] = 65_536
+    # Default watermarks for the data waiting to be sent. Once there's more than the high watermark, writers are made
+    # to wait until the transport sends enough data to get below the low watermark.
+    WRITE_HIGH_WATER: ClassVar[int] = 262_144
+    WRITE_LOW_WATER: ClassVar[int] = 65_536
+
+    def __init__(
+        self,
+        reader: T_STREAMREADER,
+        writer: T_STREAMWRITER,
+        timeout: float,
+        *,
+        write_timeout: float = float("inf"),
+        write_high_water: Optional[int] = None,
+        write_low_water: Optional[int] = None,
+    ):
         self.reader = reader
         self.writer = writer
+        # Maximum time to wait for new data, while reading (read idle timeout)
         self.timeout = timeout
+        # Maximum time to wait for the transport to send the written data, when it has too much of it (write stall)
+        self.write_timeout = write_timeout
+
+        self.address = self.writer.get_extra_info("sockname")
+        self.peer_address = self.writer.get_extra_info("peername")
+        # Compression negotiated with the peer, packets are sent in the compressed format once it's set
+        self.compression: Optional[Compression] = None
+
+        self._recv_buffer = bytearray()
+        self._recv_pos = 0
+
+        # Rather than starting a new timeout for every read, there's a single idle timer for the whole connection,
+        # which is only (re)scheduled once it runs out, based on the last time we've received any data
+        self._receiving = False
+        self._idle_since = 0.0
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+
+        self.write_high_water = self.WRITE_HIGH_WATER if write_high_water is None else write_high_water
+        self.write_low_water = self.WRITE_LOW_WATER if write_low_water is None else write_low_water
+        self.writer.transport.set_write_buffer_limits(high=self.write_high_water, low=self.write_low_water)
+
+        self._write_queue: list[bytes] = []
+        self._write_queue_size = 0
+        self._flush_handle: Optional[asyncio.Handle] = None
 
-        _sock: socket.socket = self.writer.transport._sock  # type: ignore # _sock should be defined at this point
-        self.address = _sock.getsockname()
+        # Read and write statistics
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.flush_count = 0
+        self.drain_count = 0
+
+    async def _fill(self, length: int) -> None:
+        """Receive data from the socket, until there are at least `length` unread bytes in the receive buffer."""
+        buf = self._recv_buffer
+        # Drop the already read data before receiving more, to keep the buffer from growing indefinitely.
+        # This only happens when the buffer doesn't hold enough data, so there's not much left to move.
+        if self._recv_pos:
+            del buf[: self._recv_pos]
+            self._recv_pos = 0
+
+        loop = asyncio.get_running_loop()
+        self._start_receiving()
+        try:
+            while len(buf) < length:
+                chunk_size = max(self.RECV_CHUNK_SIZE, length - len(buf))
+                new = await self.reader.read(chunk_size)
+                if len(new) == 0:
+                    if len(buf) == 0:
+                        raise IOError("Server did not respond with any information.")
+                    raise IOError(
+                        f"Server stopped responding (got {len(buf)} bytes, but expected {length} bytes)."
+                        f" Partial obtained data: {buf!r}"
+                    )
+                buf.extend(new)
+                self.bytes_received += len(new)
+                self._idle_since = loop.time()
+        finally:
+            self._receiving = False
+
+    def _start_receiving(self) -> None:
+        """Mark that we're waiting for new data, making sure the idle timer will be checked in time."""
+        loop = asyncio.get_running_loop()
+        self._receiving = True
+        self._idle_since = loop.time()
+        if self._idle_handle is None and self.timeout != float("inf"):
+            self._idle_handle = loop.call_at(self._idle_since + self.timeout, self._check_idle)
+
+    def _check_idle(self) -> None:
+        """Callback of the idle timer, timing out the pending read if we haven't received any data in time."""
+        self._idle_handle = None
+        if not self._receiving:
+            # The timer gets scheduled again by the next read which has to wait for data
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = self._idle_since + self.timeout
+        if deadline > loop.time():
+            self._idle_handle = loop.call_at(deadline, self._check_idle)
+            return
+        self._timeout_read()
+
+    def _timeout_read(self) -> None:
+        """Make the pending read fail with a timeout error."""
+        # The stream reader is left unusable after this, which is fine, as the connection is closed on a timeout
+        self.reader.set_exception(asyncio.TimeoutError())
 
     async def read(self, length: int) -> bytearray:
-        result = bytearray()
-        while len(result) < length:
-            new = await asyncio.wait_for(self.reader.read(length - len(result)), timeout=self.timeout)
-            if len(new) == 0:
-                if len(result) == 0:
-                    raise IOError("Server did not respond with any information.")
-                raise IOError(
-                    f"Server stopped responding (got {len(result)} bytes, but expected {length} bytes)."
-                    f" Partial obtained data: {result!r}"
-                )
-            result.extend(new)
-
-        return result
+        start = self._recv_pos
+        end = start + length
+        if end > len(self._recv_buffer):
+            await self._fill(length)
+            start, end = 0, length
+
+        self._recv_pos = end
+        return self._recv_buffer[start:end]
+
+    async def read_varuint(self, *, max_bits: int) -> int:
+        """Read a varuint directly out of the receive buffer, only receiving more data if it's incomplete.
+
+        For more information about varints check `BaseAsyncReader.read_varuint` docstring.
+        """
+        while True:
+            parsed = peek_varuint(self._recv_buffer, self._recv_pos, max_bits=max_bits)
+            if parsed is not None:
+                value, self._recv_pos = parsed
+                return value
+            await self._fill(len(self._recv_buffer) - self._recv_pos + 1)
+
+    async def read_bytearray(self, *, max_varuint_bits: int = 16) -> bytearray:
+        """Read a whole varuint length prefixed frame out of the receive buffer.
+
+        The length prefix is located in the receive buffer and the socket is only awaited if the buffer doesn't
+        hold the entire frame yet, in which case all of the missing data is requested at once.
+        """
+        while True:
+            parsed = peek_varuint(self._recv_buffer, self._recv_pos, max_bits=max_varuint_bits)
+            if parsed is not None:
+                break
+            await self._fill(len(self._recv_buffer) - self._recv_pos + 1)
+
+        length, start = parsed
+        end = start + length
+        if end > len(self._recv_buffer):
+            # We don't have the whole frame yet, receive the rest of it, keeping the length prefix in the buffer
+            prefix_length = start - self._recv_pos
+            await self._fill(prefix_length + length)
+            start, end = prefix_length, prefix_length + length
+
+        self._recv_pos = end
+        return self._recv_buffer[start:end]
 
     async def write(self, data: bytes) -> None:
-        self.writer.write(data)
+        """Queue the data to be sent, waiting for the transport to send some of it first if too much is waiting.
+
+        All of the data queued during a single event loop iteration is handed to the transport at once, at the end of
+        it (or on an explicit `flush`). This means the data mustn't be modified after it was passed here.
+        """
+        self.write_nowait(data)
+        if self.queued_bytes > self.write_high_water:
+            await self.drain()
+
+    def write_nowait(self, data: bytes) -> None:
+        """Queue the data to be sent, without ever waiting for it to be sent (ignoring the watermarks)."""
+        self._write_queue.append(data)
+        self._write_queue_size += len(data)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self) -> None:
+        """Hand all of the queued data to the transport at once."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        queue = self._write_queue
+        if not queue:
+            return
+        if len(queue) == 1:
+            self.writer.write(queue[0])
+        else:
+            self.writer.writelines(queue)
+
+        self.bytes_sent += self._write_queue_size
+        self.flush_count += 1
+        self._write_queue = []
+        self._write_queue_size = 0
+
+    async def drain(self) -> None:
+        """Flush the queued data and wait until the transport sends enough of it to get below the low watermark.
+
+        If the transport doesn't manage to do that within the `write_timeout`, an `asyncio.TimeoutError` is raised.
+        """
+        self.flush()
+        self.drain_count += 1
+        if self.write_timeout == float("inf"):
+            await self.writer.drain()
+        else:
+            await asyncio.wait_for(self.writer.drain(), timeout=self.write_timeout)
+
+    @property
+    def queued_bytes(self) -> int:
+        """Get the amount of bytes waiting to be sent, both in our write queue and in the transport's buffer."""
+        return self._write_queue_size + self.writer.transport.get_write_buffer_size()
 
     def close(self) -> None:
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        self.flush()
         self.writer.close()
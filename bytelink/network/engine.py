@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, ClassVar, Iterable, Optional, cast
+
+from bytelink.network.connection import Connection
+
+
+class ProtocolWriter:
+    """Writing side of the `ConnectionProtocol` connections, writing straight into the transport.
+
+    Only the parts of the `asyncio.StreamWriter` interface used by the connections are implemented, with `drain`
+    waiting for the protocol's flow control (see `ConnectionProtocol.wait_writable`).
+    """
+
+    def __init__(self, transport: asyncio.Transport, protocol: ConnectionProtocol):
+        self.transport = transport
+        self.protocol = protocol
+
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        return self.transport.get_extra_info(name, default)
+
+    def write(self, data: bytes) -> None:
+        self.transport.write(data)
+
+    def writelines(self, data: Iterable[bytes]) -> None:
+        self.transport.writelines(data)
+
+    async def drain(self) -> None:
+        await self.protocol.wait_writable()
+
+    def is_closing(self) -> bool:
+        return self.transport.is_closing()
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class ProtocolConnection(Connection[asyncio.StreamReader, asyncio.StreamWriter]):
+    """Connection which receives its data from a `ConnectionProtocol`, rather than from a stream reader.
+
+    The protocol pushes the received data directly into the receive buffer of this connection, and the readers are
+    only woken up once the buffer holds all of the data they asked for (usually a whole frame). This means reading
+    a packet doesn't go through a stream reader coroutine (and a timeout) for every received chunk.
+    """
+
+    # Once the receive buffer holds more unread data than this, we stop reading from the socket, until it's consumed
+    RECV_HIGH_WATER: ClassVar[int] = 4 * Connection.RECV_CHUNK_SIZE
+
+    def __init__(
+        self,
+        protocol: ConnectionProtocol,
+        writer: ProtocolWriter,
+        timeout: float,
+        *,
+        write_timeout: float = float("inf"),
+        write_high_water: Optional[int] = None,
+        write_low_water: Optional[int] = None,
+    ):
+        # There's no stream reader here, all of the data is fed by the protocol
+        super().__init__(
+            None,  # type: ignore
+            cast(asyncio.StreamWriter, writer),  # Implements all of the stream writer parts used by the connection
+            timeout,
+            write_timeout=write_timeout,
+            write_high_water=write_high_water,
+            write_low_water=write_low_water,
+        )
+        self.protocol = protocol
+
+        self._eof = False
+        self._reading_paused = False
+        self._waiter: Optional[asyncio.Future[None]] = None
+        self._waiting_for = 0
+
+    def _feed_data(self, data: memoryview) -> None:
+        """Store the data received by the protocol, waking up the reader if it now has everything it asked for."""
+        buf = self._recv_buffer
+        buf += data
+        self.bytes_received += len(data)
+
+        if self._waiter is not None:
+            if len(buf) >= self._waiting_for and not self._waiter.done():
+                self._waiter.set_result(None)
+            self._idle_since = self.protocol._loop.time()
+        elif len(buf) - self._recv_pos > self.RECV_HIGH_WATER and not self._reading_paused:
+            self._reading_paused = True
+            self.writer.transport.pause_reading()
+
+    def _feed_eof(self) -> None:
+        """Mark that no more data will be received, waking up the reader."""
+        self._eof = True
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _fill(self, length: int) -> None:
+        """Wait for the protocol to receive data, until there are at least `length` unread bytes in the buffer."""
+        buf = self._recv_buffer
+        if self._recv_pos:
+            del buf[: self._recv_pos]
+            self._recv_pos = 0
+
+        if len(buf) < length and not self._eof:
+            if self._reading_paused:
+                self._reading_paused = False
+                self.writer.transport.resume_reading()
+
+            self._waiting_for = length
+            self._waiter = asyncio.get_running_loop().create_future()
+            self._start_receiving()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+                self._receiving = False
+
+        if len(buf) < length:
+            if len(buf) == 0:
+                raise IOError("Server did not respond with any information.")
+            raise IOError(
+                f"Server stopped responding (got {len(buf)} bytes, but expected {length} bytes)."
+                f" Partial obtained data: {buf!r}"
+            )
+
+    def _timeout_read(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(asyncio.TimeoutError())
+
+
+class ConnectionProtocol(asyncio.BufferedProtocol):
+    """Low-level transport engine, receiving the data with `asyncio.BufferedProtocol`, rather than with streams.
+
+    The transport receives the data straight into a preallocated buffer (returned from `get_buffer`), which is reused
+    for every receive. The data is then moved over into the receive buffer of the `ProtocolConnection`, from which
+    the packets are read. The data are written straight into the transport (see `ProtocolWriter`), with the protocol
+    tracking whether the transport asked for the writing to be paused, so that `drain` can wait until it's resumed.
+
+    Once the connection is made, `on_connect` gets ran in a new task, with the connection instance.
+    """
+
+    RECV_CHUNK_SIZE: ClassVar[int] = Connection.RECV_CHUNK_SIZE
+
+    def __init__(
+        self,
+        on_connect: Callable[[ProtocolConnection], Awaitable[None]],
+        timeout: float,
+        *,
+        write_timeout: float = float("inf"),
+    ):
+        self.on_connect = on_connect
+        self.timeout = timeout
+        self.write_timeout = write_timeout
+
+        self._loop = asyncio.get_running_loop()
+        self._recv_view = memoryview(bytearray(self.RECV_CHUNK_SIZE))
+        # Writing is paused while the transport's buffer is over its high watermark, drains wait for it to be resumed
+        self._paused = False
+        self._drain_waiter: Optional[asyncio.Future[None]] = None
+        self._connection_lost = False
+        self.connection: Optional[ProtocolConnection] = None
+        self.task: Optional[asyncio.Task[None]] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        transport = cast(asyncio.Transport, transport)
+        writer = ProtocolWriter(transport, self)
+        self.connection = ProtocolConnection(self, writer, self.timeout, write_timeout=self.write_timeout)
+        self.task = self._loop.create_task(self.on_connect(self.connection))
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._recv_view
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.connection._feed_data(self._recv_view[:nbytes])  # type: ignore # connection is made at this point
+
+    def eof_received(self) -> bool:
+        self.connection._feed_eof()  # type: ignore # connection is made at this point
+        # Keep the transport open (same as with streams), the responses to the received packets can still be sent
+        return True
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._connection_lost = True
+        self._wake_drain_waiter()
+        if self.connection is not None:
+            self.connection._feed_eof()
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        self._wake_drain_waiter()
+
+    def _wake_drain_waiter(self) -> None:
+        waiter = self._drain_waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def wait_writable(self) -> None:
+        """Wait until the writing isn't paused, raising `ConnectionResetError` if the connection was lost."""
+        if self._paused and not self._connection_lost:
+            waiter = self._drain_waiter
+            if waiter is None or waiter.done():
+                waiter = self._drain_waiter = self._loop.create_future()
+            # The waiter is shared by all of the drains, a cancelled drain mustn't cancel it for the others
+            await asyncio.shield(waiter)
+        if self._connection_lost:
+            raise ConnectionResetError("Connection lost")
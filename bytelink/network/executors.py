@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+T_MARKED = TypeVar("T_MARKED")
+
+
+class ExecutionPolicy(Enum):
+    """Enum describing where should the packets be decoded, or where should the (synchronous) handlers run."""
+
+    INLINE = "inline"  # Right on the event loop thread, best for anything cheap
+    THREAD = "thread"  # In a thread pool, for work which releases the GIL (compression, hashing, I/O)
+    PROCESS = "process"  # In a process pool, for pure python CPU-heavy work (arguments and results get pickled)
+
+
+def execution_policy(policy: ExecutionPolicy) -> Callable[[T_MARKED], T_MARKED]:
+    """Mark a packet class (for decoding) or a synchronous handler function with the execution policy to use.
+
+    Functions ran in the process pool have to be importable (defined at the module level), so that they can be
+    pickled, the same goes for the packet classes decoded there.
+    """
+
+    def decorator(obj: T_MARKED) -> T_MARKED:
+        obj.__execution_policy__ = policy  # type: ignore[attr-defined]
+        return obj
+
+    return decorator
+
+
+def get_execution_policy(obj: object) -> ExecutionPolicy:
+    """Get the execution policy the packet class or function was marked with (inline by default)."""
+    return getattr(obj, "__execution_policy__", ExecutionPolicy.INLINE)
+
+
+@dataclass
+class ExecutionStats:
+    """Timing statistics of all of the work ran with a single execution policy (in seconds)."""
+
+    count: int = 0
+    run_time: float = 0.0
+    max_run_time: float = 0.0
+    # Time spent before the work started running (waiting for a free slot, pickling, executor queue)
+    wait_time: float = 0.0
+
+    @property
+    def average_run_time(self) -> float:
+        return self.run_time / self.count if self.count else 0.0
+
+    @property
+    def average_wait_time(self) -> float:
+        return self.wait_time / self.count if self.count else 0.0
+
+
+def _timed(func: Callable[..., T], *args) -> tuple[T, float]:
+    """Run the function, returning its result along with how long it took (measured where it ran)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class Executors:
+    """Thread and process pools for the work which would otherwise block the event loop, along with its timing.
+
+    The pools are only started once they're first needed. At most `max_pending` pieces of work can be submitted to
+    each of the pools at once, anything over that waits (on the event loop) for a free slot, so that the executor
+    queues stay bounded and a flood of packets turns into backpressure on the connections instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        max_pending: int = 64,
+    ):
+        if max_pending < 1:
+            raise ValueError(f"At least one pending task has to be allowed, got {max_pending}")
+
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.max_pending = max_pending
+
+        self.stats = {policy: ExecutionStats() for policy in ExecutionPolicy}
+        self._pools: dict[ExecutionPolicy, Executor] = {}
+        self._slots: dict[ExecutionPolicy, asyncio.Semaphore] = {}
+
+    def _get_pool(self, policy: ExecutionPolicy) -> Executor:
+        pool = self._pools.get(policy)
+        if pool is None:
+            if policy is ExecutionPolicy.THREAD:
+                pool = ThreadPoolExecutor(self.thread_workers, thread_name_prefix="bytelink-executor")
+            else:
+                # Forking the process with a running event loop (and possibly other threads) isn't safe
+                ctx = multiprocessing.get_context("spawn")
+                pool = ProcessPoolExecutor(self.process_workers, mp_context=ctx)
+            self._pools[policy] = pool
+        return pool
+
+    def _get_slots(self, policy: ExecutionPolicy) -> asyncio.Semaphore:
+        slots = self._slots.get(policy)
+        if slots is None:
+            slots = self._slots[policy] = asyncio.Semaphore(self.max_pending)
+        return slots
+
+    async def run(self, policy: ExecutionPolicy, func: Callable[..., T], *args) -> T:
+        """Run the function with given arguments according to the policy, recording how long it took."""
+        stats = self.stats[policy]
+        if policy is ExecutionPolicy.INLINE:
+            result, run_time = _timed(func, *args)
+            self._record(stats, run_time, 0.0)
+            return result
+
+        start = time.perf_counter()
+        async with self._get_slots(policy):
+            loop = asyncio.get_running_loop()
+            result, run_time = await loop.run_in_executor(self._get_pool(policy), _timed, func, *args)
+        self._record(stats, run_time, time.perf_counter() - start - run_time)
+        return result
+
+    def _record(self, stats: ExecutionStats, run_time: float, wait_time: float) -> None:
+        stats.count += 1
+        stats.run_time += run_time
+        stats.max_run_time = max(stats.max_run_time, run_time)
+        stats.wait_time += max(wait_time, 0.0)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop all of the started pools, they're started again if any more work gets submitted."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+        self._pools.clear()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Mapping, Optional, TYPE_CHECKING, Type, TypeVar
+
+from bytelink.network.connection import Connection
+from bytelink.packets.abc import Packet, ServerBoundPacket
+
+if TYPE_CHECKING:
+    from typing_extensions import TypeAlias
+
+# Packet handlers get the specific packet class they were registered for, so the packet isn't typed any further here
+Handler: TypeAlias = Callable[[Connection, Any], Awaitable[None]]
+# Middleware wraps the handler of each packet class once, when the dispatch table gets resolved, which means it
+# doesn't add any overhead to the packets it doesn't wrap (it can return the handler unchanged)
+Middleware: TypeAlias = Callable[[Type[ServerBoundPacket], Handler], Handler]
+
+T_FUNC = TypeVar("T_FUNC", bound=Callable[..., Any])
+
+
+def handles(*packet_classes: type[ServerBoundPacket]) -> Callable[[T_FUNC], T_FUNC]:
+    """Mark a server method as the handler of given packet classes, it's registered for every instance of the server.
+
+    The method is called with the client connection and the packet, the same way `on_packet` is.
+    """
+
+    def decorator(func: T_FUNC) -> T_FUNC:
+        func.__handles__ = packet_classes  # type: ignore[attr-defined]
+        return func
+
+    return decorator
+
+
+class HandlerRegistry:
+    """Registry of the packet handlers, resolved into a flat dispatch table keyed by the packet id.
+
+    The direction of the packets in the packet map is also only checked once, giving the table of the packets the
+    server can receive (`server_bound`), so that it doesn't have to be checked for every packet. The dispatch table
+    is resolved lazily, and again after any handler or middleware gets added.
+    """
+
+    def __init__(self, packet_map: Mapping[int, type[Packet]]):
+        self.packet_map = packet_map
+        self._handlers: dict[type[ServerBoundPacket], Handler] = {}
+        self._middleware: list[Middleware] = []
+
+        self._dispatch: Optional[dict[int, Handler]] = None
+        self._server_bound: Optional[dict[int, type[ServerBoundPacket]]] = None
+
+    def register(self, packet_cls: type[ServerBoundPacket], handler: Handler) -> None:
+        """Register the handler of given packet class, each packet class can only have a single handler."""
+        if not issubclass(packet_cls, ServerBoundPacket):
+            raise ValueError(f"Only server bound packets can be handled, got {packet_cls.__name__}")
+        if packet_cls in self._handlers:
+            raise ValueError(f"Packet {packet_cls.__name__} already has a handler: {self._handlers[packet_cls]}")
+
+        self._handlers[packet_cls] = handler
+        self._dispatch = None
+
+    def add_middleware(self, middleware: Middleware) -> None:
+        """Add middleware around all of the handlers, the middleware added first ends up being the outermost one."""
+        self._middleware.append(middleware)
+        self._dispatch = None
+
+    @property
+    def dispatch(self) -> dict[int, Handler]:
+        """Get the handlers (wrapped with the middleware) of all the handled packets, keyed by their packet id."""
+        if self._dispatch is None:
+            self._dispatch = self._resolve()
+        return self._dispatch
+
+    @property
+    def server_bound(self) -> dict[int, type[ServerBoundPacket]]:
+        """Get all of the packet classes the server can receive, keyed by their packet id."""
+        if self._server_bound is None:
+            self._server_bound = {
+                packet_id: packet_cls
+                for packet_id, packet_cls in self.packet_map.items()
+                if issubclass(packet_cls, ServerBoundPacket)
+            }
+        return self._server_bound
+
+    def _resolve(self) -> dict[int, Handler]:
+        dispatch: dict[int, Handler] = {}
+        for packet_cls, handler in self._handlers.items():
+            if self.packet_map.get(packet_cls.PACKET_ID) is not packet_cls:
+                raise ValueError(f"Packet {packet_cls.__name__} with a handler isn't in the packet map")
+
+            for middleware in reversed(self._middleware):
+                handler = middleware(packet_cls, handler)
+            dispatch[packet_cls.PACKET_ID] = handler
+        return dispatch
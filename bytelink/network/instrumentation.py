@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from bytelink.network.connection import Connection
+from bytelink.packets.abc import Packet
+from bytelink.utils.metrics import Counter, Histogram, MetricsRegistry
+
+if TYPE_CHECKING:
+    from bytelink.network.server import BaseServer
+
+
+class ServerMetrics:
+    """Metrics of a single server, registered into the given metrics registry.
+
+    Per-packet metrics are updated as the packets are received, handled and sent, with the metric objects of each
+    packet class only being looked up once. Everything which can be computed from the current state of the server
+    (connections, bytes transferred, queues) is only collected when the metrics are snapshotted, so it costs nothing
+    in between.
+    """
+
+    def __init__(self, registry: MetricsRegistry, server: BaseServer):
+        self.registry = registry
+        self.server = server
+
+        self._received: dict[type[Packet], tuple[Counter, Histogram]] = {}
+        self._handled: dict[type[Packet], Histogram] = {}
+        self._sent: dict[type[Packet], Counter] = {}
+
+        self.connections_total = registry.counter("bytelink_connections_total", "Connections accepted by the server")
+        self.connections_active = registry.gauge("bytelink_connections_active", "Currently open connections")
+        self.bytes_received = registry.counter("bytelink_received_bytes_total", "Bytes received from the clients")
+        self.bytes_sent = registry.counter("bytelink_sent_bytes_total", "Bytes sent to the clients")
+        self.write_queue_bytes = registry.gauge(
+            "bytelink_write_queue_bytes",
+            "Bytes waiting to be sent, across all of the connections",
+        )
+        self.handshaking = registry.gauge("bytelink_handshaking_connections", "Connections doing their handshake")
+        self.handshake_queue = registry.gauge(
+            "bytelink_handshake_queue_connections",
+            "Connections waiting for a free handshake slot",
+        )
+        # Bytes transferred by the already closed connections, the open ones are added to these when collecting
+        self._closed_bytes_received = 0
+        self._closed_bytes_sent = 0
+
+        registry.add_collector(self.collect)
+
+    def received(self, packet_cls: type[Packet], decode_time: float) -> None:
+        """Record a received packet, along with how long it took to decode it."""
+        metrics = self._received.get(packet_cls)
+        if metrics is None:
+            name = packet_cls.__name__
+            metrics = self._received[packet_cls] = (
+                self.registry.counter("bytelink_packets_received_total", "Packets received", packet=name),
+                self.registry.histogram("bytelink_decode_seconds", "Time spent decoding packets", packet=name),
+            )
+        metrics[0].inc()
+        metrics[1].observe(decode_time)
+
+    def handled(self, packet_cls: type[Packet], handle_time: float) -> None:
+        """Record how long it took to handle a received packet."""
+        histogram = self._handled.get(packet_cls)
+        if histogram is None:
+            histogram = self._handled[packet_cls] = self.registry.histogram(
+                "bytelink_handler_seconds",
+                "Time spent handling packets",
+                packet=packet_cls.__name__,
+            )
+        histogram.observe(handle_time)
+
+    def sent(self, packet_cls: type[Packet], count: int = 1) -> None:
+        """Record sent packets (`count` of them for broadcasts)."""
+        counter = self._sent.get(packet_cls)
+        if counter is None:
+            counter = self._sent[packet_cls] = self.registry.counter(
+                "bytelink_packets_sent_total",
+                "Packets sent",
+                packet=packet_cls.__name__,
+            )
+        counter.inc(count)
+
+    def connection_closed(self, client_conn: Connection) -> None:
+        self._closed_bytes_received += client_conn.bytes_received
+        self._closed_bytes_sent += client_conn.bytes_sent
+
+    def collect(self) -> None:
+        """Update the metrics computed from the current state of the server."""
+        connections = self.server.connections
+        self.connections_total.set(self.server.total_connections)
+        self.connections_active.set(len(connections))
+        self.bytes_received.set(self._closed_bytes_received + sum(conn.bytes_received for conn in connections))
+        self.bytes_sent.set(self._closed_bytes_sent + sum(conn.bytes_sent for conn in connections))
+        self.write_queue_bytes.set(sum(conn.queued_bytes for conn in connections))
+
+        occupancy = self.server.admission.occupancy
+        self.handshaking.set(occupancy.handshaking)
+        self.handshake_queue.set(occupancy.handshake_queue)
+        for reason, count in occupancy.rejected.items():
+            self.registry.counter(
+                "bytelink_rejected_connections_total",
+                "Connections refused by the admission controller",
+                reason=reason.name.lower(),
+            ).set(count)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from bytelink.exceptions import DisconnectError
+from bytelink.network.connection import Connection
+from bytelink.packets.abc import Packet
+
+T_PACKET = TypeVar("T_PACKET", bound=Packet)
+
+
+@dataclass(frozen=True)
+class PipelineOptions:
+    """Settings of the concurrent packet handling pipeline, used for each connection.
+
+    `workers` is the amount of packets handled at once, `queue_size` is the amount of read packets which can wait
+    to be handled, before reading gets paused. With `ordered`, the responses are sent out in the same order as the
+    packets they respond to were received, even if their handlers finish in a different order.
+    """
+
+    workers: int = 4
+    queue_size: int = 16
+    ordered: bool = True
+
+
+class WriteSink:
+    """Collects the frames written for a single packet, while it's being handled by the ordered pipeline."""
+
+    __slots__ = ("connection", "frames")
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.frames: list[bytes] = []
+
+
+# Write sink of the packet handled by the current worker task, if the pipeline is ordered
+_current_sink: ContextVar[Optional[WriteSink]] = ContextVar("_current_sink", default=None)
+
+
+def current_write_sink(connection: Connection) -> Optional[WriteSink]:
+    """Get the write sink for given connection, if the current task is handling its packet in an ordered pipeline."""
+    sink = _current_sink.get()
+    if sink is not None and sink.connection is connection:
+        return sink
+    return None
+
+
+class PacketPipeline(Generic[T_PACKET]):
+    """Concurrent handling of the packets received over a single connection.
+
+    A reader task keeps reading the packets and putting them into a bounded queue, from which they're taken by the
+    worker tasks and handled. Once the queue is full, the reader waits, which stops reading from the socket and lets
+    TCP push back on the client. In ordered mode, the frames written while handling a packet are held back, until
+    all of the previously received packets were handled, and then sent out in order.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        read: Callable[[], Awaitable[Optional[T_PACKET]]],
+        handle: Callable[[T_PACKET], Awaitable[None]],
+        options: PipelineOptions,
+    ):
+        if options.workers < 1 or options.queue_size < 1:
+            raise ValueError(f"Pipeline needs at least one worker and a queue size of at least 1, got {options}")
+
+        self.connection = connection
+        self.options = options
+        self._read = read
+        self._handle = handle
+        self._queue: asyncio.Queue[tuple[int, T_PACKET]] = asyncio.Queue(options.queue_size)
+
+        self._next_seq = 0
+        self._next_write_seq = 0
+        self._completed: dict[int, list[bytes]] = {}
+
+    async def run(self) -> None:
+        """Run the pipeline until the connection gets disconnected, raising the `DisconnectError`."""
+        tasks = [asyncio.create_task(self._read_loop())]
+        tasks.extend(asyncio.create_task(self._work_loop()) for _ in range(self.options.workers))
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                exc = task.exception()
+                if exc is not None:
+                    raise exc
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                packet = await self._read()
+                if packet is None:
+                    continue
+                await self._queue.put((self._next_seq, packet))
+                self._next_seq += 1
+        except DisconnectError:
+            # Let the workers handle the packets which were already received before the connection ends
+            await self._queue.join()
+            raise
+
+    async def _work_loop(self) -> None:
+        while True:
+            seq, packet = await self._queue.get()
+            try:
+                if self.options.ordered:
+                    await self._handle_ordered(seq, packet)
+                else:
+                    await self._handle(packet)
+            finally:
+                self._queue.task_done()
+
+    async def _handle_ordered(self, seq: int, packet: T_PACKET) -> None:
+        sink = WriteSink(self.connection)
+        token = _current_sink.set(sink)
+        try:
+            await self._handle(packet)
+        finally:
+            _current_sink.reset(token)
+            self._complete(seq, sink.frames)
+
+        if self.connection.queued_bytes > self.connection.write_high_water:
+            await self.connection.drain()
+
+    def _complete(self, seq: int, frames: list[bytes]) -> None:
+        """Mark the packet as handled, sending out the frames of all of the handled packets which are next in order."""
+        self._completed[seq] = frames
+        while self._next_write_seq in self._completed:
+            for frame in self._completed.pop(self._next_write_seq):
+                self.connection.write_nowait(frame)
+            self._next_write_seq += 1
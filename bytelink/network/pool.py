@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from bytelink.exceptions import DisconnectError, MalformedPacketError
+from bytelink.network.client import Client
+from bytelink.network.transport import AddressType
+from bytelink.packets.abc import RequestPacket, ResponsePacket
+from bytelink.packets.compression import Compression
+from bytelink.packets.ping import Ping, Pong
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """Statistics of a client pool."""
+
+    acquired: int = 0
+    created: int = 0
+    reused: int = 0
+    evicted: int = 0
+    failed_checks: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        """Get the average time spent waiting for a free client in `acquire` (in seconds)."""
+        return self.total_wait / self.acquired if self.acquired else 0.0
+
+
+class _AddressPool:
+    """Clients connected to a single server address."""
+
+    def __init__(self, max_size: int):
+        # Limits the amount of clients in use, idle clients are only ever kept while they're not in use
+        self.semaphore = asyncio.Semaphore(max_size)
+        # Idle clients along with the (loop) time they were last used at, the most recently used ones are at the end
+        self.idle: deque[tuple[Client, float]] = deque()
+        self.in_use = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.idle) + self.in_use
+
+
+class ClientPool:
+    """Pool of connected (already handshaked) clients, reused across calls to the same server addresses.
+
+    At most `max_size` clients are open for each of the addresses, when all of them are in use, `acquire` waits
+    for one to be released (the time spent waiting is tracked in `stats`). Clients which were idle for longer than
+    `check_interval` are pinged before being handed out, and the ones which don't respond in time are replaced.
+    The maintenance task (see `start`) periodically closes clients idle for longer than `idle_timeout` (keeping
+    at least `min_size` of them open), checks the remaining idle ones and opens new clients up to `min_size`.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float,
+        min_size: int = 0,
+        max_size: int = 10,
+        idle_timeout: float = 60.0,
+        check_interval: float = 10.0,
+        acquire_timeout: Optional[float] = None,
+        compression: Optional[Compression] = None,
+    ):
+        if max_size < 1 or not 0 <= min_size <= max_size:
+            raise ValueError(f"Invalid pool size limits (min_size={min_size}, max_size={max_size})")
+
+        self.timeout = timeout
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.acquire_timeout = acquire_timeout
+        self.compression = compression
+
+        self.stats = PoolStats()
+        self._pools: dict[AddressType, _AddressPool] = {}
+        self._maintenance_task: Optional[asyncio.Task[None]] = None
+        self._closed = False
+
+    def _get_pool(self, address: AddressType) -> _AddressPool:
+        pool = self._pools.get(address)
+        if pool is None:
+            pool = self._pools[address] = _AddressPool(self.max_size)
+        return pool
+
+    async def _connect(self, address: AddressType) -> Client:
+        client = await Client.create(address, self.timeout, compression=self.compression)
+        try:
+            await client.connect()
+        except BaseException:
+            client.close()
+            raise
+        self.stats.created += 1
+        return client
+
+    async def _check(self, client: Client) -> bool:
+        """Check that the client is still connected and that the server responds to it."""
+        if not client.is_connected:
+            return False
+        try:
+            response = await client.request(Ping("health-check"), timeout=self.timeout)
+        except Exception as exc:
+            log.debug("Health check of pooled client for %s failed: %r", client.address, exc)
+            return False
+        return isinstance(response, Pong)
+
+    async def acquire(self, address: AddressType) -> Client:
+        """Get a connected client for given server address, reusing an idle one if possible.
+
+        The client has to be returned back to the pool with `release` once it's no longer needed.
+        """
+        if self._closed:
+            raise RuntimeError("Client pool is closed")
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool(address)
+        start = loop.time()
+        await asyncio.wait_for(pool.semaphore.acquire(), timeout=self.acquire_timeout)
+        wait = loop.time() - start
+        self.stats.acquired += 1
+        self.stats.total_wait += wait
+        self.stats.max_wait = max(self.stats.max_wait, wait)
+
+        pool.in_use += 1
+        try:
+            while pool.idle:
+                client, last_used = pool.idle.pop()
+                if loop.time() - last_used < self.check_interval and client.is_connected:
+                    self.stats.reused += 1
+                    return client
+                if await self._check(client):
+                    self.stats.reused += 1
+                    return client
+                self.stats.failed_checks += 1
+                client.close()
+            return await self._connect(address)
+        except BaseException:
+            pool.in_use -= 1
+            pool.semaphore.release()
+            raise
+
+    def release(self, client: Client) -> None:
+        """Return the client back to the pool, closing it if it's no longer connected or if the pool is closed."""
+        pool = self._pools[client.address]
+        pool.in_use -= 1
+        pool.semaphore.release()
+
+        if self._closed or not client.is_connected:
+            client.close()
+            return
+        pool.idle.append((client, asyncio.get_running_loop().time()))
+
+    @asynccontextmanager
+    async def client(self, address: AddressType) -> AsyncIterator[Client]:
+        """Acquire a client for given server address, releasing it back to the pool once the context exits."""
+        client = await self.acquire(address)
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    async def request(self, address: AddressType, packet: RequestPacket) -> ResponsePacket:
+        """Send the request to given server address, using a pooled client, and wait for the response."""
+        async with self.client(address) as client:
+            return await client.request(packet)
+
+    async def maintain(self) -> None:
+        """Evict the clients idle for too long, check the other idle ones and open new ones up to `min_size`."""
+        loop = asyncio.get_running_loop()
+        # New addresses can get added by `acquire` while we're waiting on the checks
+        for address, pool in list(self._pools.items()):
+            now = loop.time()
+            kept: list[tuple[Client, float]] = []
+            # Go over the least recently used clients first, evicting them while there are enough other clients
+            while pool.idle:
+                client, last_used = pool.idle.popleft()
+                if now - last_used > self.idle_timeout and pool.size + len(kept) >= self.min_size:
+                    self.stats.evicted += 1
+                    client.close()
+                    continue
+                kept.append((client, last_used))
+
+            for client, last_used in kept:
+                if now - last_used < self.check_interval:
+                    pool.idle.append((client, last_used))
+                elif await self._check(client):
+                    pool.idle.append((client, loop.time()))
+                else:
+                    self.stats.failed_checks += 1
+                    client.close()
+
+            while pool.size < self.min_size and not self._closed:
+                try:
+                    client = await self._connect(address)
+                except (OSError, asyncio.TimeoutError, DisconnectError, MalformedPacketError) as exc:
+                    log.warning("Failed to open a pooled client for %s: %r", address, exc)
+                    break
+                pool.idle.append((client, loop.time()))
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.maintain()
+            except Exception:
+                # Keep maintaining the pool, a single failed round shouldn't stop it for good
+                log.exception("Client pool maintenance failed")
+
+    async def start(self, *addresses: AddressType) -> None:
+        """Open `min_size` clients for each of the given addresses, and start the maintenance task."""
+        for address in addresses:
+            self._get_pool(address)
+        await self.maintain()
+        self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def close(self) -> None:
+        """Close all of the idle clients, the ones in use are closed once they're released."""
+        self._closed = True
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            await asyncio.gather(self._maintenance_task, return_exceptions=True)
+
+        for pool in self._pools.values():
+            while pool.idle:
+                client, _ = pool.idle.pop()
+                client.close()
+
+    async def __aenter__(self) -> ClientPool:
+        return self
+
+    async def __aexit__(self, *args, **kwargs) -> None:
+        await self.close()
@@ -2,37 +2,172 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import socket
+import time
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Union, cast
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Callable, ClassVar, Literal, Optional, TYPE_CHECKING, TypeVar, Union, cast
 
 from bytelink.config import PROTOCOL_VERSION
 from bytelink.exceptions import DisconnectError, MalformedPacketError, MalformedPacketState, ProcessingError, ReadError
+from bytelink.network.admission import AdmissionController, AdmissionRejected, RejectReason
 from bytelink.network.connection import Connection
-from bytelink.packets import read_packet, write_packet
+from bytelink.network.engine import ConnectionProtocol
+from bytelink.network.executors import ExecutionPolicy, Executors, get_execution_policy
+from bytelink.network.handlers import Handler, HandlerRegistry, Middleware, handles
+from bytelink.network.instrumentation import ServerMetrics
+from bytelink.network.pipeline import PacketPipeline, PipelineOptions, current_write_sink
+from bytelink.network.transport import AddressType, address_host, create_server
+from bytelink.packets import PACKET_MAP, decode_packet, encode_frame, peek_packet_id, read_frame, write_packet
 from bytelink.packets.abc import ClientBoundPacket, ServerBoundPacket
-from bytelink.packets.handshaking import Handshake
+from bytelink.packets.compression import Compression
+from bytelink.packets.disconnect import Disconnect
+from bytelink.packets.handshaking import Handshake, SetCompression
 from bytelink.packets.ping import Ping, Pong
+from bytelink.utils.log import RateLimitedAdapter
+from bytelink.utils.metrics import MetricsRegistry
 
 if TYPE_CHECKING:
     from typing_extensions import Self
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+T_HANDLER = TypeVar("T_HANDLER", bound=Handler)
+
+
+class BroadcastPolicy(Enum):
+    """Enum describing how should broadcasts treat slow consumers (connections over their write high watermark)."""
+
+    QUEUE = "queue"  # Send the packet anyway, queueing even more data on the connection
+    SKIP = "skip"  # Don't send the packet to the slow connection
+    DISCONNECT = "disconnect"  # Close the slow connection
+
+
+@dataclass
+class BroadcastStats:
+    """Delivery statistics of a single broadcast."""
+
+    recipients: int = 0
+    delivered: int = 0
+    skipped: int = 0
+    dropped: int = 0
+    frame_size: int = 0
+
+    @property
+    def bytes_queued(self) -> int:
+        """Total amount of bytes queued to be sent, across all of the connections."""
+        return self.delivered * self.frame_size
+
 
 class BaseServer(ABC):
-    def __init__(self, address: tuple[str, int], timeout: float):
+    # Log messages allowed per second (and in a single burst), for each connection (see `connection_log`)
+    LOG_RATE: ClassVar[float] = 5.0
+    LOG_BURST: ClassVar[int] = 20
+    # How often to check whether all of the connections were closed, while shutting down
+    DRAIN_CHECK_INTERVAL: ClassVar[float] = 0.1
+    # Names of the methods marked as packet handlers (see `handles`), collected from the whole class hierarchy
+    _HANDLER_METHODS: ClassVar[dict[type[ServerBoundPacket], str]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        handler_methods = dict(cls._HANDLER_METHODS)
+        for name, value in vars(cls).items():
+            for packet_cls in getattr(value, "__handles__", ()):
+                handler_methods[packet_cls] = name
+        cls._HANDLER_METHODS = handler_methods
+
+    def __init__(
+        self,
+        address: AddressType,
+        timeout: float,
+        *,
+        handshake_timeout: float = float("inf"),
+        write_timeout: float = float("inf"),
+        admission: Optional[AdmissionController] = None,
+        pipeline: Optional[PipelineOptions] = None,
+        compression: Optional[Compression] = None,
+        executors: Optional[Executors] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
         self.address = address
+        # Read idle timeout for the client connections
         self.timeout = timeout
+        # Maximum time for the whole `on_connect` event (handshake), and for clients to accept the sent data
+        self.handshake_timeout = handshake_timeout
+        self.write_timeout = write_timeout
+        self.admission = AdmissionController() if admission is None else admission
+        # Handle multiple packets of each connection concurrently, rather than one by one (opt-in)
+        self.pipeline = pipeline
+        # Compression offered to the clients which support it (see `negotiate_compression`), `None` disables it
+        self.compression = compression
+        # Pools for decoding the packets and running the handlers off the event loop (see `ExecutionPolicy`)
+        self.executors = Executors() if executors is None else executors
+        # Instrumentation is skipped entirely (apart from a single check) when there's no metrics registry
+        self.metrics = None if metrics is None else ServerMetrics(metrics, self)
+        self.handlers = HandlerRegistry(PACKET_MAP)
+        for packet_cls, method_name in self._HANDLER_METHODS.items():
+            self.handlers.register(packet_cls, getattr(self, method_name))
+        # How the data is received from the clients, see `create`
+        self.engine: Literal["streams", "protocol"] = "streams"
         self._server: asyncio.Server = None  # type: ignore # Will be set later
 
-    @classmethod
-    async def create(cls, bind_address: tuple[str, int], timeout: float) -> Self:
-        obj = cls(bind_address, timeout)
-        server = await asyncio.start_server(obj._on_connect_callback, bind_address[0], bind_address[1])
-        obj._server = server
+        self.connections: set[Connection] = set()
+        # Connections which finished `on_connect` (handshake), only these get the broadcasts sent to everyone
+        self.ready_connections: set[Connection] = set()
+        self.total_connections = 0
+        # Named groups (rooms) of connections, to which packets can be broadcasted
+        self.groups: dict[str, set[Connection]] = {}
+        self._connection_groups: dict[Connection, set[str]] = {}
+        # Rate limited loggers, for the messages about a single connection, and for the refused connections
+        self._connection_logs: dict[Connection, RateLimitedAdapter] = {}
+        self._reject_log = RateLimitedAdapter(log, self.LOG_RATE, self.LOG_BURST)
 
+    @classmethod
+    async def create(
+        cls,
+        bind_address: AddressType,
+        timeout: float,
+        *,
+        engine: Literal["streams", "protocol"] = "streams",
+        reuse_port: bool = False,
+        **kwargs,
+    ) -> Self:
+        """Create the server, bound to given address (a `(host, port)` pair, or a path of a Unix domain socket).
+
+        The `engine` determines how the data is received from the clients, either with asyncio streams, or with
+        the lower level `ConnectionProtocol`, which avoids the stream reader overhead for every read.
+        With `reuse_port`, multiple servers (processes) can be bound to the same address, see `Supervisor`.
+        Any other keyword arguments are passed over to the server's `__init__`.
+        """
+        if engine not in ("streams", "protocol"):
+            raise ValueError(f"Unknown server engine: {engine!r}")
+
+        obj = cls(bind_address, timeout, **kwargs)
+        obj.engine = engine
+        obj._server = await create_server(obj._make_protocol, bind_address, reuse_port=reuse_port)
         return obj
 
+    def _make_protocol(self) -> asyncio.BaseProtocol:
+        """Make the protocol for a new client connection, according to the server's engine."""
+        if self.engine == "protocol":
+            return ConnectionProtocol(self._handle_connection, self.timeout, write_timeout=self.write_timeout)
+
+        # Same as what asyncio.start_server does for every connection
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(loop=loop)
+        return asyncio.StreamReaderProtocol(reader, self._on_connect_callback, loop=loop)
+
+    async def connect_socket(self, sock: socket.socket) -> None:
+        """Handle an already connected socket (e.g. one end of `socket.socketpair`) as a new client connection.
+
+        This allows in-process clients to talk to the server without it listening on any address, see
+        `Client.create_socketpair`.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.connect_accepted_socket(self._make_protocol, sock)
+
     async def __aenter__(self) -> Self:
         if self._server is None:
             raise ValueError("Server not set! (use Server.create when making class new instances)")
@@ -42,24 +177,193 @@ class BaseServer(ABC):
 
     async def __aexit__(self, *args, **kwargs) -> None:
         await self._server.__aexit__(*args, **kwargs)
+        self.executors.shutdown()
 
     async def listen(self) -> None:
         """Start listening for connections until the server is closed."""
         async with self:
             await self._server.wait_closed()
 
+    async def shutdown(self, timeout: float) -> None:
+        """Stop accepting new connections, wait up to `timeout` seconds for the open ones to close, then close the rest.
+
+        This lets the clients finish what they're doing (and disconnect on their own), rather than dropping them.
+        """
+        self._server.close()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.connections and loop.time() < deadline:
+            await asyncio.sleep(min(self.DRAIN_CHECK_INTERVAL, max(deadline - loop.time(), 0)))
+        self.close()
+
+    def close(self) -> None:
+        """Stop accepting new connections and close all of the currently open ones."""
+        self._server.close()
+        for client_conn in list(self.connections):
+            client_conn.close()
+        self.executors.shutdown()
+
     async def read_packet(self, client_conn: Connection) -> ServerBoundPacket:
-        """Read incoming packet from the client connection."""
-        packet = await read_packet(client_conn)
+        """Read incoming packet from the client connection.
+
+        The packet is decoded according to the execution policy its class was marked with (see `execution_policy`).
+        """
+        data = await read_frame(client_conn, compression=client_conn.compression)
+        packet_id = peek_packet_id(data)
+        packet_cls = None if packet_id is None else self.handlers.server_bound.get(packet_id)
+        if packet_cls is None:
+            if packet_id is not None and packet_id in PACKET_MAP:
+                # Client bound packet, there's no point in decoding it only to reject it
+                raise MalformedPacketError(MalformedPacketState.UNEXPECTED_PACKET, packet_id=packet_id)
+            # Decoding raises the appropriate error for invalid and unknown packet ids
+            decode_packet(data)
+
+        policy = get_execution_policy(packet_cls)
+        if policy is ExecutionPolicy.PROCESS:
+            data = bytes(data)  # Views over the data can't be sent over to another process
+
+        if self.metrics is None:
+            return cast(ServerBoundPacket, await self.executors.run(policy, decode_packet, data))
+        start = time.perf_counter()
+        packet = await self.executors.run(policy, decode_packet, data)
+        self.metrics.received(packet_cls, time.perf_counter() - start)
+        return cast(ServerBoundPacket, packet)
 
-        if not isinstance(packet, ServerBoundPacket):
-            raise MalformedPacketError(MalformedPacketState.UNEXPECTED_PACKET, packet=packet)
+    async def write_packet(self, client_conn: Connection, packet: ClientBoundPacket) -> None:
+        """Send given packet to the client connection.
 
-        return packet
+        When the packet is sent as a response from the ordered pipeline, it's held back until all of the responses
+        to the previously received packets were sent (see `PipelineOptions`).
+        """
+        if self.metrics is not None:
+            self.metrics.sent(type(packet))
 
-    async def write_packet(self, client_conn: Connection, packet: ClientBoundPacket) -> None:
-        """Send given packet to the client connection."""
-        await write_packet(client_conn, packet)
+        sink = current_write_sink(client_conn)
+        if sink is not None:
+            sink.frames.append(bytes(encode_frame(packet, client_conn.compression)))
+            return
+        await write_packet(client_conn, packet, compression=client_conn.compression)
+
+    def handler(self, *packet_classes: type[ServerBoundPacket]) -> Callable[[T_HANDLER], T_HANDLER]:
+        """Decorator registering the function as the handler of given packet classes.
+
+        The function is called with the client connection and the packet, the same way `on_packet` is. For example:
+
+            @server.handler(Ping)
+            async def on_ping(client_conn: Connection, packet: Ping) -> None:
+                ...
+        """
+
+        def decorator(func: T_HANDLER) -> T_HANDLER:
+            for packet_cls in packet_classes:
+                self.handlers.register(packet_cls, func)
+            return func
+
+        return decorator
+
+    def middleware(self, middleware: Middleware) -> Middleware:
+        """Add middleware around the packet handlers (usable as a decorator), see `HandlerRegistry.add_middleware`."""
+        self.handlers.add_middleware(middleware)
+        return middleware
+
+    async def offload(self, func: Callable[..., T], *args, policy: Optional[ExecutionPolicy] = None) -> T:
+        """Run the synchronous function with given arguments off the event loop, returning its result.
+
+        The function runs according to the given policy, or the one it was marked with (see `execution_policy`).
+        Results are returned back to the awaiting handler, so they can be sent with `write_packet` as usual.
+        """
+        return await self.executors.run(get_execution_policy(func) if policy is None else policy, func, *args)
+
+    async def negotiate_compression(self, client_conn: Connection, handshake: Handshake) -> None:
+        """Enable compression for the client connection, if the client supports it (should be called on handshake).
+
+        The client is told about the compression settings with the `SetCompression` packet, and all of the following
+        packets (in both directions) are then sent in the compressed format. The preset dictionary is only used if
+        the client has the same one.
+        """
+        if not handshake.compression:
+            return
+        if self.compression is None:
+            await write_packet(client_conn, SetCompression(-1, 0))
+            return
+
+        compression = self.compression
+        if compression.zdict is not None and handshake.dictionary_id != compression.dictionary_id:
+            compression = replace(compression, zdict=None)
+        await write_packet(client_conn, SetCompression(compression.threshold, compression.dictionary_id))
+        client_conn.compression = compression
+
+    def connection_log(self, client_conn: Connection) -> RateLimitedAdapter:
+        """Get the logger for the messages about given connection, rate limited to `LOG_RATE` messages per second.
+
+        This keeps a single misbehaving client (e.g. sending a flood of invalid packets) from flooding the logs.
+        """
+        conn_log = self._connection_logs.get(client_conn)
+        if conn_log is None:
+            conn_log = self._connection_logs[client_conn] = RateLimitedAdapter(log, self.LOG_RATE, self.LOG_BURST)
+        return conn_log
+
+    def join_group(self, client_conn: Connection, group: str) -> None:
+        """Add the client connection to given group, it's removed from it automatically once it's closed."""
+        self.groups.setdefault(group, set()).add(client_conn)
+        self._connection_groups.setdefault(client_conn, set()).add(group)
+
+    def leave_group(self, client_conn: Connection, group: str) -> None:
+        """Remove the client connection from given group, removing the group itself once it's empty."""
+        members = self.groups.get(group)
+        if members is not None:
+            members.discard(client_conn)
+            if not members:
+                del self.groups[group]
+
+        conn_groups = self._connection_groups.get(client_conn)
+        if conn_groups is not None:
+            conn_groups.discard(group)
+            if not conn_groups:
+                del self._connection_groups[client_conn]
+
+    def broadcast(
+        self,
+        packet: ClientBoundPacket,
+        group: Optional[str] = None,
+        *,
+        policy: BroadcastPolicy = BroadcastPolicy.SKIP,
+        exclude: Optional[Connection] = None,
+    ) -> BroadcastStats:
+        """Send given packet to all connections in given group (or to all of the ready connections if it isn't given).
+
+        The packet is only encoded once (for each of the compression settings used by the connections), and the same
+        immutable frame is queued on every one of the connections, without waiting for any of them. Connections which
+        already have too much data waiting to be sent (over their write high watermark) are handled according to the
+        `policy`.
+        """
+        targets = self.ready_connections if group is None else self.groups.get(group, ())
+        frames: dict[Optional[Compression], bytes] = {None: bytes(encode_frame(packet))}
+        stats = BroadcastStats(frame_size=len(frames[None]))
+
+        for client_conn in list(targets):
+            if client_conn is exclude or client_conn.writer.is_closing():
+                continue
+            stats.recipients += 1
+
+            if policy is not BroadcastPolicy.QUEUE and client_conn.queued_bytes > client_conn.write_high_water:
+                if policy is BroadcastPolicy.SKIP:
+                    stats.skipped += 1
+                else:
+                    log.warning("Disconnecting slow consumer %s (broadcast backlog)", client_conn.peer_address)
+                    client_conn.close()
+                    stats.dropped += 1
+                continue
+
+            frame = frames.get(client_conn.compression)
+            if frame is None:
+                frame = frames[client_conn.compression] = bytes(encode_frame(packet, client_conn.compression))
+            client_conn.write_nowait(frame)
+            stats.delivered += 1
+
+        if self.metrics is not None and stats.delivered:
+            self.metrics.sent(type(packet), stats.delivered)
+        return stats
 
     async def _on_connect_callback(
         self,
@@ -67,10 +371,52 @@ class BaseServer(ABC):
         client_writer: asyncio.StreamWriter,
     ) -> None:
         """This function is ran as a callback whenever a new client connects to the server."""
-        client_conn = Connection(client_reader, client_writer, self.timeout)
+        client_conn = Connection(client_reader, client_writer, self.timeout, write_timeout=self.write_timeout)
+        await self._handle_connection(client_conn)
+
+    async def _handle_connection(self, client_conn: Connection) -> None:
+        """Handle the whole lifetime of a client connection, regardless of the engine it was made with."""
+        host = address_host(client_conn.peer_address)
+        reason = self.admission.admit(host)
+        if reason is not None:
+            self._reject_log.warning("Refusing connection from %s: %s", client_conn.peer_address, reason.value)
+            self._reject(client_conn, reason)
+            return
 
+        self.connections.add(client_conn)
+        self.total_connections += 1
         try:
-            await self.on_connect(client_conn)
+            await self._run_connection(client_conn)
+        finally:
+            self.connections.discard(client_conn)
+            self.ready_connections.discard(client_conn)
+            for group in list(self._connection_groups.get(client_conn, ())):
+                self.leave_group(client_conn, group)
+            self.admission.release(host)
+            self._connection_logs.pop(client_conn, None)
+            if self.metrics is not None:
+                self.metrics.connection_closed(client_conn)
+
+    def _reject(self, client_conn: Connection, reason: RejectReason) -> None:
+        """Quickly tell the client why it can't connect and close the connection, without waiting on anything."""
+        client_conn.write_nowait(encode_frame(Disconnect(reason.value)))
+        client_conn.close()
+
+    async def _run_connection(self, client_conn: Connection) -> None:
+        """Run the connection events (`on_connect`, then `on_packet` for every packet), until a disconnect."""
+        try:
+            async with self.admission.handshake():
+                if self.handshake_timeout == float("inf"):
+                    await self.on_connect(client_conn)
+                else:
+                    try:
+                        await asyncio.wait_for(self.on_connect(client_conn), timeout=self.handshake_timeout)
+                    except asyncio.TimeoutError:
+                        raise DisconnectError("Handshake timed out")
+        except AdmissionRejected as exc:
+            self._reject_log.warning("Refusing connection from %s: %s", client_conn.peer_address, exc.reason.value)
+            self._reject(client_conn, exc.reason)
+            return
         except DisconnectError as exc:
             try:
                 await self.on_close(client_conn, exc)
@@ -78,32 +424,55 @@ class BaseServer(ABC):
             finally:
                 client_conn.close()
 
-        while True:
+        self.ready_connections.add(client_conn)
+        try:
+            if self.pipeline is None:
+                while True:
+                    await self._process_packet(client_conn)
+            else:
+                pipeline = PacketPipeline(
+                    client_conn,
+                    lambda: self._receive_packet(client_conn),
+                    lambda packet: self._handle_packet(client_conn, packet),
+                    self.pipeline,
+                )
+                await pipeline.run()
+        except DisconnectError as exc:
             try:
-                await self._process_packet(client_conn)
-            except DisconnectError as exc:
-                try:
-                    await self.on_close(client_conn, exc)
-                    break
-                finally:
-                    client_conn.close()
+                await self.on_close(client_conn, exc)
+            finally:
+                client_conn.close()
 
     async def _process_packet(self, client_conn: Connection) -> None:
         """Listen for a single incoming packet from client and handle it."""
+        packet = await self._receive_packet(client_conn)
+        if packet is not None:
+            await self._handle_packet(client_conn, packet)
+
+    async def _receive_packet(self, client_conn: Connection) -> Optional[ServerBoundPacket]:
+        """Read a single incoming packet from the client, returning `None` if the read failed and was handled."""
         try:
-            packet = await self.read_packet(client_conn)
+            return await self.read_packet(client_conn)
         except DisconnectError as exc:
             raise exc
         except Exception as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                raise DisconnectError("Timed out")
             if isinstance(exc, MalformedPacketError) and exc.state is MalformedPacketState.NO_DATA:
                 ioerr = cast(IOError, exc.ioerror)
+                # Since python 3.11, asyncio.TimeoutError is an IOError, which means it gets wrapped by read_packet
+                if isinstance(ioerr, asyncio.TimeoutError):
+                    raise DisconnectError("Timed out")
                 if ioerr.args[0] == "Server did not respond with any information.":
                     raise DisconnectError("Timed out")
 
             err = ReadError(exc, "Unexpected error while reading packet")
             await self.on_error(client_conn, err)
-            return
+            return None
 
+    async def _handle_packet(self, client_conn: Connection, packet: ServerBoundPacket) -> None:
+        """Handle a single packet received from the client."""
+        start = 0.0 if self.metrics is None else time.perf_counter()
         try:
             await self.on_packet(client_conn, packet)
         except DisconnectError as exc:
@@ -111,6 +480,11 @@ class BaseServer(ABC):
         except Exception as exc:
             err = ProcessingError(exc, "Unexpected error while processing packet")
             await self.on_error(client_conn, err)
+        finally:
+            if self.metrics is not None:
+                self.metrics.handled(type(packet), time.perf_counter() - start)
+            # Allow the instance to be reused for another packet (only if the packet class has pooling enabled)
+            packet.release()
 
     @abstractmethod
     async def on_connect(self, client_conn: Connection) -> None:
@@ -124,59 +498,71 @@ class BaseServer(ABC):
     async def on_close(self, client_conn: Connection, disconnect_exc: DisconnectError) -> None:
         """Event called right before client disconnection."""
 
-    @abstractmethod
     async def on_packet(self, client_conn: Connection, packet: ServerBoundPacket) -> None:
-        """Event called on receiving a packet from the client."""
+        """Event called on receiving a packet from the client, dispatching it to the registered handler.
+
+        Instances of packet classes with pooling enabled (see `Packet.POOL_SIZE`) are released for reuse once this
+        event finishes, so no references to the packet should be kept around after it.
+        """
+        handler = self.handlers.dispatch.get(packet.PACKET_ID)
+        if handler is None:
+            await self.on_unhandled_packet(client_conn, packet)
+        else:
+            await handler(client_conn, packet)
+
+    async def on_unhandled_packet(self, client_conn: Connection, packet: ServerBoundPacket) -> None:
+        """Event called on receiving a packet without a registered handler."""
+        self.connection_log(client_conn).warning("Got unexpected packet from %s - %s", client_conn.address, packet)
 
 
 class Server(BaseServer):
     async def process_handshake(self, client_conn: Connection) -> None:
         """Read and process a handshake packet, ensuring client is on the same protocol version."""
-        log.debug(f"Listening for a handshake from {client_conn.address}...")
+        log.debug("Listening for a handshake from %s...", client_conn.address)
 
         try:
             packet = await self.read_packet(client_conn)
         except Exception as exc:
-            log.warning(f"Client {client_conn.address} sent invalid handshake: {exc}")
+            log.warning("Client %s sent invalid handshake: %s", client_conn.address, exc)
             raise DisconnectError("Failed to read handshake packet")
 
         if not isinstance(packet, Handshake):
-            log.warning(f"Client {client_conn.address} sent invalid handshake: Got {packet} instead")
+            log.warning("Client %s sent invalid handshake: Got %s instead", client_conn.address, packet)
             raise DisconnectError("First packet must be a handshake packet.")
 
         if packet.protocol_version != PROTOCOL_VERSION:
             log.warning(
-                f"Client {client_conn.address} tried to connect with different protocol version"
-                f" (server version={PROTOCOL_VERSION}, client version={packet.protocol_version})."
+                "Client %s tried to connect with different protocol version (server version=%d, client version=%d).",
+                client_conn.address,
+                PROTOCOL_VERSION,
+                packet.protocol_version,
             )
             raise DisconnectError(f"Mismatched protocol versions, server version: {PROTOCOL_VERSION}")
 
-        log.debug(f"Handshake with {client_conn.address} successful, protocol versions match")
+        log.debug("Handshake with %s successful, protocol versions match", client_conn.address)
+        await self.negotiate_compression(client_conn, packet)
 
     async def on_connect(self, client_conn: Connection) -> None:
-        log.info(f"New connection from: {client_conn.address}")
+        log.info("New connection from: %s", client_conn.address)
         await self.process_handshake(client_conn)
 
     async def on_error(self, client_conn: Connection, exc: Union[ProcessingError, ReadError]) -> None:
-        log.debug(f"Handling error: {exc!r}")
+        conn_log = self.connection_log(client_conn)
+        conn_log.debug("Handling error: %r", exc)
 
         if isinstance(exc, ReadError):
-            log.warning(f"Error occurred when reading a packet from {client_conn.address}: {exc.exc!r}")
+            conn_log.warning("Error occurred when reading a packet from %s: %r", client_conn.address, exc.exc)
         elif isinstance(exc, ProcessingError):
-            log.warning(f"Error occurred when processing a packet from {client_conn.address}: {exc.exc!r}")
+            conn_log.warning("Error occurred when processing a packet from %s: %r", client_conn.address, exc.exc)
 
         raise DisconnectError("...")
 
     async def on_close(self, client_conn: Connection, exc: DisconnectError) -> None:
-        log.info(f"Closing connection from: {client_conn.address} - {exc.message}")
-
-    async def on_packet(self, client_conn: Connection, packet: ServerBoundPacket) -> None:
-        log.debug(f"Received a packet from {client_conn.address} - {packet}")
-
-        if isinstance(packet, Ping):
-            log.info(f"Ping requested by {client_conn.address}, sending pong")
-            resp_packet = Pong(packet.token)
-            await write_packet(client_conn, resp_packet)
-        else:
-            log.warning(f"Got unexpected packet from {client_conn.address} - {packet}")
-            # raise DisconnectError("...")
+        log.info("Closing connection from: %s - %s", client_conn.address, exc.message)
+
+    @handles(Ping)
+    async def on_ping(self, client_conn: Connection, packet: Ping) -> None:
+        self.connection_log(client_conn).info("Ping requested by %s, sending pong", client_conn.address)
+        resp_packet = Pong.acquire(packet.token, request_id=packet.request_id)
+        await self.write_packet(client_conn, resp_packet)
+        resp_packet.release()
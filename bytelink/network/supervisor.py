@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.process import BaseProcess
+from typing import Any, Optional
+
+from bytelink.network.admission import AdmissionController, ConnectionSlots
+from bytelink.network.server import BaseServer
+from bytelink.network.transport import is_unix_address
+from bytelink.utils.loop import run
+
+log = logging.getLogger(__name__)
+
+# Extra time for the stopped workers to close the remaining connections and exit, on top of the drain timeout
+_STOP_GRACE = 1.0
+
+
+@dataclass
+class WorkerStats:
+    """Statistics periodically reported by each of the worker processes."""
+
+    worker_id: int
+    pid: int
+    connections: int
+    total_connections: int
+
+
+class SharedConnectionSlots(ConnectionSlots):
+    """Connection slots shared between the worker processes, limiting the amount of connections of the whole pool.
+
+    Each worker process has its own counter in the shared array, so that the slots of a worker which died (or got
+    killed) can be freed.
+    """
+
+    def __init__(self, counts: Any, index: int, limit: Optional[int] = None):
+        super().__init__(limit)
+        self.counts = counts
+        self.index = index
+
+    def try_acquire(self) -> bool:
+        with self.counts.get_lock():
+            if self.limit is not None and sum(self.counts) >= self.limit:
+                return False
+            self.counts[self.index] += 1
+        self.used += 1
+        return True
+
+    def release(self) -> None:
+        with self.counts.get_lock():
+            self.counts[self.index] -= 1
+        self.used -= 1
+
+
+def _worker_main(
+    worker_id: int,
+    slot_index: int,
+    server_cls: type[BaseServer],
+    bind_address: tuple[str, int],
+    timeout: float,
+    server_kwargs: dict[str, Any],
+    counts: Any,
+    max_connections: Optional[int],
+    admission_options: dict[str, Any],
+    stats_queue: multiprocessing.Queue[WorkerStats],
+    log_queue: multiprocessing.Queue[logging.LogRecord],
+    log_level: int,
+    stats_interval: float,
+    drain_timeout: float,
+) -> None:
+    """Entry point of the worker processes, running the server until it receives SIGTERM."""
+    # All of the logs are sent over to the supervisor, which handles them in the parent process
+    root_log = logging.getLogger()
+    for handler in root_log.handlers[:]:
+        root_log.removeHandler(handler)
+    root_log.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_log.setLevel(log_level)
+
+    slots = SharedConnectionSlots(counts, slot_index, max_connections)
+    run(
+        _run_worker(
+            worker_id,
+            server_cls,
+            bind_address,
+            timeout,
+            server_kwargs,
+            slots,
+            admission_options,
+            stats_queue,
+            stats_interval,
+            drain_timeout,
+        )
+    )
+
+
+async def _run_worker(
+    worker_id: int,
+    server_cls: type[BaseServer],
+    bind_address: tuple[str, int],
+    timeout: float,
+    server_kwargs: dict[str, Any],
+    slots: SharedConnectionSlots,
+    admission_options: dict[str, Any],
+    stats_queue: multiprocessing.Queue[WorkerStats],
+    stats_interval: float,
+    drain_timeout: float,
+) -> None:
+    admission = AdmissionController(slots=slots, **admission_options)
+    server = await server_cls.create(bind_address, timeout, reuse_port=True, admission=admission, **server_kwargs)
+
+    # On SIGTERM, the worker stops accepting new connections, but lets the open ones finish (see `BaseServer.shutdown`)
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stopping.set)
+    # Interrupts are handled by the supervisor, which then stops the workers with SIGTERM
+    loop.add_signal_handler(signal.SIGINT, lambda: None)
+
+    async def report_stats() -> None:
+        pid = multiprocessing.current_process().pid or 0
+        while True:
+            stats_queue.put(WorkerStats(worker_id, pid, len(server.connections), server.total_connections))
+            await asyncio.sleep(stats_interval)
+
+    stats_task = asyncio.create_task(report_stats())
+    try:
+        async with server:
+            await stopping.wait()
+            await server.shutdown(drain_timeout)
+    finally:
+        stats_task.cancel()
+    log.debug("Worker %d stopped", worker_id)
+
+
+class Supervisor:
+    """Run the server in multiple worker processes, to make use of multiple CPU cores.
+
+    All of the workers bind to the same address, using `SO_REUSEPORT`, which makes the kernel distribute the incoming
+    connections between them. Workers which die are restarted, their stats and logs are sent back to the supervisor
+    and the `max_connections` limit is enforced across all of them, using shared connection counters.
+
+    Stopped workers stop accepting new connections, and give the open ones up to `stop_timeout` seconds to close.
+    A worker which dies before it ever started serving isn't restarted, `poll` raises a RuntimeError instead.
+    While running, the totals of the stats reported by the workers are logged every `stats_log_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        server_cls: type[BaseServer],
+        bind_address: tuple[str, int],
+        timeout: float,
+        *,
+        workers: int,
+        max_connections: Optional[int] = None,
+        admission_options: Optional[dict[str, Any]] = None,
+        restart_delay: float = 1.0,
+        stop_timeout: float = 5.0,
+        stats_interval: float = 5.0,
+        stats_log_interval: float = 60.0,
+        **server_kwargs,
+    ):
+        if workers < 1:
+            raise ValueError(f"At least one worker is required, got {workers}")
+        if is_unix_address(bind_address):
+            raise ValueError(f"Workers can't share a Unix domain socket ({bind_address}), run a single server instead")
+
+        self.server_cls = server_cls
+        self.bind_address = bind_address
+        self.timeout = timeout
+        self.workers = workers
+        self.max_connections = max_connections
+        # Other (per-worker) admission controller settings, the connection limit is shared by all of the workers
+        self.admission_options = {} if admission_options is None else admission_options
+        self.restart_delay = restart_delay
+        self.stop_timeout = stop_timeout
+        self.stats_interval = stats_interval
+        self.stats_log_interval = stats_log_interval
+        self.server_kwargs = server_kwargs
+
+        # Forking a process with running threads (log listener) isn't safe, so the workers are always spawned
+        self._ctx = multiprocessing.get_context("spawn")
+        # Two connection counters for each worker, so that a restarted worker doesn't share its counter with the
+        # previous process, which can still be draining its connections (see `_slot_indices`)
+        self._counts = self._ctx.Array("i", 2 * workers)
+        self._stats_queue: multiprocessing.Queue[WorkerStats] = self._ctx.Queue()
+        self._log_queue: multiprocessing.Queue[logging.LogRecord] = self._ctx.Queue()
+        self._log_listener: Optional[logging.handlers.QueueListener] = None
+
+        self.processes: dict[int, BaseProcess] = {}
+        # Index of the connection counter used by the current process of each worker
+        self._slot_indices: dict[int, int] = {}
+        # Last stats reported by the current worker processes, by their pids
+        self.stats: dict[int, WorkerStats] = {}
+        self.restart_count = 0
+        self._restart_at: dict[int, float] = {}
+        # Pids of the workers which reported their stats, which means they got to serving
+        self._started_pids: set[int] = set()
+        self._stopping = threading.Event()
+        self._restart_requested = False
+
+    @property
+    def connections(self) -> int:
+        """Get the amount of connections currently open across all of the workers."""
+        return sum(self._counts)
+
+    def start(self) -> None:
+        """Start the log listener and all of the worker processes."""
+        # Worker logs are handled by the handlers of our root logger
+        self._log_listener = logging.handlers.QueueListener(
+            self._log_queue,
+            *logging.getLogger().handlers,
+            respect_handler_level=True,
+        )
+        self._log_listener.start()
+
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+
+    def _spawn(self, worker_id: int) -> BaseProcess:
+        # Alternate between the two counters of the worker, the other one can still be in use by the previous process
+        slot_index = 2 * worker_id + 1 if self._slot_indices.get(worker_id) == 2 * worker_id else 2 * worker_id
+        self._slot_indices[worker_id] = slot_index
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                worker_id,
+                slot_index,
+                self.server_cls,
+                self.bind_address,
+                self.timeout,
+                self.server_kwargs,
+                self._counts,
+                self.max_connections,
+                self.admission_options,
+                self._stats_queue,
+                self._log_queue,
+                # Logging isn't set up in the spawned processes, only the records passing our level are sent over
+                logging.getLogger().level,
+                self.stats_interval,
+                self.stop_timeout,
+            ),
+            name=f"bytelink-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[worker_id] = process
+        log.info("Started worker %d (pid %s)", worker_id, process.pid)
+        return process
+
+    def _free_slots(self, slot_index: int) -> None:
+        """Free the connection slots held by a worker process which is no longer running."""
+        with self._counts.get_lock():
+            self._counts[slot_index] = 0
+
+    def _stop_process(self, process: BaseProcess, slot_index: int) -> None:
+        """Gracefully stop the worker process, killing it if it doesn't stop in time."""
+        process.terminate()
+        process.join(self.stop_timeout + _STOP_GRACE)
+        if process.is_alive():
+            log.warning("Worker %s didn't stop in time, killing it", process.name)
+            process.kill()
+            process.join()
+        # A killed worker never got to release the slots of its connections
+        self._free_slots(slot_index)
+        self.stats.pop(process.pid, None)  # type: ignore[arg-type]
+
+    def poll(self) -> None:
+        """Collect the reported stats and restart the workers which died."""
+        pids = {process.pid for process in self.processes.values()}
+        while True:
+            try:
+                stats = self._stats_queue.get_nowait()
+            except queue.Empty:
+                break
+            # Stats of the already stopped processes can still be in the queue
+            if stats.pid in pids:
+                self.stats[stats.pid] = stats
+                self._started_pids.add(stats.pid)
+
+        if self._stopping.is_set():
+            return
+
+        now = time.monotonic()
+        for worker_id, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+
+            if process.pid not in self._started_pids and worker_id not in self._restart_at:
+                # Restarting a worker which can't even start (e.g. it can't bind the address) would never end
+                log.error(
+                    "Worker %d (pid %s) exited with code %s before it started", worker_id, process.pid, process.exitcode
+                )
+                raise RuntimeError(f"Worker {worker_id} failed to start (exit code {process.exitcode})")
+
+            if worker_id not in self._restart_at:
+                self._started_pids.discard(process.pid)  # type: ignore[arg-type]
+                log.warning("Worker %d (pid %s) died with exit code %s", worker_id, process.pid, process.exitcode)
+                # The connections of the dead worker are gone, free up their slots
+                self._free_slots(self._slot_indices[worker_id])
+                self.stats.pop(process.pid, None)  # type: ignore[arg-type]
+                self._restart_at[worker_id] = now + self.restart_delay
+            elif now >= self._restart_at[worker_id]:
+                del self._restart_at[worker_id]
+                self.restart_count += 1
+                self._spawn(worker_id)
+
+        if self._restart_requested:
+            self._restart_requested = False
+            self.restart_workers()
+
+    def restart_workers(self) -> None:
+        """Restart all of the workers, one at a time.
+
+        The new worker is started before the old one gets stopped, so the address is always being listened on.
+        Both of them share the same connection counter, which the old one releases as its connections get closed.
+        """
+        for worker_id, old_process in list(self.processes.items()):
+            log.info("Restarting worker %d", worker_id)
+            old_slot_index = self._slot_indices[worker_id]
+            self._spawn(worker_id)
+            self._stop_process(old_process, old_slot_index)
+            self.restart_count += 1
+
+    def request_restart(self) -> None:
+        """Restart all of the workers on the next poll (safe to call from a signal handler)."""
+        self._restart_requested = True
+
+    def stop(self) -> None:
+        """Stop all of the worker processes and the log listener."""
+        self._stopping.set()
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for worker_id, process in self.processes.items():
+            if process.is_alive():
+                self._stop_process(process, self._slot_indices[worker_id])
+
+        if self._log_listener is not None:
+            self._log_listener.stop()
+            self._log_listener = None
+
+    def log_stats(self) -> None:
+        """Log the totals of the last stats reported by the workers, along with the stats of each of them."""
+        workers = sorted(self.stats.values(), key=lambda stats: stats.worker_id)
+        log.info(
+            "%d open connections, %d accepted in total (%s)",
+            sum(stats.connections for stats in workers),
+            sum(stats.total_connections for stats in workers),
+            ", ".join(
+                f"worker {stats.worker_id} (pid {stats.pid}): {stats.connections}/{stats.total_connections}"
+                for stats in workers
+            ),
+        )
+
+    def run(self, poll_interval: float = 0.5) -> None:
+        """Start the workers and supervise them, until SIGINT or SIGTERM is received (SIGHUP restarts the workers)."""
+        signal.signal(signal.SIGINT, lambda *_: self._stopping.set())
+        signal.signal(signal.SIGTERM, lambda *_: self._stopping.set())
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda *_: self.request_restart())
+
+        self.start()
+        log_at = time.monotonic() + self.stats_log_interval
+        try:
+            while not self._stopping.wait(poll_interval):
+                self.poll()
+                if time.monotonic() >= log_at:
+                    log_at += self.stats_log_interval
+                    self.log_stats()
+        finally:
+            self.stop()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Callable, TYPE_CHECKING, Tuple, Union
+
+if TYPE_CHECKING:
+    from typing_extensions import TypeAlias
+
+# Address of a server, either a TCP `(host, port)` pair, or a path of a Unix domain socket
+AddressType: TypeAlias = Union[Tuple[str, int], str, "os.PathLike[str]"]
+
+
+def is_unix_address(address: AddressType) -> bool:
+    """Check whether given address is a path of a Unix domain socket, rather than a TCP address."""
+    return not isinstance(address, tuple)
+
+
+def address_host(address: object) -> str:
+    """Get the host from the address of a connected socket (as given by `getpeername`).
+
+    Unix domain sockets (including socket pairs) don't have any host, so an empty string is returned for them, which
+    means that all of the local connections count as coming from a single host (e.g. for the per-IP limits).
+    """
+    if isinstance(address, tuple) and address:
+        return address[0]
+    return ""
+
+
+async def open_connection(address: AddressType) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to the server at given address (TCP or Unix domain socket), returning the streams of the connection."""
+    if is_unix_address(address):
+        return await asyncio.open_unix_connection(os.fspath(address))  # type: ignore[arg-type]
+    host, port = address  # type: ignore[misc]
+    return await asyncio.open_connection(host, port)
+
+
+async def create_server(
+    protocol_factory: Callable[[], asyncio.BaseProtocol],
+    address: AddressType,
+    *,
+    reuse_port: bool = False,
+) -> asyncio.Server:
+    """Create a server listening on given address (TCP or Unix domain socket), with a protocol for every connection."""
+    loop = asyncio.get_running_loop()
+    if is_unix_address(address):
+        if reuse_port:
+            raise ValueError("Unix domain sockets can't be shared between multiple servers (reuse_port)")
+        path = os.fspath(address)  # type: ignore[arg-type]
+        return await loop.create_unix_server(protocol_factory, path)
+
+    host, port = address  # type: ignore[misc]
+    return await loop.create_server(protocol_factory, host, port, reuse_port=reuse_port)
@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Optional
+
 from bytelink.exceptions import MalformedPacketError, MalformedPacketState
 from bytelink.packets.abc import Packet
-from bytelink.packets.handshaking import Handshake
+from bytelink.packets.compression import Compression, compress, decompress
+from bytelink.packets.disconnect import Disconnect
+from bytelink.packets.handshaking import Handshake, SetCompression
 from bytelink.packets.ping import Ping, Pong
-from bytelink.protocol.base_io import BaseAsyncReader, BaseAsyncWriter
-from bytelink.protocol.buffer import Buffer
+from bytelink.protocol.base_io import BaseAsyncReader, BaseAsyncWriter, BaseSyncReader
+from bytelink.protocol.buffer import Buffer, BufferView
+from bytelink.protocol.varint import (
+    BytesLike,
+    decode_varuint,
+    encode_varuint,
+    encode_varuint_into,
+    peek_varuint,
+    varuint_size,
+)
 
-_PACKETS: list[type[Packet]] = [Ping, Pong, Handshake]
+_PACKETS: list[type[Packet]] = [Ping, Pong, Handshake, Disconnect, SetCompression]
 PACKET_MAP: dict[int, type[Packet]] = {}
 
 for packet_cls in _PACKETS:
@@ -20,21 +33,91 @@ for packet_cls in _PACKETS:
 # | Length      | 32-bit varint | Length (in bytes) of PacketID + Data  |
 # | Packet ID   | 32-bit varint |                                       |
 # | Data        | byte array    | Internal data to packet of given id   |
+#
+# PACKET FORMAT (once compression was enabled, see `Compression`):
+# | Field name  | Field type    | Notes                                                       |
+# |-------------|---------------|-------------------------------------------------------------|
+# | Length      | 32-bit varint | Length (in bytes) of Data Length + PacketID + Data          |
+# | Data Length | 32-bit varint | Uncompressed length of PacketID + Data, 0 if not compressed |
+# | Packet ID   | 32-bit varint | Compressed along with Data (unless Data Length is 0)        |
+# | Data        | byte array    | Internal data to packet of given id                         |
+
+
+# Maximum size of the 32-bit varuint length prefix, reserved at the start of each encoded frame
+_LENGTH_PREFIX_RESERVE = 5
 
 
 def _serialize_packet(packet: Packet) -> Buffer:
     """Serialize the internal packet data, along with it's pacekt id."""
     packet_buf = Buffer()
     packet_buf.write_varint(packet.PACKET_ID, max_bits=32)
-    packet_buf.write(packet.serialize())
+    packet.serialize_into(packet_buf)
     return packet_buf
 
 
-def _deserialize_packet(data: Buffer) -> Packet:
-    """Deserialize the packet id and it's internal data."""
+def encode_frame(packet: Packet, compression: Optional[Compression] = None) -> memoryview:
+    """Encode the whole packet frame (length prefix, packet id and data) into a single buffer.
+
+    Since the length prefix can only be known after the packet was serialized, the maximum amount of space it could
+    take is reserved at the start of the buffer, and the prefix is then written right in front of the packet id.
+    This means the frame is built without copying the packet data around, and it can be sent with a single write.
+
+    With `compression`, the frame is encoded in the compressed format, compressing the packet if it's long enough.
+    """
+    if compression is None:
+        frame_buf = Buffer(_LENGTH_PREFIX_RESERVE)
+        frame_buf.write_varint(packet.PACKET_ID, max_bits=32)
+        packet.serialize_into(frame_buf)
+        return _prefix_length(frame_buf)
+
+    return _finish_compressed_frame(_serialize_compressible(packet), compression)
+
+
+def _prefix_length(frame_buf: Buffer) -> memoryview:
+    """Write the length prefix right in front of the frame data, which start after the reserved space."""
+    length = len(frame_buf) - _LENGTH_PREFIX_RESERVE
+    start = _LENGTH_PREFIX_RESERVE - varuint_size(length)
+    encode_varuint_into(frame_buf, start, length, max_bits=32)
+    return memoryview(frame_buf)[start:]
+
+
+def _serialize_compressible(packet: Packet) -> Buffer:
+    """Serialize the packet id and data, reserving the space for the length prefix and the data length (of 0)."""
+    # The data length of uncompressed packets (0) is a single zero byte, which is already there in the reserved space
+    frame_buf = Buffer(_LENGTH_PREFIX_RESERVE + 1)
+    frame_buf.write_varint(packet.PACKET_ID, max_bits=32)
+    packet.serialize_into(frame_buf)
+    return frame_buf
+
+
+def _finish_compressed_frame(frame_buf: Buffer, compression: Compression) -> memoryview:
+    """Build the compressed format frame from the serialized packet, compressing it if it's over the threshold."""
+    data_length = len(frame_buf) - _LENGTH_PREFIX_RESERVE - 1
+    if data_length < compression.threshold:
+        return _prefix_length(frame_buf)
+
+    data = compress(memoryview(frame_buf)[_LENGTH_PREFIX_RESERVE + 1 :], compression)
+    header = encode_varuint(data_length, max_bits=32)
+    length = encode_varuint(len(header) + len(data), max_bits=32)
+    return memoryview(b"".join((length, header, data)))
+
+
+def _decompress_frame(data: bytearray, compression: Compression) -> BytesLike:
+    """Get the (decompressed) packet id and data from the frame data, in the compressed format."""
+    data_length, pos = decode_varuint(data, max_bits=32)
+    if data_length == 0:
+        return memoryview(data)[pos:]
+    return decompress(memoryview(data)[pos:], data_length, compression)
+
+
+def _deserialize_packet(data: BaseSyncReader) -> Packet:
+    """Deserialize the packet id and it's internal data.
+
+    The packet data is deserialized straight from `data` (positioned right after the packet id), it isn't copied
+    out of it first.
+    """
     try:
         packet_id = data.read_varint(max_bits=32)
-        packet_data = data.read(data.remaining)
     except IOError as exc:
         raise MalformedPacketError(MalformedPacketState.MALFORMED_PACKET_DATA, ioerror=exc)
 
@@ -44,21 +127,58 @@ def _deserialize_packet(data: Buffer) -> Packet:
         raise MalformedPacketError(MalformedPacketState.UNRECOGNIZED_PACKET_ID, packet_id=packet_id)
 
     try:
-        return packet_cls.deserialize(Buffer(packet_data))
+        return packet_cls.deserialize(data)
     except IOError as exc:
         raise MalformedPacketError(MalformedPacketState.MALFORMED_PACKET_BODY, ioerror=exc, packet_id=packet_id)
 
 
-async def write_packet(writer: BaseAsyncWriter, packet: Packet) -> None:
-    """Write given packet."""
-    data_buf = _serialize_packet(packet)
-    await writer.write_bytearray(data_buf, max_varuint_bits=32)
+def decode_packet(data: BytesLike) -> Packet:
+    """Decode the packet from the packet id and data of a frame (see `read_frame`)."""
+    return _deserialize_packet(BufferView(data))
+
+
+def peek_packet_id(data: BytesLike) -> Optional[int]:
+    """Get the id of the packet in the packet id and data of a frame, without decoding it (`None` if it's invalid)."""
+    parsed = peek_varuint(data, max_bits=32)
+    return None if parsed is None else parsed[0]
+
+
+async def write_packet(writer: BaseAsyncWriter, packet: Packet, *, compression: Optional[Compression] = None) -> None:
+    """Write given packet, compressing it (in a thread pool, if it's large) when `compression` is given."""
+    if compression is None:
+        await writer.write(encode_frame(packet))
+        return
+
+    frame_buf = _serialize_compressible(packet)
+    if len(frame_buf) < compression.offload_threshold:
+        frame = _finish_compressed_frame(frame_buf, compression)
+    else:
+        loop = asyncio.get_running_loop()
+        frame = await loop.run_in_executor(None, _finish_compressed_frame, frame_buf, compression)
+    await writer.write(frame)
 
 
-async def read_packet(reader: BaseAsyncReader) -> Packet:
-    """Read any arbitrary packet based on it's ID."""
+async def read_frame(reader: BaseAsyncReader, *, compression: Optional[Compression] = None) -> BytesLike:
+    """Read a single frame, returning the packet id and data, decompressing them when `compression` is given."""
     try:
         data = await reader.read_bytearray(max_varuint_bits=32)
     except IOError as exc:
         raise MalformedPacketError(MalformedPacketState.NO_DATA, ioerror=exc)
-    return _deserialize_packet(Buffer(data))
+
+    if compression is None:
+        return data
+
+    try:
+        # The work depends on how large the data get once decompressed, not on how large the compressed data are
+        parsed = peek_varuint(data, max_bits=32)
+        if parsed is None or parsed[0] < compression.offload_threshold or parsed[0] > compression.max_size:
+            return _decompress_frame(data, compression)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _decompress_frame, data, compression)
+    except IOError as exc:
+        raise MalformedPacketError(MalformedPacketState.MALFORMED_PACKET_DATA, ioerror=exc)
+
+
+async def read_packet(reader: BaseAsyncReader, *, compression: Optional[Compression] = None) -> Packet:
+    """Read any arbitrary packet based on it's ID, decompressing it when `compression` is given."""
+    return decode_packet(await read_frame(reader, compression=compression))
@@ -1,41 +1,171 @@
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
-from typing import ClassVar, TYPE_CHECKING
+from abc import ABC, ABCMeta, abstractmethod
+from typing import Any, ClassVar, Optional, TYPE_CHECKING
 
+from bytelink.packets import schema
+from bytelink.packets.schema import SCHEMA_TYPE, compile_schema
+from bytelink.protocol.base_io import BaseSyncReader
 from bytelink.protocol.buffer import Buffer
 
 if TYPE_CHECKING:
     from typing_extensions import Self
 
 
-class Packet(ABC):
-    """Base class for all packets"""
+def _find_schema(bases: tuple[type, ...]) -> tuple[Optional[SCHEMA_TYPE], dict[str, Any]]:
+    """Find the schema (along with the field defaults) inherited from given bases, if any of them have one."""
+    for base in bases:
+        schema = getattr(base, "SCHEMA", None)
+        if schema is not None:
+            return schema, getattr(base, "DEFAULTS", {})
+    return None, {}
+
+
+class PacketMeta(ABCMeta):
+    """Metaclass for packets, compiling the declarative packet schemas at class creation time.
+
+    Classes defining `FIELDS` get their full schema (the inherited schema, followed by the newly defined fields)
+    stored in `SCHEMA`, and the `__init__`, `serialize_into` and `deserialize` methods compiled from it, unless
+    they define these methods explicitly. Default values of the fields (`DEFAULTS`) are inherited the same way.
+    The fields are also added as `__slots__`, and subclasses of schema packets are slotted too, so that instances
+    of these packets don't need a `__dict__`.
+    """
+
+    def __new__(cls, name: str, bases: tuple[type, ...], namespace: dict[str, Any], **kwargs):
+        inherited_schema, inherited_defaults = _find_schema(bases)
+        fields = namespace.get("FIELDS")
+
+        if fields is not None:
+            full_schema = (inherited_schema or ()) + tuple(fields)
+            defaults = {**inherited_defaults, **namespace.get("DEFAULTS", {})}
+            namespace["SCHEMA"] = full_schema
+            namespace["DEFAULTS"] = defaults
+            namespace.setdefault("__slots__", tuple(field_name for field_name, _ in fields))
+
+            qualname = namespace.get("__qualname__", name)
+            for func_name, func in compile_schema(qualname, full_schema, defaults).items():
+                namespace.setdefault(func_name, func)
+        elif inherited_schema is not None:
+            namespace.setdefault("__slots__", ())
+
+        packet_cls = super().__new__(cls, name, bases, namespace, **kwargs)
+
+        # Classes without a packet id can't be instantiated, marking the id as an abstract member makes python enforce
+        # this on instantiation for us, so we don't need to check it for every new packet instance
+        if not hasattr(packet_cls, "PACKET_ID"):
+            packet_cls.__abstractmethods__ = frozenset(packet_cls.__abstractmethods__ | {"PACKET_ID"})
+
+        return packet_cls
+
+
+class Packet(ABC, metaclass=PacketMeta):
+    """Base class for all packets
+
+    Packets can either implement `serialize_into` and `deserialize` by hand, or declare their fields with `FIELDS`,
+    a sequence of `(name, field_type)` pairs using the field types from `bytelink.packets.schema`, from which all of
+    these methods (along with `__init__`) get compiled. For example:
+
+        class Move(ServerBoundPacket):
+            PACKET_ID = 10
+            FIELDS = (("x", schema.double), ("y", schema.double), ("name", schema.utf))
+    """
+
+    __slots__ = ()
 
     PACKET_ID: ClassVar[int]
+    # Declared fields of this packet class, and the full schema including the fields of the parent packet classes
+    FIELDS: ClassVar[Optional[SCHEMA_TYPE]] = None
+    SCHEMA: ClassVar[Optional[SCHEMA_TYPE]] = None
+    # Default values of the schema fields, these fields become optional keyword-only arguments of `__init__`
+    DEFAULTS: ClassVar[dict[str, Any]] = {}
 
-    def __init__(self, *args, **kwargs):
-        """Enforce PAKCET_ID being set for each instance of concrete packet classes."""
-        cls = self.__class__
-        if not hasattr(cls, "PACKET_ID"):
-            raise TypeError(f"Can't instantiate abstract {cls.__name__} class without defining PACKET_ID variable.")
-        return super().__init__(*args, **kwargs)
+    # Maximum amount of released instances kept around for reuse, pooling is disabled if this is 0
+    POOL_SIZE: ClassVar[int] = 0
+    _pool: ClassVar[Optional[list[Packet]]] = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Validate the packet class once, on its definition, and give it its own instance pool."""
+        super().__init_subclass__(**kwargs)
+
+        if "PACKET_ID" in cls.__dict__:
+            packet_id = cls.__dict__["PACKET_ID"]
+            if not isinstance(packet_id, int) or isinstance(packet_id, bool) or packet_id < 0:
+                raise TypeError(f"{cls.__name__}.PACKET_ID must be a non-negative integer, got {packet_id!r}.")
+
+        cls._pool = [] if cls.POOL_SIZE > 0 else None
+
+    @classmethod
+    def acquire(cls, *args, **kwargs) -> Self:
+        """Make a new packet instance, reusing a released one from the pool of this class, if there is any."""
+        pool = cls._pool
+        if pool:
+            # The pool can get emptied by another thread (decoding off the event loop) between the check and the pop
+            try:
+                packet = pool.pop()
+            except IndexError:
+                pass
+            else:
+                packet.__init__(*args, **kwargs)
+                return packet  # type: ignore # pool of this class only ever holds instances of it
+        return cls(*args, **kwargs)
+
+    def release(self) -> None:
+        """Return this packet instance to the pool of its class, making it available for reuse.
+
+        This does nothing if pooling isn't enabled for this packet class (`POOL_SIZE` is 0). Released packets can be
+        handed out again by `acquire` or `deserialize`, so they mustn't be used (or released again) after this call.
+        """
+        pool = self._pool
+        if pool is not None and len(pool) < self.POOL_SIZE:
+            pool.append(self)
 
     @classmethod
     @abstractmethod
-    def deserialize(cls, data: Buffer) -> Self:
+    def deserialize(cls, data: BaseSyncReader) -> Self:
         """Construct a packet from a buffer of bytes."""
         raise NotImplementedError
 
     @abstractmethod
+    def serialize_into(self, buf: Buffer) -> None:
+        """Deconstruct a packet, writing it's bytes into the given buffer."""
+        raise NotImplementedError
+
     def serialize(self) -> Buffer:
         """Deconstruct a packet and represent it as a buffer of bytes."""
-        raise NotImplementedError
+        buf = Buffer()
+        self.serialize_into(buf)
+        return buf
 
 
 class ServerBoundPacket(Packet):
     """Packet bound to a server (client -> server)."""
 
+    __slots__ = ()
+
 
 class ClientBoundPacket(Packet):
     """Packet bound to a client (server -> client)."""
+
+    __slots__ = ()
+
+
+class RequestPacket(ServerBoundPacket):
+    """Packet sent by the client, to which the server replies with a `ResponsePacket`.
+
+    The request id is picked by the client, and the server sends it back in the response, which allows the client
+    to have multiple requests pending at once, over a single connection (see `Client.request`).
+    """
+
+    FIELDS = (("request_id", schema.varuint32),)
+    DEFAULTS = {"request_id": 0}
+
+    request_id: int
+
+
+class ResponsePacket(ClientBoundPacket):
+    """Packet sent by the server as a reply to a `RequestPacket`, carrying the id of the request."""
+
+    FIELDS = (("request_id", schema.varuint32),)
+    DEFAULTS = {"request_id": 0}
+
+    request_id: int
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from bytelink.protocol.varint import BytesLike
+
+
+@dataclass(frozen=True)
+class Compression:
+    """Settings of the (zlib) packet compression, negotiated with the `Handshake` and `SetCompression` packets.
+
+    Packets with the serialized data (along with the packet id) shorter than `threshold` bytes are sent uncompressed,
+    as compressing them would only cost time without saving much. `zdict` is an optional preset dictionary (see
+    `build_dictionary`), which is only used when both sides have the same one. Packets of at least `offload_threshold`
+    bytes are (de)compressed in a thread pool, so that they don't block the event loop. Received packets declaring
+    they decompress into more than `max_size` bytes are rejected, before anything gets decompressed.
+    """
+
+    threshold: int = 256
+    level: int = zlib.Z_DEFAULT_COMPRESSION
+    zdict: Optional[bytes] = None
+    offload_threshold: int = 65_536
+    max_size: int = 2_097_152
+
+    @property
+    def dictionary_id(self) -> int:
+        """Get the identifier of the preset dictionary (the same adler32 checksum zlib uses), 0 if there isn't one."""
+        return zlib.adler32(self.zdict) if self.zdict else 0
+
+
+def compress(data: BytesLike, compression: Compression) -> bytes:
+    """Compress given data, using the preset dictionary if there is one."""
+    if compression.zdict is None:
+        return zlib.compress(data, compression.level)
+
+    compressor = zlib.compressobj(compression.level, zdict=compression.zdict)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data: BytesLike, size: int, compression: Compression) -> bytes:
+    """Decompress given data, which should decompress into exactly `size` bytes.
+
+    The decompressed data are never allowed to grow over `size`, so a peer can't make us allocate more memory than
+    it told us it would need, and `size` itself can't be over the `max_size` of the compression settings. An IOError
+    is raised if the size is too big, or if the data are invalid, or don't match the size.
+    """
+    if size > compression.max_size:
+        raise IOError(f"Declared packet data size of {size} bytes is over the limit of {compression.max_size} bytes.")
+
+    if compression.zdict is None:
+        decompressor = zlib.decompressobj()
+    else:
+        decompressor = zlib.decompressobj(zdict=compression.zdict)
+
+    try:
+        out = decompressor.decompress(data, size)
+    except zlib.error as exc:
+        raise IOError(f"Failed to decompress packet data: {exc}")
+
+    if len(out) != size or not decompressor.eof:
+        raise IOError(f"Decompressed packet data don't match the declared size of {size} bytes.")
+    return out
+
+
+def build_dictionary(samples: Iterable[bytes], size: int = 32_768) -> bytes:
+    """Build a preset compression dictionary out of sample (serialized) packets.
+
+    zlib dictionaries are just data likely to show up in the compressed packets, so the most common samples are
+    concatenated, up to `size` bytes (zlib only uses the last 32KiB). The most common samples go last, as the data
+    closer to the end of the dictionary can be referenced with shorter distances.
+    """
+    chosen: list[bytes] = []
+    total = 0
+    for sample, _ in Counter(samples).most_common():
+        if total + len(sample) > size:
+            continue
+        chosen.append(sample)
+        total += len(sample)
+    return b"".join(reversed(chosen))
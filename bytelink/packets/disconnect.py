@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from typing import ClassVar
+
+from bytelink.packets import schema
+from bytelink.packets.abc import ClientBoundPacket
+
+
+class Disconnect(ClientBoundPacket):
+    """Packet sent by the server right before it closes the connection, with the reason for it."""
+
+    PACKET_ID: ClassVar[int] = 4
+    FIELDS = (("reason", schema.utf),)
+
+    reason: str
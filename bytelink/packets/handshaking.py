@@ -1,27 +1,36 @@
 from __future__ import annotations
 
-from typing import ClassVar, TYPE_CHECKING
+from typing import ClassVar
 
-from bytelink.packets.abc import ServerBoundPacket
-from bytelink.protocol.buffer import Buffer
-
-if TYPE_CHECKING:
-    from typing_extensions import Self
+from bytelink.packets import schema
+from bytelink.packets.abc import ClientBoundPacket, ServerBoundPacket
 
 
 class Handshake(ServerBoundPacket):
+    """First packet sent by the client, along with the compression it supports (see `Compression`)."""
+
     PACKET_ID: ClassVar[int] = 3
+    FIELDS = (
+        ("protocol_version", schema.varint32),
+        ("compression", schema.boolean),
+        ("dictionary_id", schema.varuint32),
+    )
+    DEFAULTS = {"compression": False, "dictionary_id": 0}
+
+    protocol_version: int
+    compression: bool
+    dictionary_id: int
+
+
+class SetCompression(ClientBoundPacket):
+    """Response to a handshake of a client supporting compression, enabling it for all of the following packets.
 
-    def __init__(self, protocol_version: int):
-        super().__init__()
-        self.protocol_version = protocol_version
+    Negative `threshold` means the server doesn't compress the packets, and the compressed format isn't used at all.
+    `dictionary_id` is the id of the preset dictionary both sides should use, or 0 to not use any.
+    """
 
-    def serialize(self) -> Buffer:
-        buf = Buffer()
-        buf.write_varint(self.protocol_version, max_bits=32)
-        return buf
+    PACKET_ID: ClassVar[int] = 5
+    FIELDS = (("threshold", schema.varint32), ("dictionary_id", schema.varuint32))
 
-    @classmethod
-    def deserialize(cls, data: Buffer) -> Self:
-        protocol_version = data.read_varint(max_bits=32)
-        return cls(protocol_version)
+    threshold: int
+    dictionary_id: int
@@ -1,37 +1,26 @@
 from __future__ import annotations
 
-from typing import ClassVar, TYPE_CHECKING
+from typing import ClassVar
 
-from bytelink.packets.abc import ClientBoundPacket, Packet, ServerBoundPacket
-from bytelink.protocol.buffer import Buffer
+from bytelink.packets import schema
+from bytelink.packets.abc import RequestPacket, ResponsePacket
 
-if TYPE_CHECKING:
-    from typing_extensions import Self
 
-
-class _BasePing(Packet):
-    def __init__(self, token: str):
-        super().__init__()
-        self.token = token
-
-    def serialize(self) -> Buffer:
-        buf = Buffer()
-        buf.write_utf(self.token)
-        return buf
-
-    @classmethod
-    def deserialize(cls, data: Buffer) -> Self:
-        token = data.read_utf()
-        return cls(token)
-
-
-class Ping(_BasePing, ServerBoundPacket):
+class Ping(RequestPacket):
     """Ping request packet."""
 
     PACKET_ID: ClassVar[int] = 1
+    POOL_SIZE: ClassVar[int] = 256
+    FIELDS = (("token", schema.utf),)
+
+    token: str
 
 
-class Pong(_BasePing, ClientBoundPacket):
+class Pong(ResponsePacket):
     """Ping response packet."""
 
     PACKET_ID: ClassVar[int] = 2
+    POOL_SIZE: ClassVar[int] = 256
+    FIELDS = (("token", schema.utf),)
+
+    token: str
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import keyword
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Mapping, Optional, Sequence, TYPE_CHECKING, Tuple
+
+from bytelink.protocol.base_io import BaseSyncReader, BaseSyncWriter, StructFormat
+from bytelink.protocol.varint import encode_varint, encode_varuint
+
+if TYPE_CHECKING:
+    from typing_extensions import TypeAlias
+
+
+class FieldType(ABC):
+    """Base class for the types of fields which can be used in declarative packet schemas.
+
+    Field types know how to write and read a single value, however the compiled packet code doesn't always go through
+    these methods, some of the field types get special handling, inlined directly in the compiled code.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def write(self, buf: BaseSyncWriter, value: Any) -> None:
+        """Write given value of this field into the buffer."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def read(self, data: BaseSyncReader) -> Any:
+        """Read a value of this field from the data."""
+        raise NotImplementedError
+
+
+class Fixed(FieldType):
+    """Fixed-width field of given struct format.
+
+    Consecutive fixed-width fields in a schema are packed together, using a single precompiled struct.
+    """
+
+    __slots__ = ("fmt",)
+
+    def __init__(self, fmt: StructFormat):
+        self.fmt = fmt
+
+    def write(self, buf: BaseSyncWriter, value: Any) -> None:
+        buf.write_value(self.fmt, value)
+
+    def read(self, data: BaseSyncReader) -> Any:
+        return data.read_value(self.fmt)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.fmt.name})"
+
+
+class VarInt(FieldType):
+    """Variable length integer field, limited to values of `max_bits` bits."""
+
+    __slots__ = ("max_bits", "signed")
+
+    def __init__(self, max_bits: int, *, signed: bool = True):
+        self.max_bits = max_bits
+        self.signed = signed
+
+    def write(self, buf: BaseSyncWriter, value: int) -> None:
+        if self.signed:
+            buf.write_varint(value, max_bits=self.max_bits)
+        else:
+            buf.write_varuint(value, max_bits=self.max_bits)
+
+    def read(self, data: BaseSyncReader) -> int:
+        if self.signed:
+            return data.read_varint(max_bits=self.max_bits)
+        return data.read_varuint(max_bits=self.max_bits)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.max_bits}, signed={self.signed})"
+
+
+class UTF(FieldType):
+    """UTF-8 string field, prefixed with a varuint of its size."""
+
+    __slots__ = ("max_varuint_bits",)
+
+    def __init__(self, max_varuint_bits: int = 16):
+        self.max_varuint_bits = max_varuint_bits
+
+    def write(self, buf: BaseSyncWriter, value: str) -> None:
+        buf.write_utf(value, max_varuint_bits=self.max_varuint_bits)
+
+    def read(self, data: BaseSyncReader) -> str:
+        return data.read_utf(max_varuint_bits=self.max_varuint_bits)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.max_varuint_bits})"
+
+
+class Bytes(FieldType):
+    """Arbitrary sequence of bytes, prefixed with a varuint of its size."""
+
+    __slots__ = ("max_varuint_bits",)
+
+    def __init__(self, max_varuint_bits: int = 16):
+        self.max_varuint_bits = max_varuint_bits
+
+    def write(self, buf: BaseSyncWriter, value: bytes) -> None:
+        buf.write_bytearray(value, max_varuint_bits=self.max_varuint_bits)
+
+    def read(self, data: BaseSyncReader) -> bytearray:
+        return data.read_bytearray(max_varuint_bits=self.max_varuint_bits)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.max_varuint_bits})"
+
+
+class Array(FieldType):
+    """List of values of given field type, prefixed with a varuint of its length.
+
+    Arrays of fixed-width values are packed and unpacked all at once.
+    """
+
+    __slots__ = ("item", "max_varuint_bits")
+
+    def __init__(self, item: FieldType, max_varuint_bits: int = 16):
+        self.item = item
+        self.max_varuint_bits = max_varuint_bits
+
+    def write(self, buf: BaseSyncWriter, value: Sequence[Any]) -> None:
+        buf.write_varuint(len(value), max_bits=self.max_varuint_bits)
+        if isinstance(self.item, Fixed):
+            buf.write_values(self.item.fmt, value)  # type: ignore # the values type depends on the format
+            return
+        for item in value:
+            self.item.write(buf, item)
+
+    def read(self, data: BaseSyncReader) -> list[Any]:
+        length = data.read_varuint(max_bits=self.max_varuint_bits)
+        if isinstance(self.item, Fixed):
+            return list(data.read_values(self.item.fmt, length))  # type: ignore # the values type depends on the format
+        return [self.item.read(data) for _ in range(length)]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.item!r}, {self.max_varuint_bits})"
+
+
+# Commonly used field types, meant to be used directly in the schemas
+boolean = Fixed(StructFormat.BOOL)
+byte = Fixed(StructFormat.BYTE)
+ubyte = Fixed(StructFormat.UBYTE)
+short = Fixed(StructFormat.SHORT)
+ushort = Fixed(StructFormat.USHORT)
+int32 = Fixed(StructFormat.INT)
+uint32 = Fixed(StructFormat.UINT)
+int64 = Fixed(StructFormat.LONGLONG)
+uint64 = Fixed(StructFormat.ULONGLONG)
+float32 = Fixed(StructFormat.FLOAT)
+double = Fixed(StructFormat.DOUBLE)
+varint32 = VarInt(32)
+varuint32 = VarInt(32, signed=False)
+varint64 = VarInt(64)
+varuint64 = VarInt(64, signed=False)
+utf = UTF()
+byte_array = Bytes()
+
+SCHEMA_TYPE: TypeAlias = Tuple[Tuple[str, FieldType], ...]
+
+
+def compile_schema(
+    qualname: str,
+    schema: SCHEMA_TYPE,
+    defaults: Optional[Mapping[str, Any]] = None,
+) -> dict[str, Callable[..., Any]]:
+    """Compile specialized `__init__`, `serialize_into` and `deserialize` functions for given schema.
+
+    Runs of consecutive fixed-width fields are packed and unpacked using a single precompiled struct, varints and
+    strings are handled directly with the codec/buffer methods and all other fields go through their field types.
+    Fields with a value in `defaults` become keyword-only (and optional) arguments of `__init__`.
+    Deserialized instances are taken from the instance pool of the packet class, if it has any available.
+    The returned `deserialize` function is already wrapped in a classmethod.
+    """
+    defaults = {} if defaults is None else defaults
+    names = [name for name, _ in schema]
+    for name in names:
+        if not name.isidentifier() or keyword.iskeyword(name) or name.startswith("_"):
+            raise ValueError(f"Invalid packet field name: {name!r}")
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate packet field names in {qualname} schema: {names}")
+    unknown_defaults = set(defaults) - set(names)
+    if unknown_defaults:
+        raise ValueError(f"Defaults for unknown fields in {qualname} schema: {sorted(unknown_defaults)}")
+
+    namespace: dict[str, Any] = {
+        "_new": object.__new__,
+        "_encode_varint": encode_varint,
+        "_encode_varuint": encode_varuint,
+    }
+    write_lines: list[str] = []
+    read_lines: list[str] = []
+
+    # Group consecutive fixed-width fields into runs, which are then compiled into a single struct
+    fixed_run: list[tuple[str, Fixed]] = []
+
+    def flush_fixed_run() -> None:
+        if not fixed_run:
+            return
+        struct_name = f"_s{len(namespace)}"
+        namespace[struct_name] = struct.Struct(">" + "".join(field.fmt.value for _, field in fixed_run))
+        run_names = [name for name, _ in fixed_run]
+        write_lines.append(f"buf.write_struct({struct_name}, {', '.join('self.' + name for name in run_names)})")
+        read_lines.append(f"({', '.join(run_names)},) = data.read_struct({struct_name})")
+        fixed_run.clear()
+
+    for name, field in schema:
+        if isinstance(field, Fixed):
+            fixed_run.append((name, field))
+            continue
+        flush_fixed_run()
+
+        if isinstance(field, VarInt):
+            encoder = "_encode_varint" if field.signed else "_encode_varuint"
+            reader = "read_varint" if field.signed else "read_varuint"
+            write_lines.append(f"buf.write({encoder}(self.{name}, max_bits={field.max_bits}))")
+            read_lines.append(f"{name} = data.{reader}(max_bits={field.max_bits})")
+        elif isinstance(field, UTF):
+            write_lines.append(f"buf.write_utf(self.{name}, max_varuint_bits={field.max_varuint_bits})")
+            read_lines.append(f"{name} = data.read_utf(max_varuint_bits={field.max_varuint_bits})")
+        else:
+            field_name = f"_f{len(namespace)}"
+            namespace[field_name] = field
+            write_lines.append(f"{field_name}.write(buf, self.{name})")
+            read_lines.append(f"{name} = {field_name}.read(data)")
+    flush_fixed_run()
+
+    init_params = ["self", *(name for name in names if name not in defaults)]
+    if defaults:
+        init_params.append("*")
+        for name in names:
+            if name in defaults:
+                default_name = f"_d{len(namespace)}"
+                namespace[default_name] = defaults[name]
+                init_params.append(f"{name}={default_name}")
+
+    assignments = [f"self.{name} = {name}" for name in names]
+    source = "\n".join(
+        [
+            f"def __init__({', '.join(init_params)}):",
+            *(f"    {line}" for line in assignments or ["pass"]),
+            "def serialize_into(self, buf):",
+            *(f"    {line}" for line in write_lines or ["pass"]),
+            "def deserialize(cls, data):",
+            *(f"    {line}" for line in read_lines),
+            "    pool = cls._pool",
+            "    if pool:",
+            "        try:",
+            "            self = pool.pop()",
+            "        except IndexError:  # Emptied by another thread since the check (decoding off the event loop)",
+            "            self = _new(cls)",
+            "    else:",
+            "        self = _new(cls)",
+            *(f"    {line}" for line in assignments),
+            "    return self",
+        ]
+    )
+    exec(compile(source, f"<packet schema {qualname}>", "exec"), namespace)
+
+    functions: dict[str, Callable[..., Any]] = {}
+    for func_name in ("__init__", "serialize_into", "deserialize"):
+        func = namespace[func_name]
+        func.__qualname__ = f"{qualname}.{func_name}"
+        functions[func_name] = func
+    functions["deserialize"] = classmethod(functions["deserialize"])  # type: ignore # classmethod isn't a callable
+    return functions
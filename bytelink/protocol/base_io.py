@@ -3,10 +3,12 @@ from __future__ import annotations
 import struct
 from abc import ABC, abstractmethod
 from enum import Enum
+from functools import lru_cache
 from itertools import count
-from typing import Literal, TYPE_CHECKING, Union, overload
+from typing import Any, Iterable, Literal, TYPE_CHECKING, Union, overload
 
 from bytelink.protocol.utils import from_twos_complement, to_twos_complement
+from bytelink.protocol.varint import encode_varuint
 
 if TYPE_CHECKING:
     from typing_extensions import TypeAlias
@@ -31,6 +33,17 @@ class StructFormat(str, Enum):
     LONGLONG = "q"
     ULONGLONG = "Q"
 
+    def __init__(self, value: str):
+        # Precompile the big-endian struct for this format, so that it doesn't need to be parsed on each read/write
+        self.struct = struct.Struct(">" + value)
+        self.size = self.struct.size
+
+
+@lru_cache(maxsize=256)
+def _array_struct(fmt: StructFormat, count: int) -> struct.Struct:
+    """Get a precompiled big-endian struct holding `count` values of given struct format."""
+    return struct.Struct(f">{count}{fmt.value}")
+
 
 INT_FORMATS_TYPE: TypeAlias = Union[
     Literal[StructFormat.BYTE],
@@ -80,9 +93,39 @@ class BaseSyncWriter(ABC):
     def write_value(self, fmt: StructFormat, value: object) -> None:
         """Write a value of given struct format in big-endian mode."""
         try:
-            self.write(struct.pack(">" + fmt.value, value))
+            data = fmt.struct.pack(value)
+        except struct.error as exc:
+            raise ValueError(str(exc)) from exc
+        self.write(data)
+
+    @overload
+    def write_values(self, fmt: INT_FORMATS_TYPE, values: Iterable[int]) -> None:
+        ...
+
+    @overload
+    def write_values(self, fmt: FLOAT_FORMATS_TYPE, values: Iterable[float]) -> None:
+        ...
+
+    @overload
+    def write_values(self, fmt: Literal[StructFormat.BOOL], values: Iterable[bool]) -> None:
+        ...
+
+    @overload
+    def write_values(self, fmt: Literal[StructFormat.CHAR], values: Iterable[str]) -> None:
+        ...
+
+    def write_values(self, fmt: StructFormat, values: Iterable[object]) -> None:
+        """Write multiple values of given struct format in big-endian mode, packing them all at once."""
+        values = tuple(values)
+        self.write_struct(_array_struct(fmt, len(values)), *values)
+
+    def write_struct(self, compiled: struct.Struct, *values: object) -> None:
+        """Pack and write given values using a precompiled struct."""
+        try:
+            data = compiled.pack(*values)
         except struct.error as exc:
             raise ValueError(str(exc)) from exc
+        self.write(data)
 
     def write_varuint(self, value: int, /, *, max_bits: int) -> None:
         """Write an arbitrarily big unsigned integer in a variable length format.
@@ -98,19 +141,7 @@ class BaseSyncWriter(ABC):
         this one. The least significant group is written first, followed by each of the more significant groups, making
         varnums little-endian, however in groups of 7 bits, not 8.
         """
-        value_max = (1 << (max_bits)) - 1
-        if value < 0 or value > value_max:
-            raise ValueError(f"Tried to write varint outside of the range of {max_bits}-bit int.")
-
-        remaining = value
-        while True:
-            if remaining & ~0x7F == 0:  # final byte
-                self.write_value(StructFormat.UBYTE, remaining)
-                return
-            # Write only 7 least significant bits with the first bit being 1, marking there will be another byte
-            self.write_value(StructFormat.UBYTE, remaining & 0x7F | 0x80)
-            # Subtract the value we've already sent (7 least significant bits)
-            remaining >>= 7
+        self.write(encode_varuint(value, max_bits=max_bits))
 
     def write_varint(self, value: int, /, *, max_bits: int) -> None:
         """Write an arbitrarily big signed integer in a variable length format.
@@ -172,13 +203,36 @@ class BaseSyncReader(ABC):
 
         The amount of bytes to read will be determined based on the struct format automatically.
         """
-        length = struct.calcsize(fmt.value)
-        data = self.read(length)
+        unpacked = self.read_struct(fmt.struct)
+        return unpacked[0]
+
+    @overload
+    def read_values(self, fmt: INT_FORMATS_TYPE, count: int) -> tuple[int, ...]:
+        ...
+
+    @overload
+    def read_values(self, fmt: FLOAT_FORMATS_TYPE, count: int) -> tuple[float, ...]:
+        ...
+
+    @overload
+    def read_values(self, fmt: Literal[StructFormat.BOOL], count: int) -> tuple[bool, ...]:
+        ...
+
+    @overload
+    def read_values(self, fmt: Literal[StructFormat.CHAR], count: int) -> tuple[str, ...]:
+        ...
+
+    def read_values(self, fmt: StructFormat, count: int) -> tuple[object, ...]:
+        """Read `count` values of given struct format in big-endian mode, unpacking them all at once."""
+        return self.read_struct(_array_struct(fmt, count))
+
+    def read_struct(self, compiled: struct.Struct) -> tuple[Any, ...]:
+        """Read and unpack all of the values of given precompiled struct."""
+        data = self.read(compiled.size)
         try:
-            unpacked = struct.unpack(">" + fmt.value, data)
+            return compiled.unpack(data)
         except struct.error as exc:
             raise ValueError(str(exc)) from exc
-        return unpacked[0]
 
     def read_varuint(self, *, max_bits: int) -> int:
         """Read an arbitrarily big unsigned integer in a variable length format.
@@ -198,7 +252,7 @@ class BaseSyncReader(ABC):
 
         result = 0
         for i in count():  # pragma: no branch # count() iterator won't ever deplete
-            byte = self.read_value(StructFormat.UBYTE)
+            byte = self.read(1)[0]
             # Read 7 least significant value bits in this byte, and shift them appropriately to be in the right place
             # then simply add them (OR) as additional 7 most significant bits in our result
             result |= (byte & 0x7F) << (7 * i)
@@ -273,9 +327,39 @@ class BaseAsyncWriter(ABC):
     async def write_value(self, fmt: StructFormat, value: object) -> None:
         """Write a value of given struct format in big-endian mode."""
         try:
-            await self.write(struct.pack(">" + fmt.value, value))
+            data = fmt.struct.pack(value)
         except struct.error as exc:
             raise ValueError(str(exc)) from exc
+        await self.write(data)
+
+    @overload
+    async def write_values(self, fmt: INT_FORMATS_TYPE, values: Iterable[int]) -> None:
+        ...
+
+    @overload
+    async def write_values(self, fmt: FLOAT_FORMATS_TYPE, values: Iterable[float]) -> None:
+        ...
+
+    @overload
+    async def write_values(self, fmt: Literal[StructFormat.BOOL], values: Iterable[bool]) -> None:
+        ...
+
+    @overload
+    async def write_values(self, fmt: Literal[StructFormat.CHAR], values: Iterable[str]) -> None:
+        ...
+
+    async def write_values(self, fmt: StructFormat, values: Iterable[object]) -> None:
+        """Write multiple values of given struct format in big-endian mode, packing them all at once."""
+        values = tuple(values)
+        await self.write_struct(_array_struct(fmt, len(values)), *values)
+
+    async def write_struct(self, compiled: struct.Struct, *values: object) -> None:
+        """Pack and write given values using a precompiled struct."""
+        try:
+            data = compiled.pack(*values)
+        except struct.error as exc:
+            raise ValueError(str(exc)) from exc
+        await self.write(data)
 
     async def write_varuint(self, value: int, /, *, max_bits: int) -> None:
         """Write an arbitrarily big unsigned integer in a variable length format.
@@ -291,19 +375,7 @@ class BaseAsyncWriter(ABC):
         this one. The least significant group is written first, followed by each of the more significant groups, making
         varnums little-endian, however in groups of 7 bits, not 8.
         """
-        value_max = (1 << (max_bits)) - 1
-        if value < 0 or value > value_max:
-            raise ValueError(f"Tried to write varint outside of the range of {max_bits}-bit int.")
-
-        remaining = value
-        while True:
-            if remaining & ~0x7F == 0:  # final byte
-                await self.write_value(StructFormat.UBYTE, remaining)
-                return
-            # Write only 7 least significant bits with the first bit being 1, marking there will be another byte
-            await self.write_value(StructFormat.UBYTE, remaining & 0x7F | 0x80)
-            # Subtract the value we've already sent (7 least significant bits)
-            remaining >>= 7
+        await self.write(encode_varuint(value, max_bits=max_bits))
 
     async def write_varint(self, value: int, /, *, max_bits: int) -> None:
         """Write an arbitrarily big signed integer in a variable length format.
@@ -365,13 +437,36 @@ class BaseAsyncReader(ABC):
 
         The amount of bytes to read will be determined based on the struct format automatically.
         """
-        length = struct.calcsize(fmt.value)
-        data = await self.read(length)
+        unpacked = await self.read_struct(fmt.struct)
+        return unpacked[0]
+
+    @overload
+    async def read_values(self, fmt: INT_FORMATS_TYPE, count: int) -> tuple[int, ...]:
+        ...
+
+    @overload
+    async def read_values(self, fmt: FLOAT_FORMATS_TYPE, count: int) -> tuple[float, ...]:
+        ...
+
+    @overload
+    async def read_values(self, fmt: Literal[StructFormat.BOOL], count: int) -> tuple[bool, ...]:
+        ...
+
+    @overload
+    async def read_values(self, fmt: Literal[StructFormat.CHAR], count: int) -> tuple[str, ...]:
+        ...
+
+    async def read_values(self, fmt: StructFormat, count: int) -> tuple[object, ...]:
+        """Read `count` values of given struct format in big-endian mode, unpacking them all at once."""
+        return await self.read_struct(_array_struct(fmt, count))
+
+    async def read_struct(self, compiled: struct.Struct) -> tuple[Any, ...]:
+        """Read and unpack all of the values of given precompiled struct."""
+        data = await self.read(compiled.size)
         try:
-            unpacked = struct.unpack(">" + fmt.value, data)
+            return compiled.unpack(data)
         except struct.error as exc:
             raise ValueError(str(exc)) from exc
-        return unpacked[0]
 
     async def read_varuint(self, *, max_bits: int) -> int:
         """Read an arbitrarily big unsigned integer in a variable length format.
@@ -391,7 +486,7 @@ class BaseAsyncReader(ABC):
 
         result = 0
         for i in count():  # pragma: no branch # count() iterator won't ever deplete
-            byte = await self.read_value(StructFormat.UBYTE)
+            byte = (await self.read(1))[0]
             # Read 7 least significant value bits in this byte, and shift them appropriately to be in the right place
             # then simply add them (OR) as additional 7 most significant bits in our result
             result |= (byte & 0x7F) << (7 * i)
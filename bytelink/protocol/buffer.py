@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from bytelink.protocol.base_io import BaseSyncReader, BaseSyncWriter
+import struct
+from typing import Any, Optional
+
+from bytelink.protocol.base_io import BaseSyncReader, BaseSyncWriter, StructFormat
+from bytelink.protocol.varint import BytesLike, decode_varuint
 
 
 class Buffer(BaseSyncReader, BaseSyncWriter, bytearray):
@@ -45,6 +49,66 @@ class Buffer(BaseSyncReader, BaseSyncWriter, bytearray):
         finally:
             self.pos = end
 
+    def read_view(self, length: int) -> memoryview:
+        """Read data stored in the buffer as a read-only memoryview, without copying it.
+
+        Note that the buffer can't be resized (written into or cleared) while any such views are still alive, trying
+        to do so will raise a BufferError. Views can be released with `memoryview.release`.
+
+        Reading more data than available will raise an IOError, the same way as it would with `read`.
+        """
+        end = self.pos + length
+        if end > len(self):
+            self.read(length)  # Raises an IOError the same way any other too long read would
+
+        view = memoryview(self).toreadonly()[self.pos : end]
+        self.pos = end
+        return view
+
+    def view(self) -> BufferView:
+        """Get a read-only cursor over the remaining data, sharing the storage of this buffer.
+
+        Reading from the returned view doesn't affect the position in this buffer. The same restrictions on resizing
+        the buffer apply as with `read_view`, until the returned view is released.
+        """
+        return BufferView(memoryview(self)[self.pos :])
+
+    def read_struct(self, compiled: struct.Struct) -> tuple[Any, ...]:
+        """Unpack all of the values of given precompiled struct directly from the stored data, without slicing it."""
+        end = self.pos + compiled.size
+        if end > len(self):
+            self.read(compiled.size)  # Raises an IOError the same way any other too long read would
+
+        values = compiled.unpack_from(self, self.pos)
+        self.pos = end
+        return values
+
+    def unpack_from(self, fmt: StructFormat, offset: int) -> Any:
+        """Unpack a value of given struct format at given offset, without affecting the position."""
+        try:
+            return fmt.struct.unpack_from(self, offset)[0]
+        except struct.error as exc:
+            raise IOError(str(exc)) from exc
+
+    def pack_into(self, fmt: StructFormat, offset: int, value: object) -> None:
+        """Pack a value of given struct format over the already stored data at given offset.
+
+        This is mostly useful for filling in values which weren't known at the time they should've been written,
+        such as sizes of the data written after them.
+        """
+        try:
+            fmt.struct.pack_into(self, offset, value)
+        except struct.error as exc:
+            raise ValueError(str(exc)) from exc
+
+    def read_varuint(self, *, max_bits: int) -> int:
+        """Read a varuint directly out of the stored data, without reading it byte by byte.
+
+        For more information about varints check `BaseSyncReader.read_varuint` docstring.
+        """
+        value, self.pos = decode_varuint(self, self.pos, max_bits=max_bits)
+        return value
+
     def clear(self, only_already_read: bool = False) -> None:
         """
         Clear out the stored data and reset position.
@@ -72,3 +136,98 @@ class Buffer(BaseSyncReader, BaseSyncWriter, bytearray):
     def remaining(self) -> int:
         """Get the amount of bytes that's still remaining in be buffer to be read."""
         return len(self) - self.pos
+
+
+class BufferView(BaseSyncReader):
+    """Read-only cursor over any bytes-like object, sharing it's storage instead of copying it.
+
+    Unlike reading from a `Buffer`, which always returns a copy of the read data, the `read_view` method returns
+    memoryview slices of the underlying data. The data is only copied once a read needs its own bytes (`read` and
+    `read_bytearray`), strings are decoded right from the shared storage.
+
+    Sub-views (cursors) over a part of the data can be made with `cursor`, sharing the same storage.
+    """
+
+    __slots__ = ("_view", "pos")
+
+    def __init__(self, data: BytesLike = b""):
+        self._view = memoryview(data).toreadonly()
+        self.pos = 0
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def __bytes__(self) -> bytes:
+        return self._view.tobytes()
+
+    def read_view(self, length: int) -> memoryview:
+        """Read given amount of bytes as a read-only memoryview slice of the underlying data.
+
+        Trying to read more data than is available will raise an IOError, however it will deplete the remaining data,
+        mimicking the behavior of `Buffer.read`.
+        """
+        end = self.pos + length
+        if end > len(self._view):
+            bytes_read = len(self._view) - self.pos
+            data = self._view[self.pos :].tobytes()
+            self.pos = len(self._view)
+            raise IOError(
+                "Requested to read more data than available."
+                f" Read {bytes_read} bytes: {data!r}, out of {length} requested bytes."
+            )
+
+        view = self._view[self.pos : end]
+        self.pos = end
+        return view
+
+    def read(self, length: int) -> bytearray:
+        """Read given amount of bytes, copying them out of the underlying data."""
+        return bytearray(self.read_view(length))
+
+    def read_struct(self, compiled: struct.Struct) -> tuple[Any, ...]:
+        """Unpack all of the values of given precompiled struct directly from the underlying data."""
+        end = self.pos + compiled.size
+        if end > len(self._view):
+            self.read_view(compiled.size)  # Raises an IOError the same way any other too long read would
+
+        values = compiled.unpack_from(self._view, self.pos)
+        self.pos = end
+        return values
+
+    def read_varuint(self, *, max_bits: int) -> int:
+        """Read a varuint directly out of the underlying data.
+
+        For more information about varints check `BaseSyncReader.read_varuint` docstring.
+        """
+        value, self.pos = decode_varuint(self._view, self.pos, max_bits=max_bits)
+        return value
+
+    def read_utf(self, *, max_varuint_bits: int = 16) -> str:
+        """Read a UTF-8 encoded string, decoding it right from the underlying data.
+
+        For more information check `BaseSyncReader.read_utf` docstring.
+        """
+        length = self.read_varuint(max_bits=max_varuint_bits)
+        return str(self.read_view(length), "utf-8")
+
+    def cursor(self, length: Optional[int] = None) -> BufferView:
+        """Get a sub-view over the next `length` bytes (or all of the remaining ones), sharing the same storage.
+
+        The position in this view is moved after the data covered by the returned sub-view.
+        """
+        if length is None:
+            length = self.remaining
+        return BufferView(self.read_view(length))
+
+    def reset(self) -> None:
+        """Reset the position in the view."""
+        self.pos = 0
+
+    def release(self) -> None:
+        """Release the underlying memoryview, allowing the storage it was made from to be resized again."""
+        self._view.release()
+
+    @property
+    def remaining(self) -> int:
+        """Get the amount of bytes that's still remaining in the view to be read."""
+        return len(self._view) - self.pos
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from typing import Optional, Union
+
+from bytelink.protocol.utils import from_twos_complement, to_twos_complement
+
+# All bytes-like objects supported by the codec
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Varints are used for packet lengths and packet ids, so this runs for every packet. That's why the common small
+# values, which take up at most 2 bytes, are encoded with a lookup into a precomputed table and decoded by indexing
+# the bytes directly. For more information about varints check `BaseSyncWriter.write_varuint` docstring.
+_TABLE_LIMIT = 1 << 14
+
+
+def _encode_varuint_slow(value: int) -> bytes:
+    """Encode a non-negative integer, without any range checks or fast paths."""
+    out = bytearray()
+    while value & ~0x7F:
+        # Write only 7 least significant bits with the first bit being 1, marking there will be another byte
+        out.append(value & 0x7F | 0x80)
+        # Subtract the value we've already encoded (7 least significant bits)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+_ENCODE_TABLE: tuple[bytes, ...] = tuple(_encode_varuint_slow(value) for value in range(_TABLE_LIMIT))
+
+
+def varuint_size(value: int, /) -> int:
+    """Get the amount of bytes the given non-negative integer takes up once encoded as varuint."""
+    return max(1, (value.bit_length() + 6) // 7)
+
+
+def encode_varuint(value: int, /, *, max_bits: int) -> bytes:
+    """Encode an arbitrarily big unsigned integer into the variable length format.
+
+    Encoding is limited to integer values of `max_bits` bits, trying to encode bigger values will raise a ValueError.
+    """
+    if 0 <= value < _TABLE_LIMIT and not value >> max_bits:
+        return _ENCODE_TABLE[value]
+
+    if value < 0 or value >> max_bits:
+        raise ValueError(f"Tried to write varint outside of the range of {max_bits}-bit int.")
+    return _encode_varuint_slow(value)
+
+
+def encode_varint(value: int, /, *, max_bits: int) -> bytes:
+    """Encode an arbitrarily big signed integer into the variable length format."""
+    return encode_varuint(to_twos_complement(value, bits=max_bits), max_bits=max_bits)
+
+
+def encode_varuint_into(buf: Union[bytearray, memoryview], offset: int, value: int, /, *, max_bits: int) -> int:
+    """Encode an unsigned integer into the variable length format, directly into `buf` at given `offset`.
+
+    The buffer has to already be big enough to hold the encoded value (see `varuint_size`), it won't be resized.
+    Returns the offset right after the encoded varuint.
+    """
+    data = encode_varuint(value, max_bits=max_bits)
+    end = offset + len(data)
+    if end > len(buf):
+        raise ValueError(f"Buffer too small to hold the varuint ({len(buf)} bytes, but need {end} bytes).")
+    buf[offset:end] = data
+    return end
+
+
+def peek_varuint(data: BytesLike, offset: int = 0, /, *, max_bits: int) -> Optional[tuple[int, int]]:
+    """Decode a varuint from `data` at given `offset`, if the data holds the whole varuint.
+
+    Returns a tuple of the decoded value and the offset right after the varuint, or `None` if the data ends before
+    the varuint does. Reading values bigger than `max_bits` bits will raise an IOError.
+    """
+    end = len(data)
+    if offset < end:
+        byte = data[offset]
+        if byte < 0x80:
+            if byte >> max_bits:
+                raise IOError(f"Received varint was outside the range of {max_bits}-bit int.")
+            return byte, offset + 1
+
+        if offset + 1 < end:
+            byte2 = data[offset + 1]
+            if byte2 < 0x80:
+                result = (byte & 0x7F) | (byte2 << 7)
+                if result >> max_bits:
+                    raise IOError(f"Received varint was outside the range of {max_bits}-bit int.")
+                return result, offset + 2
+
+    # Slow path, for bigger (or incomplete) values
+    value_max = (1 << max_bits) - 1
+    result = 0
+    shift = 0
+    while offset < end:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        # Stop reading as soon as the size gets over the maximum, rather than after reading all of the bytes
+        if result > value_max:
+            raise IOError(f"Received varint was outside the range of {max_bits}-bit int.")
+        if not byte & 0x80:
+            return result, offset
+        shift += 7
+    return None
+
+
+def decode_varuint(data: BytesLike, offset: int = 0, /, *, max_bits: int) -> tuple[int, int]:
+    """Decode a varuint from `data` at given `offset`.
+
+    Returns a tuple of the decoded value and the offset right after the varuint. If the data ends before the varuint
+    does, or if the value is bigger than `max_bits` bits, an IOError will be raised.
+    """
+    parsed = peek_varuint(data, offset, max_bits=max_bits)
+    if parsed is None:
+        raise IOError(f"Data ended before the varuint did (got {len(data) - offset} bytes).")
+    return parsed
+
+
+def decode_varint(data: BytesLike, offset: int = 0, /, *, max_bits: int) -> tuple[int, int]:
+    """Decode a signed varint from `data` at given `offset`, check `decode_varuint` for more details."""
+    value, offset = decode_varuint(data, offset, max_bits=max_bits)
+    return from_twos_complement(value, bits=max_bits), offset
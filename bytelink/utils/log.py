@@ -1,23 +1,38 @@
 from __future__ import annotations
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
+import time
 from pathlib import Path
-
-import coloredlogs  # type: ignore # pyright complains if this isn't installed
+from typing import Any, Mapping, Optional
 
 import bytelink.config
 
 LOG_LEVEL = logging.DEBUG if bytelink.config.DEBUG else logging.INFO
 LOG_FILE = bytelink.config.LOG_FILE
 LOG_FILE_MAX_SIZE = bytelink.config.LOG_FILE_MAX_SIZE
+LOG_QUEUE = bytelink.config.LOG_QUEUE
 LOG_FORMAT = "%(asctime)s | %(name)s | %(levelname)7s | %(message)s"
 
+# Maximum amount of log records waiting for the listener thread, records over it are dropped rather than waited on
+LOG_QUEUE_SIZE = 10_000
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def setup_logging(use_queue: bool = LOG_QUEUE) -> None:
+    """Sets up logging library to use our log format and defines log levels.
+
+    This isn't done on import, it's up to the entry points (`bytelink.bin`) to call it. With `use_queue`, the handlers
+    are moved to a listener thread (see `start_queue_listener`).
+    """
+    import coloredlogs  # type: ignore # pyright complains if this isn't installed
 
-def setup_logging() -> None:
-    """Sets up logging library to use our log format and defines log levels."""
     root_log = logging.getLogger()
     log_formatter = logging.Formatter(LOG_FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
 
@@ -38,3 +53,97 @@ def setup_logging() -> None:
         root_log.addHandler(file_handler)
 
     root_log.setLevel(LOG_LEVEL)
+
+    if use_queue:
+        start_queue_listener()
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler which never waits for the queue, records which don't fit into it are dropped (and counted)."""
+
+    def __init__(self, log_queue: queue.Queue[Any]):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def start_queue_listener(queue_size: int = LOG_QUEUE_SIZE) -> NonBlockingQueueHandler:
+    """Move all of the root logger handlers into a listener thread, with the root logger only queueing the records.
+
+    Logging then only costs formatting the message on the calling thread (the event loop), while writing it out,
+    which can stall on a slow terminal or disk, happens on the listener thread. The listener is stopped (handling all
+    of the queued records) on exit.
+    """
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        return _queue_handler
+
+    root_log = logging.getLogger()
+    handlers = root_log.handlers[:]
+    log_queue: queue.Queue[Any] = queue.Queue(queue_size)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+
+    for handler in handlers:
+        root_log.removeHandler(handler)
+    root_log.addHandler(_queue_handler)
+    _listener.start()
+    atexit.register(stop_queue_listener)
+    return _queue_handler
+
+
+def stop_queue_listener() -> None:
+    """Stop the listener thread, after it handles the queued records, and move its handlers back to the root logger."""
+    global _listener, _queue_handler
+    if _listener is None or _queue_handler is None:
+        return
+
+    root_log = logging.getLogger()
+    _listener.stop()
+    root_log.removeHandler(_queue_handler)
+    for handler in _listener.handlers:
+        root_log.addHandler(handler)
+    if _queue_handler.dropped:
+        root_log.warning("Dropped %d log records, as the log queue was full", _queue_handler.dropped)
+
+    _listener = _queue_handler = None
+    atexit.unregister(stop_queue_listener)
+
+
+class RateLimitedAdapter(logging.LoggerAdapter):
+    """Logger adapter dropping the messages over a rate limit, so that a single source can't flood the logs.
+
+    The limit is a token bucket, allowing bursts of up to `burst` messages, which refills at `rate` messages per
+    second. The amount of suppressed messages is mentioned in the next message which gets through.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: float, burst: int, extra: Optional[Mapping[str, object]] = None):
+        super().__init__(logger, extra or {})
+        self.rate = rate
+        self.burst = burst
+        self.suppressed = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def log(self, level: int, msg: object, *args, **kwargs) -> None:
+        if not self.isEnabledFor(level):
+            return
+
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            self.suppressed += 1
+            return
+        self._tokens -= 1
+
+        if self.suppressed:
+            msg = f"{msg} ({self.suppressed} similar messages were suppressed)"
+            self.suppressed = 0
+        msg, kwargs = self.process(msg, kwargs)
+        self.logger.log(level, msg, *args, **kwargs)
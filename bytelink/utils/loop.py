@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+from enum import Enum
+from typing import Any, Callable, Coroutine, TypeVar, Union
+
+import bytelink.config
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class EventLoop(Enum):
+    """Enum describing which event loop implementation should be used to run the entry points."""
+
+    AUTO = "auto"  # uvloop if it's installed, the default asyncio loop otherwise
+    ASYNCIO = "asyncio"
+    UVLOOP = "uvloop"
+
+
+def _uvloop_factory() -> Callable[[], asyncio.AbstractEventLoop]:
+    """Get the uvloop loop factory, raising `ImportError` if uvloop isn't installed (it's an optional dependency)."""
+    import uvloop  # type: ignore # pyright complains if this isn't installed
+
+    return uvloop.new_event_loop
+
+
+def get_loop_factory(loop: Union[EventLoop, str, None] = None) -> Callable[[], asyncio.AbstractEventLoop]:
+    """Get the factory for the new event loops of given implementation (`BYTELINK_EVENT_LOOP` by default).
+
+    When uvloop is requested but isn't installed, this falls back to the default asyncio loop, with a warning (unless
+    uvloop was only picked automatically).
+    """
+    loop = EventLoop(bytelink.config.EVENT_LOOP if loop is None else loop)
+    if loop is EventLoop.ASYNCIO:
+        return asyncio.new_event_loop
+
+    try:
+        return _uvloop_factory()
+    except ImportError:
+        if loop is EventLoop.UVLOOP:
+            log.warning("The uvloop event loop was requested, but uvloop isn't installed, using the asyncio loop")
+        return asyncio.new_event_loop
+
+
+def loop_name(loop: asyncio.AbstractEventLoop) -> str:
+    """Get the name of the event loop implementation, e.g. for reporting it along with benchmark results."""
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
+
+
+class _FactoryPolicy(asyncio.DefaultEventLoopPolicy):
+    def __init__(self, loop_factory: Callable[[], asyncio.AbstractEventLoop]):
+        super().__init__()
+        self._loop_factory = loop_factory
+
+    def new_event_loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop_factory()
+
+
+async def _with_eager_tasks(main: Coroutine[Any, Any, T]) -> T:
+    # Eager tasks start running right away, until their first suspension, without going through the loop's queue
+    asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)  # type: ignore[attr-defined]
+    return await main
+
+
+def run(
+    main: Coroutine[Any, Any, T],
+    loop: Union[EventLoop, str, None] = None,
+    *,
+    eager_tasks: bool = bytelink.config.EAGER_TASKS,
+) -> T:
+    """Run the coroutine in a new event loop (see `get_loop_factory`), the same way as `asyncio.run` would.
+
+    Eager task factory (python 3.12+) is used when `eager_tasks` is set (`BYTELINK_EAGER_TASKS` by default), it's
+    silently skipped on older python versions.
+    """
+    loop_factory = get_loop_factory(loop)
+    if eager_tasks and hasattr(asyncio, "eager_task_factory"):
+        main = _with_eager_tasks(main)
+
+    if sys.version_info >= (3, 12):
+        return asyncio.run(main, loop_factory=loop_factory)
+
+    # Older versions of asyncio.run can only create the loop through the (global) event loop policy, which is what
+    # asyncio.new_event_loop uses, so the default policy is left alone for the default loop
+    if loop_factory is asyncio.new_event_loop:
+        return asyncio.run(main)
+    asyncio.set_event_loop_policy(_FactoryPolicy(loop_factory))
+    try:
+        return asyncio.run(main)
+    finally:
+        asyncio.set_event_loop_policy(None)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Sequence, TYPE_CHECKING, Tuple, Union
+
+if TYPE_CHECKING:
+    from typing_extensions import TypeAlias
+
+# Labels of a single metric (in a family of metrics with the same name), as sorted `(name, value)` pairs
+LabelsType: TypeAlias = Tuple[Tuple[str, str], ...]
+
+
+def log_linear_buckets(lowest: float, highest: float, sub_buckets: int = 4) -> tuple[float, ...]:
+    """Make HDR-style histogram bucket bounds, covering the range from `lowest` up to at least `highest`.
+
+    Every power of two is split into `sub_buckets` linearly spaced buckets, so the relative error of any recorded
+    value is at most `1 / sub_buckets`, no matter how small or large the value is.
+    """
+    if lowest <= 0 or highest <= lowest or sub_buckets < 1:
+        raise ValueError(f"Invalid histogram range ({lowest} to {highest}, {sub_buckets} sub-buckets)")
+
+    bounds = []
+    base = lowest
+    while base < highest:
+        bounds.extend(base * (1 + i / sub_buckets) for i in range(sub_buckets))
+        base *= 2
+    bounds.append(base)
+    return tuple(bounds)
+
+
+# From a microsecond up to over 2 minutes, fine for anything measured in seconds
+LATENCY_BUCKETS = log_linear_buckets(1e-6, 120.0)
+
+
+class Counter:
+    """Monotonically increasing value, such as the amount of received packets.
+
+    Metrics aren't guarded by any locks, as they're only meant to be updated from the event loop thread.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        """Set the total directly, for totals which are counted elsewhere and only collected into the metric."""
+        self.value = value
+
+
+class Gauge:
+    """Value which can go both up and down, such as the amount of open connections."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram:
+    """Distribution of the observed values (such as latencies) in fixed buckets, given by their upper bounds."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        # The last bucket holds the values over the highest bound
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(self.bounds, tuple(self.counts), self.sum, self.count)
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    """Values of a histogram at the time of the snapshot."""
+
+    bounds: tuple[float, ...]
+    counts: tuple[int, ...]
+    sum: float
+    count: int
+
+    def quantile(self, q: float) -> float:
+        """Get the (upper bound of the bucket of the) value, under which the `q` portion of the values falls."""
+        if self.count == 0:
+            return math.nan
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return math.inf
+
+
+Metric: TypeAlias = Union[Counter, Gauge, Histogram]
+
+
+@dataclass(frozen=True)
+class FamilySnapshot:
+    """Values of all of the metrics with the same name, keyed by their labels."""
+
+    name: str
+    help: str
+    kind: str
+    values: dict[LabelsType, Union[float, HistogramSnapshot]]
+
+
+class _Family:
+    __slots__ = ("name", "help", "kind", "factory", "metrics")
+
+    def __init__(self, name: str, help: str, kind: str, factory: Callable[[], Metric]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.factory = factory
+        self.metrics: dict[LabelsType, Metric] = {}
+
+
+class MetricsRegistry:
+    """Registry of all the metrics, which can be snapshotted, or exported in the Prometheus text format.
+
+    Metrics are looked up by their name and labels, which is meant to be done once, with the metric object then
+    being kept and updated directly. Collectors are called before every snapshot, to update the metrics which
+    are cheaper to compute on demand (e.g. from the current state of the server) than to keep up to date.
+    """
+
+    def __init__(self):
+        self._families: dict[str, _Family] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _get(self, name: str, help: str, kind: str, factory: Callable[[], Metric], labels: dict[str, str]) -> Metric:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = _Family(name, help, kind, factory)
+        elif family.kind != kind:
+            raise ValueError(f"Metric {name} is already registered as a {family.kind}, not a {kind}")
+
+        key = tuple(sorted(labels.items()))
+        metric = family.metrics.get(key)
+        if metric is None:
+            metric = family.metrics[key] = family.factory()
+        return metric
+
+    def counter(self, name: str, help: str, **labels: str) -> Counter:
+        """Get the counter of given name and labels, creating it if it doesn't exist yet."""
+        return self._get(name, help, "counter", Counter, labels)  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, **labels: str) -> Gauge:
+        """Get the gauge of given name and labels, creating it if it doesn't exist yet."""
+        return self._get(name, help, "gauge", Gauge, labels)  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        bounds: Sequence[float] = LATENCY_BUCKETS,
+        **labels: str,
+    ) -> Histogram:
+        """Get the histogram of given name and labels, creating it (with given bucket bounds) if it doesn't exist."""
+        return self._get(name, help, "histogram", lambda: Histogram(bounds), labels)  # type: ignore[return-value]
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.remove(collector)
+
+    def snapshot(self) -> dict[str, FamilySnapshot]:
+        """Get the current values of all of the metrics."""
+        for collector in self._collectors:
+            collector()
+
+        snapshot = {}
+        for family in self._families.values():
+            values: dict[LabelsType, Union[float, HistogramSnapshot]] = {}
+            for labels, metric in family.metrics.items():
+                values[labels] = metric.snapshot() if isinstance(metric, Histogram) else metric.value
+            snapshot[family.name] = FamilySnapshot(family.name, family.help, family.kind, values)
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """Export the current values of all of the metrics in the Prometheus text exposition format."""
+        lines = []
+        for family in self.snapshot().values():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for labels, value in family.values.items():
+                if isinstance(value, HistogramSnapshot):
+                    cumulative = 0
+                    for bound, count in zip(value.bounds + (math.inf,), value.counts):
+                        cumulative += count
+                        bucket_labels = _format_labels(labels + (("le", _format_value(bound)),))
+                        lines.append(f"{family.name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{family.name}_sum{_format_labels(labels)} {_format_value(value.sum)}")
+                    lines.append(f"{family.name}_count{_format_labels(labels)} {value.count}")
+                else:
+                    lines.append(f"{family.name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path]) -> None:
+        """Write the metrics into a file (e.g. for the node exporter's textfile collector), replacing it atomically."""
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    async def serve_prometheus(self, host: str = "127.0.0.1", port: int = 9100) -> asyncio.Server:
+        """Start a minimal HTTP server, responding to any request with the metrics (for Prometheus to scrape)."""
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+                body = self.to_prometheus().encode()
+                head = (
+                    f"HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\nContent-Length: {len(body)}\r\n\r\n"
+                )
+                writer.write(head.encode() + body)
+                await writer.drain()
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+
+        return await asyncio.start_server(handle, host, port)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelsType) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
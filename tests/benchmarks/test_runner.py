@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.runner import (
+    Benchmark,
+    BenchmarkResult,
+    SavedResults,
+    compare,
+    load_results,
+    run_sync,
+    save_results,
+)
+
+
+def _result(name: str = "bench", ops_per_sec: float = 1000, peak_memory: float = 100) -> BenchmarkResult:
+    return BenchmarkResult(name, 100, ops_per_sec, 0.001, 0.002, peak_memory=peak_memory, retained_memory=0)
+
+
+def test_run_sync():
+    calls = []
+
+    def setup():
+        return lambda: calls.append(1)
+
+    result = run_sync(Benchmark("append", setup, is_async=False, batch=10, samples=5))
+
+    assert result.ops == 50
+    assert result.ops_per_sec > 0
+    assert result.p50 <= result.p99
+    assert result.peak_memory is not None
+    # Warmup and memory measurements run the operation too
+    assert len(calls) > 50
+
+
+def _saved(results: list[BenchmarkResult], event_loop: str = "asyncio") -> SavedResults:
+    return SavedResults(
+        {result.name: result for result in results},
+        event_loop=event_loop,
+        python="3.11",
+        implementation="CPython",
+        platform="Linux",
+        time=0.0,
+    )
+
+
+def test_compare():
+    baseline = _saved([_result(), _result("other")])
+
+    assert compare([_result(ops_per_sec=950), _result("new")], baseline) == []
+
+    regressions = compare([_result(ops_per_sec=800, peak_memory=1000)], baseline)
+    assert [regression.metric for regression in regressions] == ["ops_per_sec", "peak_memory"]
+
+
+def test_compare_other_event_loop():
+    baseline = _saved([_result()], event_loop="asyncio")
+
+    assert compare([_result()], _saved([_result()], event_loop="uvloop"), event_loop="uvloop") == []
+    with pytest.raises(ValueError):
+        compare([_result()], baseline, event_loop="uvloop")
+
+
+def test_save_load(tmp_path: Path):
+    path = tmp_path / "results.json"
+    save_results(path, [_result()], "uvloop")
+
+    saved = load_results(path)
+    assert saved.results == {"bench": _result()}
+    assert saved.event_loop == "uvloop"
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable, Optional, TypeVar, Union
+from unittest.mock import AsyncMock, MagicMock
+
+from bytelink.exceptions import DisconnectError, ProcessingError, ReadError
+from bytelink.network.connection import Connection
+from bytelink.network.server import BaseServer
+from bytelink.packets.abc import ServerBoundPacket
+from bytelink.packets.handshaking import Handshake
+from bytelink.packets.ping import Ping, Pong
+from tests.protocol.helpers import ReadFunctionMock, WriteFunctionMock
+
+T_SERVER = TypeVar("T_SERVER", bound=BaseServer)
+
+
+class MockReader(MagicMock):
+    spec_set = asyncio.StreamReader
+
+    def __init__(self, *args, read_data: Optional[bytearray] = None, **kw) -> None:
+        super().__init__(*args, **kw)
+        self.read_f_mock = ReadFunctionMock(combined_data=read_data)
+
+    async def read(self, *a, **kw) -> bytearray:
+        """Override read function of StreamReader to use the read mock."""
+        return self.read_f_mock(*a, **kw)
+
+
+class MockWriter(MagicMock):
+    spec_set = asyncio.StreamWriter
+
+    def __init__(self, *args, **kw) -> None:
+        super().__init__(*args, **kw)
+        self.write_f_mock = WriteFunctionMock()
+        self.transport = MagicMock()
+        self.transport.get_write_buffer_size.return_value = 0
+        self.is_closing = MagicMock(return_value=False)
+        self.drain_mock = AsyncMock()
+
+    def write(self, *a, **kw) -> None:
+        """Override the write function of StreamWriter to use the write mock."""
+        self.write_f_mock(*a, **kw)
+
+    def writelines(self, data: Iterable[bytes]) -> None:
+        """Override the writelines function of StreamWriter to use the write mock."""
+        self.write_f_mock(b"".join(data))
+
+    async def drain(self) -> None:
+        """Override the drain function of StreamWriter to use the drain mock."""
+        await self.drain_mock()
+
+
+class EchoServer(BaseServer):
+    async def on_connect(self, client_conn: Connection) -> None:
+        packet = await self.read_packet(client_conn)
+        assert isinstance(packet, Handshake)
+        await self.negotiate_compression(client_conn, packet)
+
+    async def on_error(self, client_conn: Connection, error: Union[ProcessingError, ReadError]) -> None:
+        raise DisconnectError("Error")
+
+    async def on_close(self, client_conn: Connection, disconnect_exc: DisconnectError) -> None:
+        pass
+
+    async def on_packet(self, client_conn: Connection, packet: ServerBoundPacket) -> None:
+        if isinstance(packet, Ping):
+            await self.write_packet(client_conn, Pong(packet.token, request_id=packet.request_id))
+
+
+class SlowEchoServer(EchoServer):
+    """Echo server, which takes as many hundredths of a second to respond, as the token of the ping says."""
+
+    async def on_packet(self, client_conn: Connection, packet: ServerBoundPacket) -> None:
+        if isinstance(packet, Ping):
+            token = packet.token
+            await asyncio.sleep(int(token) / 100)
+            await self.write_packet(client_conn, Pong(token, request_id=packet.request_id))
+
+
+@asynccontextmanager
+async def loopback_server(
+    server_cls: type[T_SERVER],
+    timeout: float,
+    **kwargs: Any,
+) -> AsyncIterator[tuple[T_SERVER, tuple[str, int]]]:
+    """Run the server on a free loopback port, yielding it along with the address it's listening on."""
+    server = await server_cls.create(("127.0.0.1", 0), timeout, **kwargs)
+    async with server:
+        yield server, ("127.0.0.1", server._server.sockets[0].getsockname()[1])
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bytelink.network.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    ConnectionSlots,
+    RejectReason,
+    TokenBucket,
+)
+
+
+def test_connection_slots():
+    slots = ConnectionSlots(2)
+
+    assert slots.try_acquire()
+    assert slots.try_acquire()
+    assert not slots.try_acquire()
+    slots.release()
+    assert slots.try_acquire()
+    assert slots.used == 2
+
+
+def test_connection_slots_unlimited():
+    slots = ConnectionSlots()
+
+    assert all(slots.try_acquire() for _ in range(1000))
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=0.001, burst=3)
+
+    assert [bucket.try_take() for _ in range(4)] == [True, True, True, False]
+
+
+def test_admit_limits():
+    admission = AdmissionController(max_connections=3, max_per_ip=2)
+
+    assert admission.admit("1.1.1.1") is None
+    assert admission.admit("1.1.1.1") is None
+    assert admission.admit("1.1.1.1") is RejectReason.IP_LIMIT
+    assert admission.admit("2.2.2.2") is None
+    assert admission.admit("3.3.3.3") is RejectReason.SERVER_FULL
+
+    admission.release("1.1.1.1")
+    assert admission.admit("3.3.3.3") is None
+    assert admission.occupancy.connections == 3
+    assert admission.occupancy.rejected == {RejectReason.IP_LIMIT: 1, RejectReason.SERVER_FULL: 1}
+
+
+def test_admit_rate():
+    admission = AdmissionController(accept_rate=0.001, accept_burst=2)
+
+    assert admission.admit("1.1.1.1") is None
+    assert admission.admit("2.2.2.2") is None
+    assert admission.admit("3.3.3.3") is RejectReason.RATE_LIMITED
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        AdmissionController(max_connections=1, slots=ConnectionSlots(1))
+
+
+async def test_handshake_queue():
+    admission = AdmissionController(max_handshakes=1, max_handshake_queue=1)
+    release = asyncio.Event()
+
+    async def handshake() -> None:
+        async with admission.handshake():
+            await release.wait()
+
+    first = asyncio.create_task(handshake())
+    second = asyncio.create_task(handshake())
+    await asyncio.sleep(0)
+    assert admission.occupancy.handshaking == 1
+    assert admission.occupancy.handshake_queue == 1
+
+    # The queue is full, further connections get rejected right away
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await handshake()
+    assert exc_info.value.reason is RejectReason.HANDSHAKE_QUEUE_FULL
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert admission.occupancy.handshaking == 0
+    assert admission.occupancy.handshake_queue == 0
+
+
+async def test_handshake_queue_timeout():
+    admission = AdmissionController(max_handshakes=1, handshake_queue_timeout=0.05)
+
+    async with admission.handshake():
+        with pytest.raises(AdmissionRejected) as exc_info:
+            async with admission.handshake():
+                pass
+    assert exc_info.value.reason is RejectReason.HANDSHAKE_QUEUE_TIMEOUT
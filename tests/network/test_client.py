@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bytelink.exceptions import DisconnectError
+from bytelink.network.admission import AdmissionController
+from bytelink.network.client import Client
+from bytelink.network.pipeline import PipelineOptions
+from bytelink.packets.compression import Compression
+from bytelink.packets.ping import Ping, Pong
+from tests.network.helpers import EchoServer, SlowEchoServer, loopback_server
+
+
+async def test_ping():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        async with await Client.create(address, timeout=3) as client:
+            await client.connect()
+            assert await client.ping() > 0
+
+
+async def test_concurrent_requests():
+    # Responses come back in a different order than the requests were sent in
+    options = PipelineOptions(workers=4, ordered=False)
+    async with loopback_server(SlowEchoServer, timeout=3, pipeline=options) as (server, address):
+        async with await Client.create(address, timeout=3) as client:
+            await client.connect()
+            tokens = ["4", "3", "2", "1", "0"]
+            responses = await asyncio.gather(*(client.request(Ping(token)) for token in tokens))
+
+    assert all(isinstance(packet, Pong) for packet in responses)
+    assert [packet.token for packet in responses] == tokens  # type: ignore
+
+
+async def test_request_timeout():
+    async with loopback_server(SlowEchoServer, timeout=3) as (server, address):
+        async with await Client.create(address, timeout=3) as client:
+            await client.connect()
+            with pytest.raises(asyncio.TimeoutError):
+                await client.request(Ping("50"), timeout=0.05)
+            assert client._pending == {}
+
+
+async def test_request_disconnect():
+    admission = AdmissionController(max_connections=0)
+    async with loopback_server(EchoServer, timeout=3, admission=admission) as (server, address):
+        async with await Client.create(address, timeout=3) as client:
+            await client.connect()
+            # Depending on timing, the server rejects us either before or after the request was sent
+            with pytest.raises(DisconnectError):
+                await client.request(Ping("a"))
+
+
+async def test_close_fails_pending_requests():
+    async with loopback_server(SlowEchoServer, timeout=3) as (server, address):
+        async with await Client.create(address, timeout=float("inf")) as client:
+            await client.connect()
+            request = asyncio.create_task(client.request(Ping("100")))
+            await asyncio.sleep(0.01)
+
+            client.close()
+            with pytest.raises(DisconnectError):
+                await asyncio.wait_for(request, timeout=0.5)
+            assert client._pending == {}
+
+
+async def test_request_not_connected():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        async with await Client.create(address, timeout=3) as client:
+            with pytest.raises(RuntimeError):
+                await client.request(Ping("a"))
+
+
+async def test_compression():
+    # Low offload threshold, so that the large packets get (de)compressed in the thread pool
+    compression = Compression(threshold=64, offload_threshold=1024, zdict=b"hello " * 10)
+    async with loopback_server(EchoServer, timeout=3, compression=compression) as (server, address):
+        async with await Client.create(address, timeout=3, compression=compression) as client:
+            await client.connect()
+            assert client.connection.compression == compression
+
+            for token in ("short", "hello " * 100, "hello " * 1000):
+                response = await client.request(Ping(token))
+                assert isinstance(response, Pong)
+                assert response.token == token
+
+
+async def test_compression_dictionary_mismatch():
+    server_compression = Compression(threshold=64, zdict=b"server dictionary")
+    async with loopback_server(EchoServer, timeout=3, compression=server_compression) as (server, address):
+        client_compression = Compression(threshold=0, zdict=b"client dictionary")
+        async with await Client.create(address, timeout=3, compression=client_compression) as client:
+            await client.connect()
+            assert client.connection.compression == Compression(threshold=64)
+
+            response = await client.request(Ping("hello " * 100))
+            assert isinstance(response, Pong)
+
+
+async def test_compression_unsupported_by_server():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        async with await Client.create(address, timeout=3, compression=Compression()) as client:
+            await client.connect()
+            assert client.connection.compression is None
+            assert await client.ping() > 0
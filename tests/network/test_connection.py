@@ -1,37 +1,11 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Optional
-from unittest.mock import MagicMock
 
 import pytest
 
 from bytelink.network.connection import Connection
-from tests.protocol.helpers import ReadFunctionMock, WriteFunctionMock
-
-
-class MockReader(MagicMock):
-    spec_set = asyncio.StreamReader
-
-    def __init__(self, *args, read_data: Optional[bytearray] = None, **kw) -> None:
-        super().__init__(*args, **kw)
-        self.read_f_mock = ReadFunctionMock(combined_data=read_data)
-
-    async def read(self, *a, **kw):
-        """Override read function of StreamReader to use the read mock."""
-        return self.read_f_mock(*a, **kw)
-
-
-class MockWriter(MagicMock):
-    spec_set = asyncio.StreamWriter
-
-    def __init__(self, *args, **kw) -> None:
-        super().__init__(*args, **kw)
-        self.write_f_mock = WriteFunctionMock()
-
-    def write(self, *a, **kw):
-        """Override the write function of StreamWriter to use the write mock."""
-        self.write_f_mock(*a, **kw)
+from tests.network.helpers import MockReader, MockWriter
 
 
 async def test_read():
@@ -55,5 +29,132 @@ async def test_write():
     conn = Connection(MockReader(), MockWriter(), timeout=3)
 
     await conn.write(data)
+    await asyncio.sleep(0)  # Queued data gets flushed at the end of the loop iteration
 
     conn.writer.write_f_mock.assert_has_data(data)
+
+
+async def test_read_multiple_from_one_chunk():
+    conn = Connection(MockReader(read_data=bytearray(b"helloworld")), MockWriter(), timeout=3)
+
+    assert await conn.read(5) == bytearray(b"hello")
+    assert await conn.read(5) == bytearray(b"world")
+
+    conn.reader.read_f_mock.assert_called_once()
+
+
+async def test_read_bytearray_frames():
+    data = bytearray([5]) + b"hello" + bytearray([3]) + b"foo"
+    conn = Connection(MockReader(read_data=data), MockWriter(), timeout=3)
+
+    assert await conn.read_bytearray() == bytearray(b"hello")
+    assert await conn.read_bytearray() == bytearray(b"foo")
+
+    conn.reader.read_f_mock.assert_called_once()
+    conn.reader.read_f_mock.assert_read_everything()
+
+
+async def test_read_bytearray_frame_split_across_chunks():
+    data = bytearray([128, 1]) + bytearray(range(128)) + bytearray([2]) + b"ok"
+    conn = Connection(MockReader(read_data=data), MockWriter(), timeout=3)
+    conn.RECV_CHUNK_SIZE = 1
+
+    assert await conn.read_bytearray() == bytearray(range(128))
+    assert await conn.read_bytearray() == bytearray(b"ok")
+
+
+async def test_read_bytearray_incomplete_frame():
+    conn = Connection(MockReader(read_data=bytearray([10]) + b"short"), MockWriter(), timeout=3)
+    with pytest.raises(IOError):
+        await conn.read_bytearray()
+
+
+async def test_read_varuint():
+    conn = Connection(MockReader(read_data=bytearray([192, 132, 61])), MockWriter(), timeout=3)
+    conn.RECV_CHUNK_SIZE = 1
+
+    assert await conn.read_varuint(max_bits=32) == 1000000
+
+
+async def test_write_coalescing():
+    conn = Connection(MockReader(), MockWriter(), timeout=3)
+
+    await conn.write(b"hello")
+    await conn.write(b" ")
+    await conn.write(b"world")
+    assert conn.queued_bytes == 11
+    conn.writer.write_f_mock.assert_not_called()
+
+    await asyncio.sleep(0)
+
+    conn.writer.write_f_mock.assert_called_once()
+    conn.writer.write_f_mock.assert_has_data(bytearray(b"hello world"))
+    assert conn.queued_bytes == 0
+    assert conn.bytes_sent == 11
+    assert conn.flush_count == 1
+
+
+async def test_write_backpressure():
+    conn = Connection(MockReader(), MockWriter(), timeout=3, write_high_water=8, write_low_water=2)
+    conn.writer.transport.set_write_buffer_limits.assert_called_once_with(high=8, low=2)
+
+    await conn.write(b"1234")
+    conn.writer.drain_mock.assert_not_awaited()
+
+    await conn.write(b"56789")
+    conn.writer.drain_mock.assert_awaited_once()
+    conn.writer.write_f_mock.assert_has_data(bytearray(b"123456789"))
+    assert conn.drain_count == 1
+
+
+async def test_close_flushes():
+    conn = Connection(MockReader(), MockWriter(), timeout=3)
+
+    await conn.write(b"bye")
+    conn.close()
+
+    conn.writer.write_f_mock.assert_has_data(bytearray(b"bye"))
+    conn.writer.close.assert_called_once()
+
+
+async def test_idle_timeout():
+    conn = Connection(asyncio.StreamReader(), MockWriter(), timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await conn.read(1)
+
+
+async def test_idle_timeout_reset_by_data():
+    reader = asyncio.StreamReader()
+    conn = Connection(reader, MockWriter(), timeout=0.1)
+
+    async def feed():
+        for byte in b"abc":
+            await asyncio.sleep(0.06)
+            reader.feed_data(bytes([byte]))
+
+    task = asyncio.create_task(feed())
+    assert await conn.read(3) == bytearray(b"abc")
+    await task
+
+
+async def test_no_idle_timer_without_timeout():
+    reader = asyncio.StreamReader()
+    conn = Connection(reader, MockWriter(), timeout=float("inf"))
+
+    reader.feed_data(b"a")
+    await conn.read(1)
+
+    assert conn._idle_handle is None
+
+
+async def test_write_timeout():
+    conn = Connection(MockReader(), MockWriter(), timeout=3, write_timeout=0.05, write_high_water=1)
+
+    async def stalled_drain() -> None:
+        await asyncio.sleep(1)
+
+    conn.writer.drain_mock.side_effect = stalled_drain
+
+    with pytest.raises(asyncio.TimeoutError):
+        await conn.write(b"hello")
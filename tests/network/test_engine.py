@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from bytelink.config import PROTOCOL_VERSION
+from bytelink.network.connection import Connection
+from bytelink.network.engine import ConnectionProtocol, ProtocolConnection
+from bytelink.packets import encode_frame, read_packet, write_packet
+from bytelink.packets.handshaking import Handshake
+from bytelink.packets.ping import Ping, Pong
+from tests.network.helpers import EchoServer, loopback_server
+
+
+def make_protocol(on_connect) -> tuple[ConnectionProtocol, ProtocolConnection]:
+    protocol = ConnectionProtocol(on_connect, timeout=3)
+    protocol.connection_made(MagicMock())
+    return protocol, protocol.connection  # type: ignore
+
+
+def feed(protocol: ConnectionProtocol, data: bytes) -> None:
+    buf = protocol.get_buffer(-1)
+    buf[: len(data)] = data
+    protocol.buffer_updated(len(data))
+
+
+async def test_frame_split_across_chunks():
+    received = []
+
+    async def on_connect(conn: ProtocolConnection) -> None:
+        received.append(await read_packet(conn))
+
+    protocol, conn = make_protocol(on_connect)
+    frame = bytes(encode_frame(Ping("hello")))
+
+    feed(protocol, frame[:3])
+    await asyncio.sleep(0)
+    assert received == []
+    feed(protocol, frame[3:])
+    await protocol.task  # type: ignore
+
+    assert isinstance(received[0], Ping)
+    assert received[0].token == "hello"
+
+
+async def test_eof():
+    async def on_connect(conn: ProtocolConnection) -> None:
+        with pytest.raises(IOError, match="did not respond"):
+            await conn.read(1)
+
+    protocol, conn = make_protocol(on_connect)
+    protocol.eof_received()
+    await protocol.task  # type: ignore
+
+
+async def test_pause_reading():
+    async def on_connect(conn: ProtocolConnection) -> None:
+        await conn.read(ProtocolConnection.RECV_HIGH_WATER + 2)
+
+    protocol, conn = make_protocol(on_connect)
+    await asyncio.sleep(0)  # Let the reader wait for the data first
+    chunk = bytes(ConnectionProtocol.RECV_CHUNK_SIZE)
+    for _ in range(5):
+        feed(protocol, chunk)
+    await protocol.task  # type: ignore
+
+    # Nobody is waiting for the data now, once there's too much of it, reading gets paused
+    for _ in range(5):
+        feed(protocol, chunk)
+    conn.writer.transport.pause_reading.assert_called_once()  # type: ignore
+
+
+async def test_drain_waits_for_resume():
+    protocol, conn = make_protocol(lambda conn: asyncio.sleep(0))
+    conn.writer.transport.get_write_buffer_size.return_value = 0  # type: ignore
+    conn.write_nowait(b"hello")
+    protocol.pause_writing()
+
+    drain = asyncio.create_task(conn.drain())
+    await asyncio.sleep(0)
+    assert not drain.done()
+    conn.writer.transport.writelines.assert_not_called()  # type: ignore
+    conn.writer.transport.write.assert_called_once_with(b"hello")  # type: ignore
+
+    protocol.resume_writing()
+    await drain
+    await protocol.task  # type: ignore
+
+
+async def test_drain_connection_lost():
+    protocol, conn = make_protocol(lambda conn: asyncio.sleep(0))
+    protocol.pause_writing()
+    drain = asyncio.create_task(conn.drain())
+    await asyncio.sleep(0)
+
+    protocol.connection_lost(None)
+    with pytest.raises(ConnectionResetError):
+        await drain
+    with pytest.raises(ConnectionResetError):
+        await conn.drain()
+    await protocol.task  # type: ignore
+
+
+@pytest.mark.parametrize("engine", ["streams", "protocol"])
+async def test_server_engines(engine):
+    async with loopback_server(EchoServer, timeout=3, engine=engine) as (server, address):
+        reader, writer = await asyncio.open_connection(*address)
+        conn = Connection(reader, writer, timeout=3)
+
+        await write_packet(conn, Handshake(PROTOCOL_VERSION))
+        for token in ("a", "b", "c"):
+            await write_packet(conn, Ping(token))
+        responses = [await read_packet(conn) for _ in range(3)]
+        conn.close()
+
+    assert [(type(packet), packet.token) for packet in responses] == [(Pong, "a"), (Pong, "b"), (Pong, "c")]
+
+
+async def test_unknown_engine():
+    with pytest.raises(ValueError):
+        await EchoServer.create(("127.0.0.1", 0), timeout=3, engine="foo")  # type: ignore
+
+
+async def test_idle_timeout():
+    async def on_connect(conn: ProtocolConnection) -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await conn.read(1)
+
+    protocol = ConnectionProtocol(on_connect, timeout=0.05)
+    protocol.connection_made(MagicMock())
+    await protocol.task  # type: ignore
+
+
+async def test_handshake_timeout():
+    async with loopback_server(EchoServer, timeout=3, handshake_timeout=0.05) as (server, address):
+        reader, writer = await asyncio.open_connection(*address)
+
+        # The server closes the connection, as we never send the handshake
+        assert await asyncio.wait_for(reader.read(), timeout=3) == b""
+        writer.close()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+
+import pytest
+
+from bytelink.network.client import Client
+from bytelink.network.connection import Connection
+from bytelink.network.executors import ExecutionPolicy, Executors, execution_policy, get_execution_policy
+from bytelink.packets.abc import ServerBoundPacket
+from bytelink.packets.ping import Ping, Pong
+from tests.network.helpers import EchoServer, loopback_server
+
+
+@execution_policy(ExecutionPolicy.THREAD)
+def _reverse(token: str) -> str:
+    return token[::-1]
+
+
+class OffloadingServer(EchoServer):
+    async def on_packet(self, client_conn: Connection, packet: ServerBoundPacket) -> None:
+        if isinstance(packet, Ping):
+            token = await self.offload(_reverse, packet.token)
+            await self.write_packet(client_conn, Pong(token, request_id=packet.request_id))
+
+
+def test_execution_policy_marks():
+    assert get_execution_policy(_reverse) is ExecutionPolicy.THREAD
+    assert get_execution_policy(len) is ExecutionPolicy.INLINE
+    assert get_execution_policy(None) is ExecutionPolicy.INLINE
+
+
+@pytest.mark.parametrize("policy", (ExecutionPolicy.INLINE, ExecutionPolicy.THREAD))
+async def test_run_stats(policy: ExecutionPolicy):
+    executors = Executors()
+    try:
+        assert await executors.run(policy, sum, [1, 2, 3]) == 6
+        assert await executors.run(policy, sum, [4]) == 4
+    finally:
+        executors.shutdown()
+
+    stats = executors.stats[policy]
+    assert stats.count == 2
+    assert stats.max_run_time > 0
+    assert stats.average_run_time == stats.run_time / 2
+
+
+async def test_run_process():
+    executors = Executors(process_workers=1)
+    try:
+        assert await executors.run(ExecutionPolicy.PROCESS, math.factorial, 10) == 3628800
+    finally:
+        executors.shutdown(wait=True)
+    assert executors.stats[ExecutionPolicy.PROCESS].count == 1
+
+
+async def test_max_pending():
+    """Work over the limit of pending work should wait on the event loop, rather than in the executor queue."""
+    executors = Executors(thread_workers=4, max_pending=1)
+    try:
+        await asyncio.gather(*(executors.run(ExecutionPolicy.THREAD, time.sleep, 0.05) for _ in range(2)))
+    finally:
+        executors.shutdown()
+
+    stats = executors.stats[ExecutionPolicy.THREAD]
+    assert stats.count == 2
+    assert stats.wait_time >= 0.04
+
+
+async def test_server_offload(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(Ping, "__execution_policy__", ExecutionPolicy.THREAD, raising=False)
+    async with loopback_server(OffloadingServer, timeout=3) as (server, address):
+        async with await Client.create(address, timeout=3) as client:
+            await client.connect()
+            response = await client.request(Ping("abc"))
+
+    assert isinstance(response, Pong)
+    assert response.token == "cba"
+    # Ping was decoded in the thread pool, and the handler offloaded the reversing there too
+    assert server.executors.stats[ExecutionPolicy.THREAD].count == 2
+    # Handshake was decoded inline
+    assert server.executors.stats[ExecutionPolicy.INLINE].count == 1
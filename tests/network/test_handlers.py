@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+
+from bytelink.exceptions import MalformedPacketError, MalformedPacketState
+from bytelink.network.client import Client
+from bytelink.network.connection import Connection
+from bytelink.network.handlers import HandlerRegistry
+from bytelink.network.server import BaseServer, Server
+from bytelink.packets import PACKET_MAP, encode_frame
+from bytelink.packets.handshaking import Handshake
+from bytelink.packets.ping import Ping, Pong
+from tests.network.helpers import EchoServer, MockReader, MockWriter, loopback_server
+
+
+class DispatchServer(EchoServer):
+    on_packet = BaseServer.on_packet
+
+
+async def _handle_ping(client_conn: Connection, packet: Ping) -> None:
+    pass
+
+
+def test_register_invalid():
+    registry = HandlerRegistry(PACKET_MAP)
+    with pytest.raises(ValueError):
+        registry.register(Pong, _handle_ping)  # type: ignore[arg-type]
+
+    registry.register(Ping, _handle_ping)
+    with pytest.raises(ValueError):
+        registry.register(Ping, _handle_ping)
+
+
+def test_server_bound():
+    registry = HandlerRegistry(PACKET_MAP)
+    assert registry.server_bound == {Ping.PACKET_ID: Ping, Handshake.PACKET_ID: Handshake}
+
+
+def test_middleware():
+    registry = HandlerRegistry(PACKET_MAP)
+    registry.register(Ping, _handle_ping)
+    registry.register(Handshake, _handle_ping)
+    assert registry.dispatch[Ping.PACKET_ID] is _handle_ping
+    wrapped = []
+
+    def outer(packet_cls, handler):
+        wrapped.append(("outer", packet_cls, handler))
+        return handler if packet_cls is Handshake else ("outer", handler)
+
+    def inner(packet_cls, handler):
+        wrapped.append(("inner", packet_cls, handler))
+        return ("inner", handler)
+
+    registry.add_middleware(outer)
+    registry.add_middleware(inner)
+
+    # Middleware is only applied once, when the table is resolved, the first added one being the outermost
+    assert registry.dispatch[Ping.PACKET_ID] == ("outer", ("inner", _handle_ping))
+    assert registry.dispatch[Handshake.PACKET_ID] == ("inner", _handle_ping)
+    assert len(wrapped) == 4
+
+
+def test_class_handlers():
+    server = Server(("127.0.0.1", 0), timeout=3)
+    assert server.handlers.dispatch == {Ping.PACKET_ID: server.on_ping}
+
+
+async def test_handler_decorator():
+    received = []
+
+    async with loopback_server(DispatchServer, timeout=3) as (server, address):
+
+        @server.handler(Ping)
+        async def on_ping(client_conn: Connection, packet: Ping) -> None:
+            received.append(packet.token)
+            await server.write_packet(client_conn, Pong(packet.token, request_id=packet.request_id))
+
+        async with await Client.create(address, timeout=3) as client:
+            await client.connect()
+            assert await client.ping() > 0
+
+    assert len(received) == 1
+
+
+async def test_read_client_bound_packet():
+    server = EchoServer(("127.0.0.1", 0), timeout=3)
+    conn = Connection(MockReader(read_data=bytearray(encode_frame(Pong("a")))), MockWriter(), timeout=3)
+
+    with pytest.raises(MalformedPacketError) as exc_info:
+        await server.read_packet(conn)
+    assert exc_info.value.state is MalformedPacketState.UNEXPECTED_PACKET
+    assert exc_info.value.packet_id == Pong.PACKET_ID
+    # Client bound packets are rejected by their id, without being decoded
+    assert exc_info.value.packet is None
+
+
+async def test_read_unknown_packet():
+    server = EchoServer(("127.0.0.1", 0), timeout=3)
+    # Frame of length 1, with a packet id no packet has
+    conn = Connection(MockReader(read_data=bytearray(b"\x01\x7f")), MockWriter(), timeout=3)
+
+    with pytest.raises(MalformedPacketError) as exc_info:
+        await server.read_packet(conn)
+    assert exc_info.value.state is MalformedPacketState.UNRECOGNIZED_PACKET_ID
+    assert exc_info.value.packet_id == 0x7F
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from bytelink.config import PROTOCOL_VERSION
+from bytelink.exceptions import DisconnectError
+from bytelink.network.connection import Connection
+from bytelink.network.pipeline import PacketPipeline, PipelineOptions
+from bytelink.packets import read_packet, write_packet
+from bytelink.packets.handshaking import Handshake
+from bytelink.packets.ping import Ping
+from tests.network.helpers import MockReader, MockWriter, SlowEchoServer, loopback_server
+
+
+@pytest.mark.parametrize(("ordered", "expected"), [(True, ["3", "2", "1", "0"]), (False, ["0", "1", "2", "3"])])
+async def test_pipeline_order(ordered, expected):
+    options = PipelineOptions(workers=4, queue_size=4, ordered=ordered)
+    async with loopback_server(SlowEchoServer, timeout=3, pipeline=options) as (server, address):
+        reader, writer = await asyncio.open_connection(*address)
+        conn = Connection(reader, writer, timeout=3)
+
+        await write_packet(conn, Handshake(PROTOCOL_VERSION))
+        for token in ["3", "2", "1", "0"]:
+            await write_packet(conn, Ping(token))
+        responses = [await read_packet(conn) for _ in range(4)]
+        conn.close()
+
+    assert [packet.token for packet in responses] == expected  # type: ignore
+
+
+async def test_pipeline_backpressure():
+    reads = 0
+    release = asyncio.Event()
+
+    async def read() -> Ping:
+        nonlocal reads
+        reads += 1
+        return Ping("token")
+
+    async def handle(packet: Ping) -> None:
+        await release.wait()
+        raise DisconnectError("Done")
+
+    conn = Connection(MockReader(), MockWriter(), timeout=3)
+    pipeline = PacketPipeline(conn, read, handle, PipelineOptions(workers=1, queue_size=1))
+    task = asyncio.create_task(pipeline.run())
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    # One packet is being handled, one is waiting in the queue and the reader is stuck putting the third one in
+    assert reads == 3
+
+    release.set()
+    with pytest.raises(DisconnectError):
+        await task
+
+
+async def test_pipeline_handles_queued_packets_on_disconnect():
+    packets = [Ping("a"), Ping("b")]
+    handled = []
+
+    async def read() -> Ping:
+        if not packets:
+            raise DisconnectError("Closed")
+        return packets.pop(0)
+
+    async def handle(packet: Ping) -> None:
+        await asyncio.sleep(0.01)
+        handled.append(packet.token)
+
+    conn = Connection(MockReader(), MockWriter(), timeout=3)
+    pipeline = PacketPipeline(conn, read, handle, PipelineOptions(workers=1))
+    with pytest.raises(DisconnectError):
+        await pipeline.run()
+
+    assert handled == ["a", "b"]
+
+
+def test_invalid_options():
+    conn = Connection(MockReader(), MockWriter(), timeout=3)
+    with pytest.raises(ValueError):
+        PacketPipeline(conn, AsyncMock(), AsyncMock(), PipelineOptions(workers=0))
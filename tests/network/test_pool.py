@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bytelink.network.admission import AdmissionController
+from bytelink.network.pool import ClientPool
+from bytelink.packets.compression import Compression
+from bytelink.packets.ping import Ping, Pong
+from tests.network.helpers import EchoServer, loopback_server
+
+
+async def test_reuse():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        async with ClientPool(timeout=3) as pool:
+            async with pool.client(address) as first:
+                pass
+            async with pool.client(address) as second:
+                assert second is first
+            response = await pool.request(address, Ping("a"))
+
+    assert isinstance(response, Pong)
+    assert pool.stats.created == 1
+    assert pool.stats.reused == 2
+    assert pool.stats.acquired == 3
+
+
+async def test_max_size_wait():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        async with ClientPool(timeout=3, max_size=1) as pool:
+            client = await pool.acquire(address)
+            waiter = asyncio.create_task(pool.acquire(address))
+            await asyncio.sleep(0.05)
+            assert not waiter.done()
+
+            pool.release(client)
+            assert await waiter is client
+            pool.release(client)
+
+    assert pool.stats.created == 1
+    assert pool.stats.max_wait >= 0.05
+    assert pool.stats.average_wait > 0
+
+
+async def test_acquire_timeout():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        async with ClientPool(timeout=3, max_size=1, acquire_timeout=0.05) as pool:
+            client = await pool.acquire(address)
+            with pytest.raises(asyncio.TimeoutError):
+                await pool.acquire(address)
+            pool.release(client)
+
+
+async def test_dead_client_replaced():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        async with ClientPool(timeout=3, check_interval=0) as pool:
+            async with pool.client(address) as first:
+                pass
+            # Connection dies while the client is idle in the pool
+            first.connection.writer.close()
+
+            async with pool.client(address) as second:
+                assert second is not first
+                assert second.is_connected
+
+    assert pool.stats.failed_checks == 1
+    assert pool.stats.created == 2
+
+
+async def test_maintain():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        async with ClientPool(timeout=3, min_size=1, idle_timeout=0) as pool:
+            await pool.start(address)
+            assert pool.stats.created == 1
+
+            first = await pool.acquire(address)
+            second = await pool.acquire(address)
+            pool.release(first)
+            pool.release(second)
+
+            await asyncio.sleep(0.01)
+            await pool.maintain()
+            # Only the least recently used client gets evicted, the other one is kept for min_size
+            assert pool.stats.evicted == 1
+            assert [client for client, _ in pool._pools[address].idle] == [second]
+
+
+async def test_maintain_new_address():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        other_address = ("localhost", address[1])
+        async with ClientPool(timeout=3, check_interval=0) as pool:
+            async with pool.client(address):
+                pass
+            # The idle client gets checked, while another address gets added to the pool
+            client = (await asyncio.gather(pool.maintain(), pool.acquire(other_address)))[1]
+            pool.release(client)
+
+    assert set(pool._pools) == {address, other_address}
+
+
+async def test_maintain_rejected():
+    # Server refuses the handshake, while the pool tries to open the clients for min_size
+    admission = AdmissionController(max_connections=0)
+    async with loopback_server(EchoServer, timeout=3, admission=admission) as (server, address):
+        async with ClientPool(timeout=3, min_size=1, compression=Compression()) as pool:
+            await pool.start(address)
+            assert pool._pools[address].size == 0
+            assert pool.stats.created == 0
+            assert not pool._maintenance_task.done()
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        ClientPool(timeout=3, min_size=2, max_size=1)
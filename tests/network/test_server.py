@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bytelink.config import PROTOCOL_VERSION
+from bytelink.network.admission import AdmissionController, RejectReason
+from bytelink.network.client import Client
+from bytelink.network.connection import Connection
+from bytelink.network.server import BroadcastPolicy, BroadcastStats
+from bytelink.packets import encode_frame, read_packet, write_packet
+from bytelink.packets.disconnect import Disconnect
+from bytelink.packets.handshaking import Handshake
+from bytelink.packets.ping import Ping, Pong
+from bytelink.utils.metrics import MetricsRegistry
+from tests.network.helpers import EchoServer, MockReader, MockWriter, loopback_server
+
+
+async def test_max_connections():
+    admission = AdmissionController(max_connections=1)
+    async with loopback_server(EchoServer, timeout=3, admission=admission) as (server, address):
+        reader, writer = await asyncio.open_connection(*address)
+        conn = Connection(reader, writer, timeout=3)
+        await write_packet(conn, Handshake(PROTOCOL_VERSION))
+        await write_packet(conn, Ping("a"))
+        assert isinstance(await read_packet(conn), Pong)
+        assert len(server.connections) == 1
+        assert admission.occupancy.connections == 1
+
+        # Over the limit, the server tells us why and closes the connection right away
+        reader2, writer2 = await asyncio.open_connection(*address)
+        conn2 = Connection(reader2, writer2, timeout=3)
+        packet = await read_packet(conn2)
+        assert isinstance(packet, Disconnect)
+        assert packet.reason == RejectReason.SERVER_FULL.value
+        assert await asyncio.wait_for(reader2.read(), timeout=3) == b""
+        conn2.close()
+
+        conn.close()
+        assert server.total_connections == 1
+        assert admission.occupancy.rejected == {RejectReason.SERVER_FULL: 1}
+
+
+def make_server() -> tuple[EchoServer, list[Connection]]:
+    server = EchoServer(("127.0.0.1", 0), timeout=3)
+    conns = [Connection(MockReader(), MockWriter(), timeout=3) for _ in range(3)]
+    server.connections.update(conns)
+    server.ready_connections.update(conns)
+    return server, conns
+
+
+async def test_broadcast_groups():
+    server, conns = make_server()
+    server.join_group(conns[0], "room")
+    server.join_group(conns[1], "room")
+
+    stats = server.broadcast(Pong("hi"), "room")
+    await asyncio.sleep(0)
+
+    frame = bytes(encode_frame(Pong("hi")))
+    assert stats == BroadcastStats(recipients=2, delivered=2, frame_size=len(frame))
+    assert stats.bytes_queued == 2 * len(frame)
+    conns[0].writer.write_f_mock.assert_has_data(bytearray(frame))
+    conns[1].writer.write_f_mock.assert_has_data(bytearray(frame))
+    conns[2].writer.write_f_mock.assert_not_called()
+
+    # Same frame object is queued on all of the connections
+    assert conns[0].writer.write_f_mock.call_args[0][0] is conns[1].writer.write_f_mock.call_args[0][0]
+
+    server.leave_group(conns[0], "room")
+    server.leave_group(conns[1], "room")
+    assert server.groups == {}
+    assert server.broadcast(Pong("hi"), "room").recipients == 0
+
+
+async def test_broadcast_all():
+    server, conns = make_server()
+
+    stats = server.broadcast(Pong("hi"), exclude=conns[0])
+
+    assert stats.recipients == 2
+    assert stats.delivered == 2
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected"),
+    [
+        (BroadcastPolicy.QUEUE, BroadcastStats(recipients=3, delivered=3)),
+        (BroadcastPolicy.SKIP, BroadcastStats(recipients=3, delivered=2, skipped=1)),
+        (BroadcastPolicy.DISCONNECT, BroadcastStats(recipients=3, delivered=2, dropped=1)),
+    ],
+)
+async def test_broadcast_slow_consumers(policy, expected):
+    server, conns = make_server()
+    conns[0].writer.transport.get_write_buffer_size.return_value = conns[0].write_high_water + 1
+
+    stats = server.broadcast(Pong("hi"), policy=policy)
+
+    expected.frame_size = stats.frame_size
+    assert stats == expected
+    assert conns[0].writer.close.called is (policy is BroadcastPolicy.DISCONNECT)
+
+
+async def test_metrics():
+    registry = MetricsRegistry()
+    async with loopback_server(EchoServer, timeout=3, metrics=registry) as (server, address):
+        async with await Client.create(address, timeout=3) as client:
+            await client.connect()
+            for _ in range(3):
+                assert isinstance(await client.request(Ping("hello")), Pong)
+
+            snapshot = registry.snapshot()
+            assert snapshot["bytelink_connections_active"].values == {(): 1}
+            assert snapshot["bytelink_packets_received_total"].values[(("packet", "Ping"),)] == 3
+            assert snapshot["bytelink_packets_sent_total"].values[(("packet", "Pong"),)] == 3
+            assert snapshot["bytelink_handler_seconds"].values[(("packet", "Ping"),)].count == 3
+            assert snapshot["bytelink_received_bytes_total"].values[()] > 0
+
+        for _ in range(100):
+            if not server.connections:
+                break
+            await asyncio.sleep(0.01)
+        snapshot = registry.snapshot()
+        assert snapshot["bytelink_connections_total"].values == {(): 1}
+        assert snapshot["bytelink_connections_active"].values == {(): 0}
+        assert snapshot["bytelink_sent_bytes_total"].values[()] > 0
+
+
+async def test_broadcast_skips_handshaking():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        # Connected, but never sends the handshake
+        reader, writer = await asyncio.open_connection(*address)
+        async with await Client.create(address, timeout=3) as client:
+            await client.connect()
+            assert isinstance(await client.request(Ping("hello")), Pong)
+            for _ in range(100):
+                if len(server.connections) == 2:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert len(server.ready_connections) == 1
+            stats = server.broadcast(Pong("hi"))
+            assert stats.recipients == 1
+        writer.close()
+
+
+async def test_shutdown():
+    async with loopback_server(EchoServer, timeout=3) as (server, address):
+        async with await Client.create(address, timeout=3) as client:
+            await client.connect()
+            shutdown = asyncio.create_task(server.shutdown(timeout=0.3))
+            await asyncio.sleep(0.05)
+
+            # Open connections are still served, new ones aren't accepted
+            assert isinstance(await client.request(Ping("hello")), Pong)
+            with pytest.raises(OSError):
+                await asyncio.open_connection(*address)
+
+            # The connection which didn't close on its own gets closed after the timeout
+            await asyncio.wait_for(shutdown, timeout=1)
+            assert not server.connections or all(conn.writer.is_closing() for conn in server.connections)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import socket
+import time
+
+import pytest
+
+from bytelink.config import PROTOCOL_VERSION
+from bytelink.network.connection import Connection
+from bytelink.network.supervisor import SharedConnectionSlots, Supervisor, WorkerStats
+from bytelink.packets import read_packet, write_packet
+from bytelink.packets.handshaking import Handshake
+from bytelink.packets.ping import Ping, Pong
+from tests.network.helpers import EchoServer
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def connect(port: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    # Workers take a while to start, retry the connection until one of them is listening
+    for _ in range(100):
+        try:
+            return await asyncio.open_connection("127.0.0.1", port)
+        except ConnectionRefusedError:
+            await asyncio.sleep(0.05)
+    raise AssertionError("No worker is listening")
+
+
+async def ping(port: int) -> Pong:
+    reader, writer = await connect(port)
+    conn = Connection(reader, writer, timeout=3)
+    await write_packet(conn, Handshake(PROTOCOL_VERSION))
+    await write_packet(conn, Ping("token"))
+    packet = await read_packet(conn)
+    conn.close()
+    assert isinstance(packet, Pong)
+    return packet
+
+
+def test_shared_connection_slots():
+    counts = multiprocessing.Array("i", 2)
+    slots_a = SharedConnectionSlots(counts, 0, limit=2)
+    slots_b = SharedConnectionSlots(counts, 1, limit=2)
+
+    assert slots_a.try_acquire()
+    assert slots_b.try_acquire()
+    assert not slots_a.try_acquire()
+    slots_b.release()
+    assert slots_a.try_acquire()
+    assert list(counts) == [2, 0]
+
+
+def test_invalid_workers():
+    with pytest.raises(ValueError):
+        Supervisor(EchoServer, ("127.0.0.1", 0), timeout=3, workers=0)
+
+
+def test_unix_socket_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Supervisor(EchoServer, str(tmp_path / "bytelink.sock"), timeout=3, workers=2)
+
+
+async def test_supervisor():
+    port = free_port()
+    supervisor = Supervisor(EchoServer, ("127.0.0.1", port), timeout=3, workers=2, restart_delay=0, stats_interval=0.1)
+    supervisor.start()
+    try:
+        await ping(port)
+        # Wait for both of the workers to start, workers dying before that aren't restarted
+        deadline = time.monotonic() + 10
+        while len(supervisor.stats) < 2 and time.monotonic() < deadline:
+            supervisor.poll()
+            await asyncio.sleep(0.05)
+
+        # Kill one of the workers, it should get restarted
+        supervisor.processes[0].kill()
+        supervisor.processes[0].join()
+        deadline = time.monotonic() + 10
+        while supervisor.restart_count == 0 and time.monotonic() < deadline:
+            supervisor.poll()
+            await asyncio.sleep(0.05)
+        assert supervisor.restart_count == 1
+        assert supervisor.processes[0].is_alive()
+
+        await ping(port)
+        await asyncio.sleep(0.2)
+        supervisor.poll()
+        assert sum(stats.total_connections for stats in supervisor.stats.values()) >= 1
+    finally:
+        supervisor.stop()
+
+    assert not any(process.is_alive() for process in supervisor.processes.values())
+
+
+def test_worker_startup_failure():
+    # The address can't be bound, so the workers die right away, they shouldn't be restarted over and over
+    supervisor = Supervisor(EchoServer, ("256.0.0.1", free_port()), timeout=3, workers=1, restart_delay=0)
+    supervisor.start()
+    try:
+        deadline = time.monotonic() + 10
+        with pytest.raises(RuntimeError):
+            while time.monotonic() < deadline:
+                supervisor.poll()
+                time.sleep(0.05)
+        assert supervisor.restart_count == 0
+    finally:
+        supervisor.stop()
+
+
+async def test_rolling_restart_keeps_connections():
+    port = free_port()
+    supervisor = Supervisor(EchoServer, ("127.0.0.1", port), timeout=3, workers=1, stop_timeout=2, stats_interval=0.1)
+    supervisor.start()
+    try:
+        reader, writer = await connect(port)
+        conn = Connection(reader, writer, timeout=3)
+        await write_packet(conn, Handshake(PROTOCOL_VERSION))
+
+        # The old worker keeps serving the open connection while it's stopping (it's stopped in a thread here)
+        restart = asyncio.get_running_loop().run_in_executor(None, supervisor.restart_workers)
+        await asyncio.sleep(0.5)
+        await write_packet(conn, Ping("token"))
+        assert isinstance(await read_packet(conn), Pong)
+
+        conn.close()
+        await restart
+        assert supervisor.restart_count == 1
+    finally:
+        supervisor.stop()
+
+
+async def test_restart_frees_slots():
+    port = free_port()
+    supervisor = Supervisor(EchoServer, ("127.0.0.1", port), timeout=3, workers=1, stop_timeout=0, stats_interval=0.1)
+    supervisor.start()
+    try:
+        await ping(port)
+        old_slot_index = supervisor._slot_indices[0]
+        # Slots which a killed worker never released, the restart has to free them
+        with supervisor._counts.get_lock():
+            supervisor._counts[old_slot_index] += 5
+
+        supervisor.restart_workers()
+        assert supervisor._slot_indices[0] != old_slot_index
+        assert supervisor.connections == 0
+    finally:
+        supervisor.stop()
+
+
+def test_log_stats(caplog):
+    supervisor = Supervisor(EchoServer, ("127.0.0.1", 0), timeout=3, workers=2)
+    supervisor.stats = {100: WorkerStats(0, 100, 2, 10), 101: WorkerStats(1, 101, 3, 5)}
+
+    with caplog.at_level(logging.INFO, logger="bytelink.network.supervisor"):
+        supervisor.log_stats()
+    assert "5 open connections, 15 accepted in total" in caplog.text
+    assert "worker 1 (pid 101): 3/5" in caplog.text
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+from pathlib import Path
+
+import pytest
+
+from bytelink.network.client import Client
+from bytelink.network.transport import address_host, is_unix_address
+from bytelink.packets.ping import Ping, Pong
+from tests.network.helpers import EchoServer
+
+requires_unix = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets aren't supported")
+
+
+async def wait_disconnected(server: EchoServer) -> None:
+    for _ in range(100):
+        if not server.connections:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Server didn't close the connections")
+
+
+def test_addresses():
+    assert not is_unix_address(("127.0.0.1", 5000))
+    assert is_unix_address("/run/bytelink.sock")
+    assert is_unix_address(Path("/run/bytelink.sock"))
+
+    assert address_host(("127.0.0.1", 5000)) == "127.0.0.1"
+    assert address_host(("::1", 5000, 0, 0)) == "::1"
+    assert address_host("") == ""
+    assert address_host("/run/bytelink.sock") == ""
+    assert address_host(None) == ""
+
+
+@requires_unix
+@pytest.mark.parametrize("engine", ["streams", "protocol"])
+async def test_unix_socket(engine, tmp_path: Path):
+    path = tmp_path / "bytelink.sock"
+    server = await EchoServer.create(path, timeout=3, engine=engine)
+    async with server:
+        async with await Client.create(path, timeout=3) as client:
+            await client.connect()
+            for i in range(3):
+                response = await client.request(Ping(f"token-{i}"))
+                assert isinstance(response, Pong)
+                assert response.token == f"token-{i}"
+            assert len(server.connections) == 1
+        await wait_disconnected(server)
+
+
+@requires_unix
+async def test_unix_socket_reuse_port(tmp_path: Path):
+    with pytest.raises(ValueError):
+        await EchoServer.create(str(tmp_path / "bytelink.sock"), timeout=3, reuse_port=True)
+
+
+@pytest.mark.parametrize("engine", ["streams", "protocol"])
+async def test_socketpair(engine):
+    # The server doesn't listen on anything, the connection is handed over to it directly
+    server = EchoServer(("127.0.0.1", 0), timeout=3)
+    server.engine = engine
+    async with await Client.create_socketpair(server, timeout=3) as client:
+        await client.connect()
+        assert await client.ping() > 0
+        assert len(server.connections) == 1
+        assert client.address == server.address
+    await wait_disconnected(server)
+    assert server.total_connections == 1
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from bytelink.exceptions import MalformedPacketError
+from bytelink.network.connection import Connection
+from bytelink.packets import _decompress_frame, decode_packet, encode_frame, read_frame
+from bytelink.packets.compression import Compression, build_dictionary, compress, decompress
+from bytelink.packets.ping import Ping, Pong
+from bytelink.protocol.buffer import Buffer
+from bytelink.protocol.varint import encode_varuint
+from tests.network.helpers import MockReader, MockWriter
+
+
+@pytest.mark.parametrize("zdict", (None, b"chat history: hello world " * 8))
+def test_compress_roundtrip(zdict):
+    compression = Compression(zdict=zdict)
+    data = b"chat history: hello world, hello again " * 50
+
+    compressed = compress(data, compression)
+
+    assert len(compressed) < len(data)
+    assert decompress(compressed, len(data), compression) == data
+
+
+def test_dictionary_improves_ratio():
+    message = b'{"user": "someone", "channel": "general", "text": "hi"}'
+    plain = Compression()
+    with_dict = Compression(zdict=message * 4)
+
+    assert len(compress(message, with_dict)) < len(compress(message, plain))
+
+
+@pytest.mark.parametrize(
+    "data,size",
+    (
+        (b"not zlib data", 100),
+        (zlib.compress(b"a" * 100), 50),  # Larger than declared
+        (zlib.compress(b"a" * 100), 200),  # Smaller than declared
+    ),
+)
+def test_decompress_invalid(data: bytes, size: int):
+    with pytest.raises(IOError):
+        decompress(data, size, Compression())
+
+
+def test_dictionary_id():
+    assert Compression().dictionary_id == 0
+    assert Compression(zdict=b"abc").dictionary_id == zlib.adler32(b"abc")
+
+
+def test_build_dictionary():
+    samples = [b"rare", b"common", b"common", b"common", b"medium", b"medium"]
+
+    assert build_dictionary(samples) == b"raremediumcommon"
+    assert build_dictionary(samples, size=12) == b"mediumcommon"
+
+
+@pytest.mark.parametrize(
+    "packet,compressed",
+    (
+        (Ping("short"), False),
+        (Pong("a" * 500), True),
+    ),
+)
+def test_compressed_frame_roundtrip(packet, compressed: bool):
+    """Packets over the threshold should get compressed, the rest should only get the data length of 0."""
+    compression = Compression(threshold=100)
+    frame = Buffer(encode_frame(packet, compression))
+    data = frame.read_bytearray(max_varuint_bits=32)
+
+    assert (data[0] != 0) is compressed
+    if compressed:
+        assert len(frame) < len(encode_frame(packet))
+
+    out = decode_packet(_decompress_frame(data, compression))
+    assert type(out) is type(packet)
+    assert out.token == packet.token
+
+
+def _compressed_frame(data: bytes, data_length: int) -> bytearray:
+    body = encode_varuint(data_length, max_bits=32) + zlib.compress(data)
+    return bytearray(encode_varuint(len(body), max_bits=32) + body)
+
+
+def test_decompress_over_max_size():
+    data = b"a" * 1000
+    with pytest.raises(IOError):
+        decompress(zlib.compress(data), len(data), Compression(max_size=999))
+
+
+async def test_read_frame_over_max_size():
+    # Tiny compressed frame, inflating into a lot of data, gets rejected before decompressing anything
+    compression = Compression(max_size=1000)
+    reader = MockReader(read_data=_compressed_frame(b"\x00" * 100_000, 100_000))
+    conn = Connection(reader, MockWriter(), timeout=3)
+
+    with pytest.raises(MalformedPacketError):
+        await read_frame(conn, compression=compression)
+
+
+async def test_read_frame_offloads_by_decompressed_size():
+    compression = Compression(offload_threshold=10_000)
+    data = encode_frame(Pong("a" * 50_000))[3:]  # Packet id and data, without the length prefix
+    frame = _compressed_frame(bytes(data), len(data))
+    assert len(frame) < compression.offload_threshold
+    conn = Connection(MockReader(read_data=frame), MockWriter(), timeout=3)
+
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "run_in_executor", wraps=loop.run_in_executor) as run_in_executor:
+        out = await read_frame(conn, compression=compression)
+
+    run_in_executor.assert_called_once()
+    assert bytes(out) == bytes(data)
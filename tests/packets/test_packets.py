@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import pytest
+
+from bytelink.packets import _deserialize_packet, _serialize_packet, encode_frame
+from bytelink.packets.abc import Packet
+from bytelink.packets.handshaking import Handshake
+from bytelink.packets.ping import Ping, Pong
+from bytelink.protocol.buffer import Buffer
+
+
+@pytest.mark.parametrize(
+    "packet",
+    (
+        Handshake(1),
+        Ping("token"),
+        Pong("a" * 200),
+    ),
+)
+def test_encode_frame(packet: Packet):
+    """Encoded frame should hold the length prefixed packet id and packet data."""
+    expected = Buffer()
+    expected.write_bytearray(_serialize_packet(packet), max_varuint_bits=32)
+
+    assert encode_frame(packet) == expected
+
+
+@pytest.mark.parametrize(
+    "packet,attr",
+    (
+        (Handshake(1), "protocol_version"),
+        (Ping("token"), "token"),
+        (Pong("a" * 200), "token"),
+    ),
+)
+def test_packet_roundtrip(packet: Packet, attr: str):
+    """Deserializing a serialized packet should produce an equivalent packet."""
+    frame = Buffer(encode_frame(packet))
+    frame_data = Buffer(frame.read_bytearray(max_varuint_bits=32))
+
+    out = _deserialize_packet(frame_data)
+
+    assert type(out) is type(packet)
+    assert getattr(out, attr) == getattr(packet, attr)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+from typing import ClassVar
+
+import pytest
+
+from bytelink.packets import schema
+from bytelink.packets.abc import Packet, ServerBoundPacket
+from bytelink.protocol.base_io import StructFormat
+from bytelink.protocol.buffer import Buffer, BufferView
+
+
+class State(ServerBoundPacket):
+    PACKET_ID: ClassVar[int] = 100
+    FIELDS = (
+        ("entity_id", schema.varuint32),
+        ("x", schema.double),
+        ("y", schema.double),
+        ("alive", schema.boolean),
+        ("name", schema.utf),
+        ("delta", schema.varint32),
+        ("blob", schema.byte_array),
+        ("scores", schema.Array(schema.int32)),
+        ("tags", schema.Array(schema.utf)),
+    )
+
+
+class _BaseNamed(Packet):
+    FIELDS = (("name", schema.utf),)
+
+
+class NamedLevel(_BaseNamed, ServerBoundPacket):
+    PACKET_ID: ClassVar[int] = 101
+    FIELDS = (("level", schema.ubyte),)
+
+
+def make_state() -> State:
+    return State(5, 1.5, -2.25, True, "player", -3, bytearray(b"\x00\x01"), [1, -2, 3], ["a", "bc"])
+
+
+def test_roundtrip():
+    """Deserializing a serialized schema packet should produce the same field values."""
+    packet = make_state()
+    out = State.deserialize(BufferView(bytes(packet.serialize())))
+
+    for name, _ in State.FIELDS:
+        assert getattr(out, name) == getattr(packet, name)
+
+
+def test_serialized_format():
+    """Compiled serialization should produce the same bytes as writing the fields one by one."""
+    packet = make_state()
+
+    expected = Buffer()
+    expected.write_varuint(5, max_bits=32)
+    expected.write_value(StructFormat.DOUBLE, 1.5)
+    expected.write_value(StructFormat.DOUBLE, -2.25)
+    expected.write_value(StructFormat.BOOL, True)
+    expected.write_utf("player")
+    expected.write_varint(-3, max_bits=32)
+    expected.write_bytearray(b"\x00\x01")
+    expected.write_varuint(3, max_bits=16)
+    expected.write_values(StructFormat.INT, [1, -2, 3])
+    expected.write_varuint(2, max_bits=16)
+    expected.write_utf("a")
+    expected.write_utf("bc")
+
+    assert packet.serialize() == expected
+
+
+def test_fixed_fields_packed_together():
+    """Consecutive fixed-width fields should be compiled into a single struct."""
+    assert State.serialize_into.__code__.co_names.count("write_struct") == 1
+    assert State.deserialize.__code__.co_names.count("read_struct") == 1
+
+
+def test_slots():
+    """Schema packets should be slotted, without an instance dict."""
+    packet = make_state()
+    assert not hasattr(packet, "__dict__")
+    with pytest.raises(AttributeError):
+        packet.unknown = 1  # type: ignore
+
+
+def test_inherited_schema():
+    """Subclass fields should be appended after the fields of the parent packet."""
+    assert NamedLevel.SCHEMA == (("name", schema.utf), ("level", schema.ubyte))
+
+    packet = NamedLevel("foo", 3)
+    out = NamedLevel.deserialize(BufferView(bytes(packet.serialize())))
+    assert (out.name, out.level) == ("foo", 3)
+    assert not hasattr(out, "__dict__")
+
+
+def test_explicit_methods_kept():
+    """Methods defined explicitly on the packet class shouldn't be replaced by the compiled ones."""
+
+    class Custom(ServerBoundPacket):
+        PACKET_ID: ClassVar[int] = 102
+        FIELDS = (("value", schema.ubyte),)
+
+        def __init__(self, value: int = 7):
+            self.value = value
+
+    assert Custom().value == 7
+    assert Custom.deserialize(BufferView(b"\x05")).value == 5
+
+
+@pytest.mark.parametrize(
+    "fields",
+    (
+        (("_private", schema.utf),),
+        (("class", schema.utf),),
+        (("same", schema.utf), ("same", schema.ubyte)),
+    ),
+)
+def test_invalid_fields(fields: schema.SCHEMA_TYPE):
+    """Invalid or duplicate field names should be rejected at class creation."""
+    with pytest.raises(ValueError):
+
+        class Invalid(ServerBoundPacket):
+            PACKET_ID: ClassVar[int] = 103
+            FIELDS = fields
+
+
+def test_abstract_packet():
+    """Packet classes without a packet id shouldn't be instantiable."""
+    with pytest.raises(TypeError):
+        _BaseNamed("foo")  # type: ignore # abstract class instantiation
+
+
+def test_invalid_packet_id():
+    """Packet ids which aren't non-negative integers should be rejected at class creation."""
+    with pytest.raises(TypeError):
+
+        class Invalid(ServerBoundPacket):
+            PACKET_ID = "1"  # type: ignore
+            FIELDS = (("value", schema.ubyte),)
+
+
+def test_pool_reuse():
+    """Released instances of pooled packets should get reused by deserialization and acquire."""
+
+    class Pooled(ServerBoundPacket):
+        PACKET_ID: ClassVar[int] = 104
+        POOL_SIZE: ClassVar[int] = 1
+        FIELDS = (("value", schema.ubyte),)
+
+    packet = Pooled.acquire(1)
+    packet.release()
+    out = Pooled.deserialize(BufferView(b"\x05"))
+    assert out is packet
+    assert out.value == 5
+
+    out.release()
+    out2 = Pooled.acquire(2)
+    assert out2 is packet
+    assert out2.value == 2
+
+    # Pool is limited to POOL_SIZE instances, other releases are dropped
+    Pooled(1).release()
+    Pooled(2).release()
+    assert len(Pooled._pool) == 1  # type: ignore
+
+
+def test_pool_emptied_concurrently():
+    """Pool emptied by another thread between the check and the pop should fall back to making a new instance."""
+
+    class EmptiedPool(list):
+        def __bool__(self) -> bool:
+            return True
+
+    class Pooled(ServerBoundPacket):
+        PACKET_ID: ClassVar[int] = 105
+        POOL_SIZE: ClassVar[int] = 1
+        FIELDS = (("value", schema.ubyte),)
+
+    Pooled._pool = EmptiedPool()  # type: ignore
+
+    out = Pooled.deserialize(BufferView(b"\x05"))
+    assert isinstance(out, Pooled)
+    assert out.value == 5
+
+    out2 = Pooled.acquire(2)
+    assert isinstance(out2, Pooled)
+    assert out2.value == 2
+
+
+def test_no_pool():
+    """Releasing packets without pooling enabled shouldn't keep them around."""
+    packet = make_state()
+    packet.release()
+    assert State._pool is None
+
+
+class WithDefaults(ServerBoundPacket):
+    PACKET_ID: ClassVar[int] = 102
+    FIELDS = (("a", schema.varint32), ("b", schema.utf), ("c", schema.ubyte))
+    DEFAULTS = {"b": "default"}
+
+
+class WithMoreDefaults(WithDefaults):
+    PACKET_ID: ClassVar[int] = 103
+    FIELDS = (("d", schema.ubyte),)
+    DEFAULTS = {"d": 7}
+
+
+def test_defaults():
+    """Fields with defaults should be optional keyword-only arguments, other fields stay positional."""
+    assert WithDefaults(1, 2).b == "default"
+    assert WithDefaults(1, 2, b="x").b == "x"
+    with pytest.raises(TypeError):
+        WithDefaults(1, "x", 2)  # type: ignore
+
+    packet = WithMoreDefaults(1, 2)
+    assert (packet.a, packet.b, packet.c, packet.d) == (1, "default", 2, 7)
+    assert WithMoreDefaults.DEFAULTS == {"b": "default", "d": 7}
+
+
+def test_unknown_default():
+    with pytest.raises(ValueError):
+
+        class _Invalid(ServerBoundPacket):
+            FIELDS = (("a", schema.varint32),)
+            DEFAULTS = {"b": 1}
@@ -50,6 +50,26 @@ class TestReader:
         read_mock.combined_data = bytearray(read_bytes)
         assert self.reader.read_value(format) == expected_value
 
+    @pytest.mark.parametrize(
+        "format,read_bytes,expected_values",
+        (
+            (StructFormat.UBYTE, [0, 10, 255], (0, 10, 255)),
+            (StructFormat.BYTE, [20, to_twos_complement(-20, bits=8)], (20, -20)),
+            (StructFormat.USHORT, [1, 0, 0, 1], (256, 1)),
+            (StructFormat.BOOL, [], ()),
+        ),
+    )
+    def test_read_values(
+        self,
+        format: INT_FORMATS_TYPE,
+        read_bytes: list[int],
+        expected_values: tuple[Any, ...],
+        read_mock: ReadFunctionMock,
+    ):
+        """Reading multiple values of certain struct format should produce all of the expected values."""
+        read_mock.combined_data = bytearray(read_bytes)
+        assert self.reader.read_values(format, len(expected_values)) == expected_values
+
     @pytest.mark.parametrize(
         "read_bytes,expected_value",
         (
@@ -202,6 +222,31 @@ class TestWriter:
         with pytest.raises(ValueError):
             self.writer.write_value(format, value)
 
+    @pytest.mark.parametrize(
+        "format,values,expected_bytes",
+        (
+            (StructFormat.UBYTE, [0, 15, 255], [0, 15, 255]),
+            (StructFormat.BYTE, (-20, 20), [to_twos_complement(-20, bits=8), 20]),
+            (StructFormat.USHORT, iter([256, 1]), [1, 0, 0, 1]),
+        ),
+    )
+    def test_write_values(
+        self,
+        format: INT_FORMATS_TYPE,
+        values: Any,
+        expected_bytes: list[int],
+        write_mock: WriteFunctionMock,
+    ):
+        """Writing multiple values of certain struct format should write all of them at once."""
+        self.writer.write_values(format, values)
+        write_mock.assert_has_data(bytearray(expected_bytes))
+        write_mock.assert_called_once()
+
+    def test_write_values_out_of_range(self):
+        """Trying to write out of range values among multiple values should produce an exception."""
+        with pytest.raises(ValueError):
+            self.writer.write_values(StructFormat.UBYTE, [1, 256])
+
     @pytest.mark.parametrize(
         "number,expected_bytes",
         (
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import pytest
 
-from bytelink.protocol.buffer import Buffer
+from bytelink.protocol.base_io import StructFormat
+from bytelink.protocol.buffer import Buffer, BufferView
 
 
 def test_write():
@@ -76,3 +77,108 @@ def test_flush():
     data = buf.flush()
     assert data == b"Foobar"
     assert buf == bytearray()
+
+
+def test_read_varuint():
+    """Reading a varuint should consume exactly the varuint bytes."""
+    buf = Buffer(bytes([192, 132, 61, 1]))
+    assert buf.read_varuint(max_bits=32) == 1000000
+    assert buf.remaining == 1
+
+
+def test_read_varuint_incomplete():
+    """Reading an incomplete varuint should raise IOError."""
+    buf = Buffer(bytes([192, 132]))
+    with pytest.raises(IOError):
+        buf.read_varuint(max_bits=32)
+
+
+def test_read_values():
+    """Reading multiple values should unpack them from the stored data."""
+    buf = Buffer(bytes([0, 1, 0, 2, 9]))
+    assert buf.read_values(StructFormat.USHORT, 2) == (1, 2)
+    assert buf.remaining == 1
+
+
+def test_read_value_no_data():
+    """Reading a value without enough stored data should raise IOError."""
+    buf = Buffer(bytes([0]))
+    with pytest.raises(IOError):
+        buf.read_value(StructFormat.USHORT)
+
+
+def test_pack_into_unpack_from():
+    """Packing values at an offset should overwrite the stored data there, without affecting the position."""
+    buf = Buffer(bytes(4))
+    buf.pack_into(StructFormat.USHORT, 1, 258)
+    assert buf == bytearray([0, 1, 2, 0])
+    assert buf.unpack_from(StructFormat.USHORT, 1) == 258
+    assert buf.pos == 0
+
+
+def test_read_view():
+    """Reading a view should return the data without copying it."""
+    buf = Buffer(b"Hello world")
+    view = buf.read_view(5)
+    assert view == b"Hello"
+    assert view.readonly
+    assert buf.remaining == 6
+    view.release()
+
+
+def test_read_view_blocks_resize():
+    """The buffer can't be resized while a view into it is alive."""
+    buf = Buffer(b"Hello")
+    view = buf.read_view(2)
+    with pytest.raises(BufferError):
+        buf.write(b"!")
+    view.release()
+    buf.write(b"!")
+    assert buf == bytearray(b"Hello!")
+
+
+def test_buffer_view_shares_storage():
+    """Buffer views should reflect the storage of the buffer they were made from."""
+    buf = Buffer(b"0123456789")
+    buf.read(2)
+    view = buf.view()
+    buf[2] = ord("x")
+    assert view.read(3) == bytearray(b"x34")
+    assert buf.pos == 2
+    view.release()
+
+
+def test_buffer_view_reads():
+    """Buffer views should support all of the usual reader interactions."""
+    data = Buffer()
+    data.write_varint(-5, max_bits=32)
+    data.write_utf("hello")
+    data.write_values(StructFormat.USHORT, [1, 2])
+    data.write_bytearray(b"blob")
+
+    view = BufferView(bytes(data))
+    assert view.read_varint(max_bits=32) == -5
+    assert view.read_utf() == "hello"
+    assert view.read_values(StructFormat.USHORT, 2) == (1, 2)
+    assert view.read_bytearray() == bytearray(b"blob")
+    assert view.remaining == 0
+
+
+def test_buffer_view_no_data_read():
+    """Reading more data than available from a view should raise IOError and deplete the view."""
+    view = BufferView(b"Blip")
+    with pytest.raises(IOError):
+        view.read_view(5)
+    assert view.remaining == 0
+
+
+def test_buffer_view_cursor():
+    """Cursors should only cover the requested part of the data, moving the parent past it."""
+    view = BufferView(b"headbodytail")
+    view.read(4)
+    cursor = view.cursor(4)
+    assert view.read(4) == bytearray(b"tail")
+    assert cursor.remaining == 4
+    assert cursor.read_view(4) == b"body"
+    with pytest.raises(IOError):
+        cursor.read(1)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+
+from bytelink.protocol.varint import (
+    _TABLE_LIMIT,
+    _encode_varuint_slow,
+    decode_varint,
+    decode_varuint,
+    encode_varint,
+    encode_varuint,
+    encode_varuint_into,
+    peek_varuint,
+    varuint_size,
+)
+
+
+@pytest.mark.parametrize("value", (0, 1, 127, 128, 255, 16383, 16384, 1000000, 2147483647))
+def test_encode_decode_varuint(value: int):
+    """Values encoded by either the fast or slow path should decode back to the same value."""
+    data = encode_varuint(value, max_bits=32)
+
+    assert data == _encode_varuint_slow(value)
+    assert len(data) == varuint_size(value)
+    assert decode_varuint(data, max_bits=32) == (value, len(data))
+
+
+def test_encode_table():
+    """All of the precomputed values should match the slow encoding."""
+    for value in range(_TABLE_LIMIT):
+        assert encode_varuint(value, max_bits=32) == _encode_varuint_slow(value)
+
+
+@pytest.mark.parametrize(
+    "value,max_bits",
+    (
+        (-1, 32),
+        (256, 8),
+        (2**16, 16),
+        (2**32, 32),
+    ),
+)
+def test_encode_varuint_out_of_range(value: int, max_bits: int):
+    """Encoding varuints bigger than the given bit size should produce ValueError."""
+    with pytest.raises(ValueError):
+        encode_varuint(value, max_bits=max_bits)
+
+
+@pytest.mark.parametrize("value", (0, 1, -1, -256, 2147483647, -2147483648))
+def test_encode_decode_varint(value: int):
+    """Signed values should survive encoding and decoding."""
+    data = encode_varint(value, max_bits=32)
+    assert decode_varint(data, max_bits=32) == (value, len(data))
+
+
+@pytest.mark.parametrize(
+    "data,max_bits",
+    (
+        ([128, 2], 8),
+        ([128, 128, 4], 16),
+        ([255, 255, 255, 255, 23], 32),
+    ),
+)
+def test_decode_varuint_out_of_range(data: list[int], max_bits: int):
+    """Decoding varuints bigger than the given bit size should produce IOError."""
+    with pytest.raises(IOError):
+        decode_varuint(bytes(data), max_bits=max_bits)
+
+
+@pytest.mark.parametrize("data", ([], [128], [255, 128], [192, 132]))
+def test_peek_incomplete_varuint(data: list[int]):
+    """Peeking an incomplete varuint should produce None, decoding it should produce IOError."""
+    assert peek_varuint(bytes(data), max_bits=32) is None
+    with pytest.raises(IOError):
+        decode_varuint(bytes(data), max_bits=32)
+
+
+def test_decode_varuint_at_offset():
+    """Decoding should work on memoryviews at any offset."""
+    data = memoryview(b"\x00\x00" + bytes([192, 132, 61]) + b"\x05")
+    assert decode_varuint(data, 2, max_bits=32) == (1000000, 5)
+    assert decode_varuint(data, 5, max_bits=32) == (5, 6)
+
+
+def test_encode_varuint_into():
+    """Encoding into a buffer should write the varuint at the offset, returning the offset after it."""
+    buf = bytearray(6)
+    assert encode_varuint_into(buf, 1, 1000000, max_bits=32) == 4
+    assert encode_varuint_into(memoryview(buf), 4, 300, max_bits=32) == 6
+    assert buf == bytearray([0, 192, 132, 61, 172, 2])
+
+
+def test_encode_varuint_into_too_small():
+    """Encoding into a buffer which can't hold the varuint should produce ValueError."""
+    with pytest.raises(ValueError):
+        encode_varuint_into(bytearray(2), 0, 1000000, max_bits=32)
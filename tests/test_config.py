@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import bytelink.config
+from bytelink.config import load_config
+
+CONFIG = """
+[server.config]
+ip = "0.0.0.0"
+port = 6000
+motd = "Hello"
+max-connections = 0
+workers = 4
+metrics-port = 9100
+
+[server.auth]
+password = 1234
+"""
+
+
+def test_load_config(tmp_path: Path):
+    path = tmp_path / "config.toml"
+    path.write_text(CONFIG)
+
+    config = load_config(path)
+
+    assert (config.IP, config.PORT, config.WORKERS) == ("0.0.0.0", 6000, 4)
+    assert config.MAX_CONNECTIONS is None
+    assert config.METRICS_PORT == 9100
+    assert config.METRICS_FILE is None
+    assert config.COMPRESSION_THRESHOLD == -1
+    assert config.ADDRESS == ("0.0.0.0", 6000)
+
+    # The file is only parsed once
+    path.unlink()
+    assert load_config(path) is config
+
+
+def test_unix_socket_address(tmp_path: Path):
+    path = tmp_path / "config.toml"
+    path.write_text(CONFIG.replace("port = 6000", 'port = 6000\nunix-socket = "/run/bytelink.sock"'))
+
+    assert load_config(path).ADDRESS == "/run/bytelink.sock"
+
+
+def test_load_missing_config(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        load_config(tmp_path / "missing.toml")
+
+
+def test_config_attribute():
+    assert bytelink.config.Config is load_config()
+    with pytest.raises(AttributeError):
+        bytelink.config.Missing  # noqa: B018
+
+
+def test_import_has_no_side_effects(tmp_path: Path):
+    # Importing the library (outside of the directory with the config file) neither reads the config file, nor does
+    # it touch the logging setup or import the optional heavyweight modules
+    code = (
+        "import logging, sys\n"
+        "import bytelink.network.client, bytelink.network.server\n"
+        "assert not logging.getLogger().handlers\n"
+        "assert 'toml' not in sys.modules and 'coloredlogs' not in sys.modules\n"
+    )
+    root = Path(__file__).parent.parent
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env={**os.environ, "PYTHONPATH": str(root)})
+    assert result.returncode == 0
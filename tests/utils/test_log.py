@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import queue
+
+import pytest
+
+from bytelink.utils import log as log_utils
+from bytelink.utils.log import NonBlockingQueueHandler, RateLimitedAdapter, start_queue_listener, stop_queue_listener
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def handler():
+    logger = logging.getLogger("bytelink.tests")
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield handler
+    logger.removeHandler(handler)
+
+
+def test_rate_limited_adapter(handler: ListHandler, monkeypatch: pytest.MonkeyPatch):
+    now = 100.0
+    monkeypatch.setattr(log_utils.time, "monotonic", lambda: now)
+    adapter = RateLimitedAdapter(logging.getLogger("bytelink.tests"), rate=2, burst=3)
+
+    for i in range(10):
+        adapter.warning("Message %d", i)
+    assert handler.messages == ["Message 0", "Message 1", "Message 2"]
+    assert adapter.suppressed == 7
+
+    now += 1  # Refills two messages
+    adapter.info("Message %d", 10)
+    adapter.info("Message %d", 11)
+    adapter.info("Message %d", 12)
+    assert handler.messages[3:] == ["Message 10 (7 similar messages were suppressed)", "Message 11"]
+    assert adapter.suppressed == 1
+
+
+def test_rate_limited_adapter_disabled_level(handler: ListHandler):
+    logging.getLogger("bytelink.tests").setLevel(logging.INFO)
+    adapter = RateLimitedAdapter(logging.getLogger("bytelink.tests"), rate=1, burst=1)
+
+    adapter.debug("Not logged")
+    adapter.info("Logged")
+
+    # Messages under the logging level don't use up the limit
+    assert handler.messages == ["Logged"]
+    assert adapter.suppressed == 0
+
+
+def test_queue_listener(handler: ListHandler):
+    root_log = logging.getLogger()
+    handlers = root_log.handlers[:]
+    logger = logging.getLogger("bytelink.tests")
+    logger.removeHandler(handler)
+    root_log.addHandler(handler)
+    try:
+        queue_handler = start_queue_listener()
+        assert start_queue_listener() is queue_handler
+        assert root_log.handlers == [queue_handler]
+
+        for i in range(100):
+            logger.info("Message %d", i)
+        stop_queue_listener()
+
+        # All of the queued records get handled before the listener stops
+        assert handler.messages == [f"Message {i}" for i in range(100)]
+        assert root_log.handlers == [*handlers, handler]
+    finally:
+        stop_queue_listener()
+        root_log.removeHandler(handler)
+        logger.addHandler(handler)
+
+
+def test_queue_handler_drops():
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(2)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    logger = logging.getLogger("bytelink.tests.drops")
+    logger.propagate = False
+    logger.addHandler(queue_handler)
+    try:
+        for i in range(5):
+            logger.warning("Message %d", i)
+    finally:
+        logger.removeHandler(queue_handler)
+        logger.propagate = True
+
+    assert log_queue.qsize() == 2
+    assert queue_handler.dropped == 3
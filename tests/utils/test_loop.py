@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from bytelink.utils import loop as loop_utils
+from bytelink.utils.loop import EventLoop, get_loop_factory, loop_name, run
+
+
+class CustomLoop(asyncio.SelectorEventLoop):
+    pass
+
+
+def _missing_uvloop():
+    raise ImportError("No module named 'uvloop'")
+
+
+def test_asyncio_loop_factory():
+    assert get_loop_factory(EventLoop.ASYNCIO) is asyncio.new_event_loop
+    assert get_loop_factory("asyncio") is asyncio.new_event_loop
+    with pytest.raises(ValueError):
+        get_loop_factory("nonexistent")
+
+
+@pytest.mark.parametrize("loop,warns", ((EventLoop.AUTO, False), (EventLoop.UVLOOP, True)))
+def test_uvloop_fallback(loop: EventLoop, warns: bool, monkeypatch: pytest.MonkeyPatch, caplog):
+    monkeypatch.setattr(loop_utils, "_uvloop_factory", _missing_uvloop)
+    with caplog.at_level(logging.WARNING, logger="bytelink.utils.loop"):
+        assert get_loop_factory(loop) is asyncio.new_event_loop
+    assert bool(caplog.records) is warns
+
+
+def test_run_with_loop_factory(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(loop_utils, "_uvloop_factory", lambda: CustomLoop)
+    policy = asyncio.get_event_loop_policy()
+
+    async def main() -> type:
+        return type(asyncio.get_running_loop())
+
+    assert run(main(), EventLoop.UVLOOP) is CustomLoop
+    assert run(main(), EventLoop.ASYNCIO) is not CustomLoop
+    assert type(asyncio.get_event_loop_policy()) is type(policy)
+
+
+@pytest.mark.skipif(not hasattr(asyncio, "eager_task_factory"), reason="Eager tasks need python 3.12+")
+def test_run_eager_tasks():
+    async def main() -> bool:
+        started = False
+
+        async def task() -> None:
+            nonlocal started
+            started = True
+
+        asyncio.create_task(task())
+        return started
+
+    assert run(main(), EventLoop.ASYNCIO, eager_tasks=True) is True
+    assert run(main(), EventLoop.ASYNCIO, eager_tasks=False) is False
+
+
+def test_loop_name():
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop_name(loop) == "asyncio"
+    finally:
+        loop.close()
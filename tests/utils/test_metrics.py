@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import math
+
+import pytest
+
+from bytelink.utils.metrics import Histogram, LATENCY_BUCKETS, MetricsRegistry, log_linear_buckets
+
+
+def test_log_linear_buckets():
+    bounds = log_linear_buckets(1.0, 8.0, sub_buckets=4)
+
+    assert bounds == (1.0, 1.25, 1.5, 1.75, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0, 6.0, 7.0, 8.0)
+    assert LATENCY_BUCKETS[0] == 1e-6
+    assert LATENCY_BUCKETS[-1] >= 120
+
+
+@pytest.mark.parametrize("lowest,highest,sub_buckets", ((0, 1, 4), (2, 1, 4), (1, 2, 0)))
+def test_log_linear_buckets_invalid(lowest: float, highest: float, sub_buckets: int):
+    with pytest.raises(ValueError):
+        log_linear_buckets(lowest, highest, sub_buckets)
+
+
+def test_histogram_quantile():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    assert math.isnan(histogram.snapshot().quantile(0.5))
+
+    for value in (0.5, 1.0, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+
+    assert snapshot.counts == (2, 1, 1, 1)
+    assert snapshot.count == 5
+    assert snapshot.sum == 16.0
+    assert snapshot.quantile(0.4) == 1.0
+    assert snapshot.quantile(0.6) == 2.0
+    assert snapshot.quantile(0.99) == math.inf
+
+
+def test_registry_lookup():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", method="get")
+    counter.inc()
+    counter.inc(2)
+
+    assert registry.counter("requests_total", "Requests", method="get") is counter
+    assert registry.counter("requests_total", "Requests", method="post") is not counter
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "Requests")
+
+    assert registry.snapshot()["requests_total"].values == {(("method", "get"),): 3, (("method", "post"),): 0}
+
+
+def test_collectors():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("items", "Items")
+    items = [1, 2, 3]
+
+    def collect() -> None:
+        gauge.set(len(items))
+
+    registry.add_collector(collect)
+    assert registry.snapshot()["items"].values == {(): 3}
+    items.append(4)
+    assert registry.snapshot()["items"].values == {(): 4}
+
+    registry.remove_collector(collect)
+    items.append(5)
+    assert registry.snapshot()["items"].values == {(): 4}
+
+
+def test_to_prometheus():
+    registry = MetricsRegistry()
+    registry.counter("packets_total", "Packets\nreceived", packet='Say "hi"').inc(3)
+    histogram = registry.histogram("latency_seconds", "Latency", bounds=(0.5, 1.0))
+    histogram.observe(0.25)
+    histogram.observe(2.0)
+
+    assert registry.to_prometheus() == (
+        "# HELP packets_total Packets\\nreceived\n"
+        "# TYPE packets_total counter\n"
+        'packets_total{packet="Say \\"hi\\""} 3\n'
+        "# HELP latency_seconds Latency\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.5"} 1\n'
+        'latency_seconds_bucket{le="1"} 1\n'
+        'latency_seconds_bucket{le="+Inf"} 2\n'
+        "latency_seconds_sum 2.25\n"
+        "latency_seconds_count 2\n"
+    )
+
+
+def test_write_prometheus(tmp_path):
+    registry = MetricsRegistry()
+    registry.gauge("connections", "Connections").set(2)
+    path = tmp_path / "bytelink.prom"
+
+    registry.write_prometheus(path)
+
+    assert path.read_text() == registry.to_prometheus()
+    assert list(tmp_path.iterdir()) == [path]
+
+
+async def test_serve_prometheus():
+    registry = MetricsRegistry()
+    registry.gauge("connections", "Connections").set(2)
+    server = await registry.serve_prometheus(port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await asyncio.wait_for(reader.read(), timeout=3)
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    head, body = response.split(b"\r\n\r\n", 1)
+    assert head.startswith(b"HTTP/1.0 200 OK")
+    assert body.decode() == registry.to_prometheus()